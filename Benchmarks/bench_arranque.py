@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark del tiempo de arranque de GeneradorFunciones (constructor + connect()).
+
+Simula una maquina con backends serie/GPIB lentos, donde enumerar todos los recursos toma
+ENUMERACION_COMPLETA segundos y enumerar solo los USB RIGOL toma ENUMERACION_FILTRADA, y compara:
+    - enumeracion completa sin cache (comportamiento anterior)
+    - enumeracion filtrada sin cache (primer arranque)
+    - ultimo recurso conocido en cache (arranques siguientes)
+
+Uso:
+    python bench_arranque.py
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, "BenjaminMorales"))
+sys.path.insert(0, os.path.join(RAIZ, "Herramientas"))
+
+from generador_funciones import FILTRO_VISA, GeneradorFunciones  # noqa: E402
+from simulador_dg1022 import SimuladorResourceManager  # noqa: E402
+
+ENUMERACION_COMPLETA = 2.0
+ENUMERACION_FILTRADA = 0.05
+RECURSOS = ["ASRL1::INSTR", "ASRL3::INSTR", "GPIB0::7::INSTR", SimuladorResourceManager.RECURSO_POR_DEFECTO]
+
+
+def arrancar(filtro, ruta_cache):
+    rm = SimuladorResourceManager(RECURSOS, tiempo_enumeracion=ENUMERACION_COMPLETA,
+                                  tiempo_enumeracion_filtrada=ENUMERACION_FILTRADA)
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        generador = GeneradorFunciones(resource_manager=rm, filtro_visa=filtro, ruta_cache=ruta_cache)
+        assert generador.connect()
+    return time.perf_counter() - inicio, rm.enumeraciones
+
+
+def main():
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, "cache.json")
+        casos = [
+            ("enumeracion completa, sin cache", SimuladorResourceManager.CONSULTA_GENERAL, None),
+            ("enumeracion filtrada, sin cache", FILTRO_VISA, ruta),
+            ("recurso en cache", FILTRO_VISA, ruta),
+        ]
+        for nombre, filtro, ruta_cache in casos:
+            segundos, enumeraciones = arrancar(filtro, ruta_cache)
+            print("%-34s %8.1f ms  (%d enumeraciones)" % (nombre, segundos * 1e3, enumeraciones))
+
+
+if __name__ == "__main__":
+    main()
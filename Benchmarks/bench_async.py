@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de GeneradorFuncionesAsync: configura N generadores simulados en secuencia con el driver
+sincrono y en paralelo con asyncio.gather, e imprime ambos tiempos.
+
+Uso:
+    python bench_async.py [N]
+"""
+
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, "BenjaminMorales"))
+sys.path.insert(0, os.path.join(RAIZ, "Herramientas"))
+
+from generador_async import GeneradorFuncionesAsync  # noqa: E402
+from generador_funciones import GeneradorFunciones  # noqa: E402
+from simulador_dg1022 import SimuladorResourceManager  # noqa: E402
+
+SENAL = [i % 64 for i in range(1024)]
+
+
+def secuencial(n):
+    inicio = time.perf_counter()
+    for _ in range(n):
+        generador = GeneradorFunciones(resource_manager=SimuladorResourceManager(), ruta_cache=None)
+        generador.connect()
+        generador.channel_1(1000, 5, 10)
+        generador.channel_2(4800, 5)
+        generador.custom_signal(SENAL)
+        generador.turn_on()
+    return time.perf_counter() - inicio
+
+
+async def paralelo(n):
+    generadores = [GeneradorFuncionesAsync(resource_manager=SimuladorResourceManager(), ruta_cache=None) for _ in range(n)]
+    inicio = time.perf_counter()
+
+    async def configurar(generador):
+        await generador.connect()
+        await generador.channel_1(1000, 5, 10)
+        await generador.channel_2(4800, 5)
+        await generador.custom_signal(SENAL)
+        await generador.turn_on()
+
+    await asyncio.gather(*(configurar(g) for g in generadores))
+    return time.perf_counter() - inicio
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    with contextlib.redirect_stdout(io.StringIO()):
+        t_uno = secuencial(1)
+        t_secuencial = secuencial(n)
+        t_paralelo = asyncio.run(paralelo(n))
+    print("1 generador:                %7.3f s" % t_uno)
+    print("%2d generadores secuencial:  %7.3f s" % (n, t_secuencial))
+    print("%2d generadores asyncio:     %7.3f s" % (n, t_paralelo))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Microbenchmark del codificador de señales arbitrarias de dg1022.custom_signal.
+
+Compara la codificacion original (list comprehension + ''.join con una cadena por muestra)
+con codificador_senal (NumPy) para 100, 4096 y 1 000 000 de muestras. La señal de 1M se
+remuestrea a 4096 puntos, el limite del generador; la version original no lo hacia, por lo que
+se mide codificando las 1M muestras completas.
+
+Uso:
+    python bench_codificacion.py
+"""
+
+import os
+import sys
+import timeit
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, "PedroPerlaza"))
+
+import codificador_senal  # noqa: E402
+
+TAMANOS = (100, 4096, 1000000)
+
+
+def codificar_original(signal, low=0, high=16383):
+    """Copia del codigo anterior de custom_signal, usada como referencia."""
+    cur_high, cur_low = max(signal), min(signal)
+    signal = [int((high-low)*(val-cur_low)/(cur_high-cur_low)+low) for val in signal]
+    signal = ''.join([str(d)+',' for d in signal])
+    return signal[:-1]
+
+
+def medir(funcion, repeticiones):
+    return min(timeit.repeat(funcion, number=1, repeat=repeticiones))
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print("%10s %14s %14s %9s" % ("muestras", "original", "numpy", "speedup"))
+    for n in TAMANOS:
+        signal = rng.standard_normal(n)
+        lista = signal.tolist()  # La version original recibia listas de Python
+        if n <= codificador_senal.PUNTOS_MAXIMOS:
+            # Mismo resultado que antes cuando no hay remuestreo
+            assert codificador_senal.codificar(signal)[1] == codificar_original(lista)
+        repeticiones = 3 if n > 100000 else 20
+        t_original = medir(lambda: codificar_original(lista), repeticiones)
+        t_numpy = medir(lambda: codificador_senal.codificar(signal), repeticiones)
+        print("%10d %12.3fms %12.3fms %8.1fx" % (n, t_original * 1e3, t_numpy * 1e3, t_original / t_numpy))
+
+
+if __name__ == "__main__":
+    main()
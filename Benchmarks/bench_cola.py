@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de GeneradorFuncionesConcurrente (cola de comandos con un hilo de E/S y combinacion de
+configuraciones) contra GeneradorFunciones protegido con un threading.Lock, con varios hilos
+productores que cambian la frecuencia de CH2 y leen su estado. Cada productor espera el resultado de
+cada llamada. Imprime llamadas por segundo, latencia p50/p99 y escrituras que llegaron al simulador.
+
+Uso:
+    python bench_cola.py [llamadas_por_hilo]
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, "BenjaminMorales"))
+sys.path.insert(0, os.path.join(RAIZ, "Herramientas"))
+
+from cola_comandos import GeneradorFuncionesConcurrente  # noqa: E402
+from generador_funciones import GeneradorFunciones  # noqa: E402
+from instrumentacion import percentil  # noqa: E402
+from simulador_dg1022 import SimuladorResourceManager  # noqa: E402
+
+HILOS = (1, 4, 16, 64)
+
+
+class ConBloqueo:
+    """GeneradorFunciones serializado con un Lock; cada llamada se envia completa."""
+    def __init__(self, **opciones):
+        self.generador = GeneradorFunciones(**opciones)
+        self.generador.connect()
+        self.bloqueo = threading.Lock()
+
+    def llamar(self, metodo, *args):
+        with self.bloqueo:
+            return getattr(self.generador, metodo)(*args)
+
+
+class ConCola:
+    def __init__(self, **opciones):
+        self.concurrente = GeneradorFuncionesConcurrente(**opciones)
+        self.concurrente.connect().result()
+        self.generador = self.concurrente.generador
+
+    def llamar(self, metodo, *args):
+        return getattr(self.concurrente, metodo)(*args).result()
+
+
+def correr(clase, hilos, llamadas):
+    driver = clase(resource_manager=SimuladorResourceManager(), ruta_cache=None)
+    escrituras = driver.generador.instrument.estadisticas["escrituras"]
+    latencias = []
+
+    def productor(indice):
+        propias = []
+        for i in range(llamadas):
+            inicio = time.perf_counter()
+            if i % 5 == 4:
+                driver.llamar("read_channel_2_state")
+            else:
+                driver.llamar("channel_2", 1000 + 10 * indice + i, 5)
+            propias.append(time.perf_counter() - inicio)
+        latencias.extend(propias)
+
+    productores = [threading.Thread(target=productor, args=(i,)) for i in range(hilos)]
+    inicio = time.perf_counter()
+    for p in productores:
+        p.start()
+    for p in productores:
+        p.join()
+    segundos = time.perf_counter() - inicio
+    latencias.sort()
+    return {"llamadas_por_segundo": len(latencias) / segundos, "p50": percentil(latencias, 50),
+            "p99": percentil(latencias, 99),
+            "escrituras": driver.generador.instrument.estadisticas["escrituras"] - escrituras}
+
+
+def main():
+    logging.basicConfig(level=logging.ERROR)
+    llamadas = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    print("%6s %-8s %12s %9s %9s %11s" % ("hilos", "forma", "llamadas/s", "p50 ms", "p99 ms", "escrituras"))
+    for hilos in HILOS:
+        for nombre, clase in (("lock", ConBloqueo), ("cola", ConCola)):
+            r = correr(clase, hilos, llamadas)
+            print("%6d %-8s %12.1f %9.2f %9.2f %11d" % (hilos, nombre, r["llamadas_por_segundo"], r["p50"] * 1e3,
+                                                       r["p99"] * 1e3, r["escrituras"]))
+
+
+if __name__ == "__main__":
+    main()
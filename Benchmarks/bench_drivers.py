@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de punta a punta de los dos drivers del repositorio con las mismas tareas:
+    - BenjaminMorales: GeneradorFunciones (generador_funciones.py)
+    - PedroPerlaza: dg1022.dg1022, con los comandos que envia generator_functions.py
+
+Metricas por driver (mediana, p95 y cantidad de muestras; menor es mejor en todas):
+    arranque_ms            constructor + conexion (enumerar y abrir el recurso)
+    configurar_canal_ms    seno en CH2 con una frecuencia distinta en cada repeticion
+    leer_estado_ms         estado de CH2 leido del generador (APPLy:CH2?)
+    leer_estado_cache_ms   estado de CH2 desde el modelo en memoria (solo BenjaminMorales)
+    carga_<n>_ms           codificacion + carga de una forma arbitraria de n puntos
+    memoria_pico_kb        pico de memoria de Python (tracemalloc) al conectar y cargar la forma mas grande
+
+El transporte es sustituible: por defecto el simulador de Herramientas (sin instrumento), o
+--transporte visa para medir en el equipo real con pyvisa. Los resultados se guardan en JSON y
+--comparar falla (codigo de salida 1) si alguna metrica empeora mas que --umbral (relativo) y mas
+que --minimo (absoluto) respecto de una ejecucion anterior.
+
+Uso:
+    python bench_drivers.py [--repeticiones 10] [--salida resultados.json]
+    python bench_drivers.py --comparar base.json [--umbral 0.2] [--minimo 0.5]  # mide y compara con base.json
+    python bench_drivers.py --comparar base.json nuevo.json [--umbral 0.2]      # solo compara dos archivos
+"""
+
+import argparse
+import datetime
+import json
+import logging
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, "BenjaminMorales"))
+sys.path.insert(0, os.path.join(RAIZ, "PedroPerlaza"))
+sys.path.insert(0, os.path.join(RAIZ, "Herramientas"))
+
+import dg1022  # noqa: E402
+from generador_funciones import GeneradorFunciones  # noqa: E402
+from instrumentacion import percentil  # noqa: E402
+from simulador_dg1022 import SimuladorResourceManager  # noqa: E402
+
+DRIVERS = ("BenjaminMorales", "PedroPerlaza")
+TAMANOS = (256, 1024, 4096)
+UMBRAL = 0.2  # Empeoramiento relativo permitido por --comparar
+MINIMO = 0.5  # Diferencia absoluta (ms o kB) por debajo de la cual un cambio se considera ruido
+
+
+def crear_gestor(transporte):
+    """ResourceManager del transporte elegido: 'simulador' o 'visa' (equipo real)."""
+    if transporte == "visa":
+        import pyvisa
+        return pyvisa.ResourceManager()
+    return SimuladorResourceManager()
+
+
+class Benjamin:
+    """Tareas del benchmark con GeneradorFunciones."""
+    def __init__(self, gestor):
+        self.generador = GeneradorFunciones(resource_manager=gestor, ruta_cache=None)
+        if not self.generador.connect():
+            raise RuntimeError("GeneradorFunciones no pudo conectarse")
+
+    def configurar_canal(self, frecuencia):
+        self.generador.channel_2(frecuencia, 2)
+
+    def leer_estado(self):
+        self.generador.invalidar_estado(2) # Obliga a consultar al generador
+        return self.generador.read_channel_2_state()
+
+    def leer_estado_cache(self):
+        return self.generador.read_channel_2_state()
+
+    def cargar(self, senal):
+        self.generador.custom_signal(senal)
+
+    def cerrar(self):
+        self.generador.close()
+
+
+class Pedro:
+    """Tareas del benchmark con dg1022.dg1022 y los mismos comandos que generator_functions.py."""
+    leer_estado_cache = None
+
+    def __init__(self, gestor):
+        self.generador = dg1022.dg1022(handle=gestor)
+        self.generador.conect(0)
+        if not self.generador.connected:
+            raise RuntimeError("dg1022 no pudo conectarse")
+
+    def configurar_canal(self, frecuencia):
+        self.generador.write("APPLy:SINusoid:CH2 %s,2,0" % frecuencia)
+
+    def leer_estado(self):
+        return self.generador.query("APPLy:CH2?")
+
+    def cargar(self, senal):
+        self.generador.custom_signal(senal)
+
+    def cerrar(self):
+        self.generador.close()
+
+
+CLASES = {"BenjaminMorales": Benjamin, "PedroPerlaza": Pedro}
+
+
+def resumir(segundos):
+    ordenados = sorted(s * 1e3 for s in segundos)
+    return {"mediana": percentil(ordenados, 50), "p95": percentil(ordenados, 95), "muestras": len(ordenados)}
+
+
+def cronometrar(funcion, repeticiones):
+    # funcion(0) es de calentamiento y no se mide: la primera configuracion de un canal desconocido
+    # envia APPLy completo y las siguientes solo lo que cambia
+    funcion(0)
+    muestras = []
+    for i in range(1, repeticiones + 1):
+        inicio = time.perf_counter()
+        funcion(i)
+        muestras.append(time.perf_counter() - inicio)
+    return resumir(muestras)
+
+
+def medir_driver(nombre, transporte, repeticiones, tamanos):
+    ##############################################################################################
+    # Retorna {metrica: resumen} de un driver. Cada repeticion de arranque usa un gestor nuevo    #
+    ##############################################################################################
+    clase = CLASES[nombre]
+    metricas = {}
+    arranques = []
+    for _ in range(repeticiones):
+        gestor = crear_gestor(transporte)
+        inicio = time.perf_counter()
+        driver = clase(gestor)
+        arranques.append(time.perf_counter() - inicio)
+        driver.cerrar()
+    metricas["arranque_ms"] = resumir(arranques)
+
+    driver = clase(crear_gestor(transporte))
+    try:
+        metricas["configurar_canal_ms"] = cronometrar(lambda i: driver.configurar_canal(1000 + i), repeticiones)
+        metricas["leer_estado_ms"] = cronometrar(lambda i: driver.leer_estado(), repeticiones)
+        if driver.leer_estado_cache is not None:
+            metricas["leer_estado_cache_ms"] = cronometrar(lambda i: driver.leer_estado_cache(), repeticiones)
+        for tamano in tamanos:
+            # Una señal distinta en cada repeticion, para que ningun cache evite la carga
+            senales = [np.sin(np.linspace(0, 2 * np.pi * (i + 1), tamano)) for i in range(repeticiones + 1)]
+            metricas["carga_%d_ms" % tamano] = cronometrar(lambda i: driver.cargar(senales[i]), repeticiones)
+    finally:
+        driver.cerrar()
+
+    # Memoria aparte: tracemalloc hace mas lento el codigo Python y distorsionaria los tiempos
+    senal = np.sin(np.linspace(0, 2 * np.pi, max(tamanos)))
+    tracemalloc.start()
+    try:
+        driver = clase(crear_gestor(transporte))
+        driver.cargar(senal)
+        driver.cerrar()
+        pico = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    metricas["memoria_pico_kb"] = {"mediana": pico / 1024, "p95": pico / 1024, "muestras": 1}
+    return metricas
+
+
+def medir(drivers, transporte, repeticiones, tamanos):
+    resultados = {
+        "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "transporte": transporte,
+        "repeticiones": repeticiones,
+        "metricas": {},
+    }
+    for nombre in drivers:
+        for metrica, resumen in medir_driver(nombre, transporte, repeticiones, tamanos).items():
+            resultados["metricas"]["%s.%s" % (nombre, metrica)] = resumen
+    return resultados
+
+
+def imprimir(resultados):
+    for metrica, resumen in resultados["metricas"].items():
+        print("%-42s %10.2f  (p95 %10.2f, %d muestras)" % (metrica, resumen["mediana"], resumen["p95"],
+                                                           resumen["muestras"]))
+
+
+def comparar(base, nuevo, umbral, minimo=MINIMO):
+    ##############################################################################################
+    # Compara las medianas de las metricas que estan en ambos resultados. Retorna la lista de     #
+    # metricas que empeoraron mas que `umbral` (fraccion, 0.2 = 20 %) y mas que `minimo` en valor #
+    # absoluto, para que las metricas de microsegundos no fallen por ruido del reloj              #
+    ##############################################################################################
+    if base.get("transporte") != nuevo.get("transporte"):
+        print("Aviso: se comparan transportes distintos (%s y %s)" % (base.get("transporte"), nuevo.get("transporte")))
+    regresiones = []
+    for metrica, resumen in nuevo["metricas"].items():
+        if metrica not in base["metricas"]:
+            continue
+        anterior, actual = base["metricas"][metrica]["mediana"], resumen["mediana"]
+        cambio = (actual - anterior) / anterior if anterior else 0.0
+        marca = ""
+        if cambio > umbral and actual - anterior > minimo:
+            regresiones.append(metrica)
+            marca = "  REGRESION"
+        print("%-42s %10.2f -> %10.2f  %+7.1f %%%s" % (metrica, anterior, actual, cambio * 100, marca))
+    return regresiones
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Benchmark de punta a punta de ambos drivers del DG1022.")
+    parser.add_argument("--drivers", nargs="+", choices=DRIVERS, default=list(DRIVERS))
+    parser.add_argument("--transporte", choices=("simulador", "visa"), default="simulador",
+                        help="simulador (por defecto) o visa para el equipo real")
+    parser.add_argument("--repeticiones", type=int, default=10)
+    parser.add_argument("--tamanos", nargs="+", type=int, default=list(TAMANOS),
+                        help="Puntos de las formas arbitrarias cargadas")
+    parser.add_argument("--salida", help="Archivo JSON donde guardar los resultados")
+    parser.add_argument("--comparar", nargs="+", metavar="JSON",
+                        help="BASE [NUEVO]: compara NUEVO (o una medicion nueva) con BASE")
+    parser.add_argument("--umbral", type=float, default=UMBRAL,
+                        help="Empeoramiento relativo que se considera regresion (por defecto %(default)s)")
+    parser.add_argument("--minimo", type=float, default=MINIMO,
+                        help="Empeoramiento absoluto minimo (ms o kB) para considerar regresion (por defecto %(default)s)")
+    argumentos = parser.parse_args(argumentos)
+    if argumentos.comparar and len(argumentos.comparar) > 2:
+        parser.error("--comparar recibe BASE y opcionalmente NUEVO")
+    logging.basicConfig(level=logging.ERROR)
+
+    if argumentos.comparar and len(argumentos.comparar) == 2:
+        with open(argumentos.comparar[1]) as archivo:
+            resultados = json.load(archivo)
+    else:
+        resultados = medir(argumentos.drivers, argumentos.transporte, argumentos.repeticiones, argumentos.tamanos)
+        imprimir(resultados)
+        if argumentos.salida:
+            with open(argumentos.salida, "w") as archivo:
+                json.dump(resultados, archivo, indent=2)
+
+    if argumentos.comparar:
+        with open(argumentos.comparar[0]) as archivo:
+            base = json.load(archivo)
+        regresiones = comparar(base, resultados, argumentos.umbral, argumentos.minimo)
+        if regresiones:
+            print("%d metricas empeoraron mas de %.0f %%: %s" % (len(regresiones), argumentos.umbral * 100,
+                                                                   ", ".join(regresiones)))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark del tiempo de importacion de los modulos de ambos drivers.
+
+Importa cada modulo en un interprete nuevo con `python -X importtime`, compara el tiempo acumulado
+con su presupuesto y verifica que la importacion no cargue pyvisa, NumPy ni matplotlib (se cargan
+recien al conectar o al cargar una señal). codificador_senal no se mide porque es el codificador
+NumPy y dg1022 lo importa de forma diferida. Termina con codigo 1 si algun modulo se pasa, para
+usarlo como prueba de regresion.
+
+Uso:
+    python bench_importacion.py [repeticiones]
+"""
+
+import os
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# carpeta -> modulos a importar
+MODULOS = {
+    "BenjaminMorales": ("generador_funciones", "generador_async", "flota", "menu"),
+    "PedroPerlaza": ("cache_formas", "dg1022", "pool_sesiones", "generator_functions", "menu"),
+}
+PRESUPUESTO_MS = 50.0  # Tiempo acumulado maximo por modulo (mejor de las repeticiones)
+PRESUPUESTOS_ESPECIALES = {"generador_async": 100.0}  # asyncio solo ya toma ~35 ms
+PESADOS = ("pyvisa", "numpy", "matplotlib")  # Modulos que no se deben ejecutar al importar
+
+
+def importar(carpeta, modulo):
+    """Retorna (milisegundos acumulados, modulos pesados ejecutados) de importar `modulo` desde `carpeta`."""
+    # Un modulo diferido aparece en sys.modules como _LazyModule hasta que se usa (no se consulta ningun
+    # atributo para no cargarlo)
+    codigo = "import %s, sys; print(' '.join(m for m in %r if m in sys.modules "\
+             "and type(sys.modules[m]).__name__ != '_LazyModule'))" % (modulo, PESADOS)
+    proceso = subprocess.run([sys.executable, "-X", "importtime", "-c", codigo], cwd=os.path.join(RAIZ, carpeta),
+                             capture_output=True, text=True, check=True)
+    acumulado = None
+    for linea in proceso.stderr.splitlines():
+        campos = linea.split("|")
+        if len(campos) == 3 and campos[2].strip() == modulo:
+            acumulado = int(campos[1]) / 1000
+    return acumulado, proceso.stdout.split()
+
+
+def main():
+    repeticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    fallas = 0
+    print("%-16s %-20s %9s  %s" % ("carpeta", "modulo", "ms", "estado"))
+    for carpeta, modulos in MODULOS.items():
+        for modulo in modulos:
+            medidas = [importar(carpeta, modulo) for _ in range(repeticiones)]
+            milisegundos = min(m[0] for m in medidas)
+            pesados = medidas[0][1]
+            estado = "ok"
+            presupuesto = PRESUPUESTOS_ESPECIALES.get(modulo, PRESUPUESTO_MS)
+            if milisegundos > presupuesto:
+                estado = "EXCEDE %.0f ms" % presupuesto
+            if pesados:
+                estado = "CARGA " + ", ".join(pesados)
+            fallas += estado != "ok"
+            print("%-16s %-20s %9.1f  %s" % (carpeta, modulo, milisegundos, estado))
+    sys.exit(1 if fallas else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de la instrumentacion de E/S: mide el costo por operacion VISA sin instrumentacion y con
+ella, contra un simulador sin latencia (asi solo queda el costo del driver), y muestra el resumen
+de latencias por cabecera de una sesion normal contra el simulador con latencia.
+
+Uso:
+    python bench_instrumentacion.py [operaciones]
+"""
+
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, "BenjaminMorales"))
+sys.path.insert(0, os.path.join(RAIZ, "Herramientas"))
+
+from generador_funciones import GeneradorFunciones  # noqa: E402
+from instrumentacion import Instrumentacion  # noqa: E402
+from simulador_dg1022 import SimuladorResourceManager  # noqa: E402
+
+SIN_LATENCIA = {"tiempo_comando": 0.0, "tiempo_respuesta": 0.0, "tiempos_comando": {},
+                "latencia_usb": 0.0, "velocidad_usb": float("inf")}
+
+
+def costo_por_operacion(operaciones, instrumentacion):
+    generador = GeneradorFunciones(resource_manager=SimuladorResourceManager(**SIN_LATENCIA), ruta_cache=None,
+                                   instrumentacion=instrumentacion)
+    generador.connect()
+    inicio = time.perf_counter()
+    for i in range(operaciones):
+        generador._escribir("FREQ %d" % (1000 + i))  # Cada escritura es un write y un *OPC?
+    return (time.perf_counter() - inicio) / (2 * operaciones)
+
+
+def main():
+    operaciones = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    sin = costo_por_operacion(operaciones, None)
+    con = costo_por_operacion(operaciones, Instrumentacion())
+    print("sin instrumentacion: %6.2f us/operacion" % (sin * 1e6))
+    print("con instrumentacion: %6.2f us/operacion (+%.2f us)" % (con * 1e6, (con - sin) * 1e6))
+
+    instrumentacion = Instrumentacion()
+    generador = GeneradorFunciones(resource_manager=SimuladorResourceManager(), ruta_cache=None,
+                                   instrumentacion=instrumentacion)
+    generador.connect()
+    for frecuencia in (1000, 2000, 3000):
+        generador.channel_1(frecuencia, 5, 10)
+        generador.channel_2(frecuencia, 2)
+        generador.turn_on()
+        generador.turn_off()
+    print()
+    print("%-6s %-12s %7s %9s %9s %9s" % ("op", "cabecera", "n", "p50 ms", "p95 ms", "p99 ms"))
+    for c in instrumentacion.resumen()["comandos"]:
+        print("%-6s %-12s %7d %9.3f %9.3f %9.3f" % (c["operacion"], c["mnemonico"], c["llamadas"],
+                                                   c["p50"] * 1e3, c["p95"] * 1e3, c["p99"] * 1e3))
+
+
+if __name__ == "__main__":
+    main()
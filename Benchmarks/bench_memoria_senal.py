@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de memoria de custom_signal con señales grandes: pico de RSS y velocidad de reduccion a
+4096 puntos de una captura en disco, leyendola completa (como antes: np.fromfile + remuestrear) y
+por bloques con codificador_senal.reducir() desde np.memmap (.npy y binario crudo), WAV y un
+generador de Python (MB/s equivalentes a float64). Cada caso corre en un proceso aparte para que el pico de RSS sea solo suyo.
+
+Uso:
+    python bench_memoria_senal.py [MB]
+"""
+
+import json
+import math
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, "PedroPerlaza"))
+
+import codificador_senal  # noqa: E402
+
+MUESTRAS_GENERADOR = 5000000  # El generador de Python es lento, se mide con menos muestras
+
+
+def pico_rss_mb():
+    # VmHWM empieza de cero en cada exec; ru_maxrss se hereda del proceso padre en Linux
+    try:
+        with open("/proc/self/status") as estado:
+            for linea in estado:
+                if linea.startswith("VmHWM:"):
+                    return int(linea.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def caso(nombre, ruta):
+    """Corre un caso dentro del proceso hijo e imprime el resultado como JSON."""
+    base = pico_rss_mb()
+    inicio = time.perf_counter()
+    if nombre == "completo":
+        signal = np.fromfile(ruta, dtype = "<f8")
+        muestras = signal.size
+        codificador_senal.cuantizar(codificador_senal.remuestrear(signal))
+    elif nombre == "generador":
+        muestras = MUESTRAS_GENERADOR
+        signal, minimo, maximo = codificador_senal.reducir(math.sin(i * 0.001) for i in range(muestras))
+        codificador_senal.cuantizar(signal, minimo = minimo, maximo = maximo)
+    else:
+        muestras = codificador_senal.abrir_senal(ruta).shape[0]
+        signal, minimo, maximo = codificador_senal.reducir(ruta)
+        codificador_senal.cuantizar(signal, minimo = minimo, maximo = maximo)
+    segundos = time.perf_counter() - inicio
+    print(json.dumps({"muestras": muestras, "segundos": segundos, "rss_mb": pico_rss_mb() - base}))
+
+
+def escribir_archivos(carpeta, mb):
+    # Se escriben por bloques para no medir tambien la memoria del proceso que los crea
+    muestras = int(mb * 1e6 / 8)
+    rng = np.random.default_rng(0)
+    ruta_crudo = os.path.join(carpeta, "captura.raw")
+    ruta_npy = os.path.join(carpeta, "captura.npy")
+    ruta_wav = os.path.join(carpeta, "captura.wav")
+    npy = np.lib.format.open_memmap(ruta_npy, mode = "w+", dtype = "<f8", shape = (muestras,))
+    with open(ruta_crudo, "wb") as crudo, open(ruta_wav, "wb") as wav:
+        muestras_wav = muestras * 4  # 16 bits: mismo tamaño en disco
+        wav.write(b"RIFF" + (36 + 2 * muestras_wav).to_bytes(4, "little") + b"WAVEfmt "
+                  + (16).to_bytes(4, "little") + (1).to_bytes(2, "little") + (1).to_bytes(2, "little")
+                  + (48000).to_bytes(4, "little") + (96000).to_bytes(4, "little") + (2).to_bytes(2, "little")
+                  + (16).to_bytes(2, "little") + b"data" + (2 * muestras_wav).to_bytes(4, "little"))
+        for inicio in range(0, muestras, codificador_senal.BLOQUE):
+            trozo = rng.standard_normal(min(codificador_senal.BLOQUE, muestras - inicio))
+            trozo.tofile(crudo)
+            npy[inicio:inicio + trozo.size] = trozo
+            (np.repeat(trozo, 4) * 3000).astype("<i2").tofile(wav)
+    npy.flush()
+    del npy
+    return {"completo": ruta_crudo, "crudo": ruta_crudo, "npy": ruta_npy, "wav": ruta_wav, "generador": ""}
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--caso":
+        return caso(sys.argv[2], sys.argv[3])
+    mb = float(sys.argv[1]) if len(sys.argv) > 1 else 200
+    with tempfile.TemporaryDirectory() as carpeta:
+        archivos = escribir_archivos(carpeta, mb)
+        print("%10s %11s %9s %10s %12s" % ("caso", "muestras", "segundos", "MB/s", "pico RSS MB"))
+        for nombre, ruta in archivos.items():
+            salida = subprocess.run([sys.executable, __file__, "--caso", nombre, ruta],
+                                    capture_output = True, text = True, check = True).stdout
+            r = json.loads(salida)
+            mb_leidos = r["muestras"] * 8 / 1e6 if nombre == "generador" else os.path.getsize(ruta) / 1e6
+            print("%10s %11d %9.2f %10.1f %12.1f" % (nombre, r["muestras"], r["segundos"],
+                                                     mb_leidos / r["segundos"], r["rss_mb"]))
+
+
+if __name__ == "__main__":
+    main()
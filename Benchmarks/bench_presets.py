@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark del cambio entre configuraciones de prueba estandar (CH1 en burst + CH2 seno) en el
+generador simulado:
+    - con dg1022 (PedroPerlaza): un write por parametro, como generator_functions.control_burst_mode()
+    - reenviando cada parametro con el modelo en memoria vacio (un proceso nuevo, como el menu)
+    - reenviando solo lo que cambia (modelo en memoria de GeneradorFunciones)
+    - recuperar_preset(): un solo *RCL guardado antes con guardar_preset()
+    - recuperar_preset(verificar=True): *RCL y lectura del estado para comparar la huella
+Imprime milisegundos y viajes USB por cambio.
+
+Uso:
+    python bench_presets.py [cambios]
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, "BenjaminMorales"))
+sys.path.insert(0, os.path.join(RAIZ, "PedroPerlaza"))
+sys.path.insert(0, os.path.join(RAIZ, "Herramientas"))
+
+import dg1022  # noqa: E402
+from generador_funciones import GeneradorFunciones  # noqa: E402
+from simulador_dg1022 import SimuladorResourceManager  # noqa: E402
+
+CONFIGURACIONES = {
+    "pulso_corto": ((1000, 5, 10), (4800, 5)),
+    "pulso_largo": ((250, 2, 500), (1000, 1)),
+    "barrido_bajo": ((50, 8, 3), (20000, 3)),
+}
+
+
+def configurar(generador, nombre):
+    canal_1, canal_2 = CONFIGURACIONES[nombre]
+    generador.channel_1(*canal_1)
+    generador.channel_2(*canal_2)
+
+
+def configurar_dg1022(generator, nombre):
+    (frecuencia, amplitud, ciclos), (frecuencia_2, amplitud_2) = CONFIGURACIONES[nombre]
+    generator.write("APPLy:SINusoid %s,%s,0" % (frecuencia, amplitud))
+    generator.write("BURS:STAT ON")
+    generator.write("BURS:MODE TRIG")
+    generator.write("BURS:NCYC %s" % ciclos)
+    generator.write("APPLy:SINusoid:CH2 %s,%s,0" % (frecuencia_2, amplitud_2))
+
+
+def medir(instrumento, cambiar, cambios):
+    nombres = list(CONFIGURACIONES)
+    escrituras = instrumento.estadisticas["escrituras"]
+    inicio = time.perf_counter()
+    for i in range(cambios):
+        cambiar(nombres[i % len(nombres)])
+    segundos = (time.perf_counter() - inicio) / cambios
+    return segundos, (instrumento.estadisticas["escrituras"] - escrituras) / cambios
+
+
+def main():
+    logging.basicConfig(level=logging.ERROR)
+    cambios = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    generator = dg1022.dg1022(handle=SimuladorResourceManager())
+    generator.conect(0)
+    segundos, viajes = medir(generator.inst, lambda nombre: configurar_dg1022(generator, nombre), cambios)
+    print("%-28s %8.1f ms por cambio  %5.1f viajes USB" % ("dg1022, write por parametro", segundos * 1e3, viajes))
+    generator.close()
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        generador = GeneradorFunciones(resource_manager=SimuladorResourceManager(), ruta_cache=None,
+                                       ruta_presets=os.path.join(carpeta, "presets.json"))
+        generador.connect()
+        for nombre in CONFIGURACIONES:
+            configurar(generador, nombre)
+            generador.guardar_preset(nombre)
+
+        def sin_modelo(nombre):
+            generador.invalidar_estado()
+            configurar(generador, nombre)
+
+        casos = [
+            ("parametros, modelo vacio", sin_modelo),
+            ("parametros, solo cambios", lambda nombre: configurar(generador, nombre)),
+            ("preset (*RCL)", generador.recuperar_preset),
+            ("preset verificado", lambda nombre: generador.recuperar_preset(nombre, verificar=True)),
+        ]
+        for nombre, cambiar in casos:
+            segundos, viajes = medir(generador.instrument, cambiar, cambios)
+            print("%-28s %8.1f ms por cambio  %5.1f viajes USB" % (nombre, segundos * 1e3, viajes))
+        generador.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de reconexion de GeneradorFunciones contra el simulador:
+  - Tiempo hasta detectar una respuesta perdida con el timeout fijo de 10 s y con el adaptativo.
+  - Tiempo de un corte breve (el recurso desaparece `corte` segundos): la operacion se repite sola
+    tras reconectar y channel_1() retorna True.
+  - Costo de cada llamada mientras el generador no esta y el circuito esta abierto.
+
+Uso:
+    python bench_reconexion.py [corte]
+"""
+
+import logging
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, "BenjaminMorales"))
+sys.path.insert(0, os.path.join(RAIZ, "Herramientas"))
+
+from generador_funciones import GeneradorFunciones  # noqa: E402
+from simulador_dg1022 import SimuladorResourceManager  # noqa: E402
+
+
+def conectar(timeout_adaptativo, **opciones):
+    gestor = SimuladorResourceManager(**opciones)
+    generador = GeneradorFunciones(resource_manager=gestor, ruta_cache=None, timeout_adaptativo=timeout_adaptativo)
+    generador.connect()
+    for frecuencia in (1000, 2000, 3000, 4000):  # Muestras de latencia para el timeout adaptativo
+        generador.channel_1(frecuencia, 5, 10)
+        generador.snapshot()
+    return gestor, generador
+
+
+def deteccion_timeout(timeout_adaptativo):
+    _, generador = conectar(timeout_adaptativo)
+    generador.instrument.inyectar_timeout()
+    inicio = time.perf_counter()
+    generador.snapshot()  # Pierde la respuesta, reconecta y repite la lectura
+    return time.perf_counter() - inicio
+
+
+def main():
+    logging.basicConfig(level=logging.ERROR, format="%(message)s")
+    corte = float(sys.argv[1]) if len(sys.argv) > 1 else 0.5
+    print("respuesta perdida, timeout fijo:       %7.2f s" % deteccion_timeout(False))
+    print("respuesta perdida, timeout adaptativo: %7.2f s" % deteccion_timeout(True))
+
+    gestor, generador = conectar(True, tiempo_desconexion=corte)
+    generador.instrument.inyectar_desconexion()
+    inicio = time.perf_counter()
+    ok = generador.channel_1(5000, 5, 10)
+    print("corte de %.1f s durante channel_1:      %7.2f s (aplicado: %s)" % (corte, time.perf_counter() - inicio, ok))
+
+    generador.instrument.desconectar()
+    gestor.ocultar(generador.recurso_conectado, 3600)
+    inicio = time.perf_counter()
+    generador.channel_1(6000, 5, 10)
+    print("equipo ausente, reintentos agotados:   %7.2f s" % (time.perf_counter() - inicio))
+    llamadas = 1000
+    inicio = time.perf_counter()
+    for _ in range(llamadas):
+        generador.channel_1(6000, 5, 10)
+    print("equipo ausente, circuito abierto:      %7.2f us/llamada" % ((time.perf_counter() - inicio) / llamadas * 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de SecuenciaProgramada: ejecuta el mismo protocolo (cambiar la frecuencia del canal 1 cada
+`periodo` segundos) llamando a channel_1() seguido de time.sleep(periodo), como se hacia a mano, y con
+la secuencia programada. Imprime el atraso acumulado y el jitter de cada forma.
+
+Uso:
+    python bench_secuencia.py [pasos] [periodo]
+"""
+
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, "BenjaminMorales"))
+sys.path.insert(0, os.path.join(RAIZ, "Herramientas"))
+
+from generador_funciones import GeneradorFunciones  # noqa: E402
+from secuencia import SecuenciaProgramada  # noqa: E402
+from simulador_dg1022 import SimuladorResourceManager  # noqa: E402
+
+
+def conectar():
+    generador = GeneradorFunciones(resource_manager=SimuladorResourceManager(), ruta_cache=None)
+    generador.connect()
+    generador.channel_1(1000, 5, 10)
+    return generador
+
+
+def con_sleep(pasos, periodo):
+    generador = conectar()
+    inicio = time.monotonic()
+    atrasos = []
+    for i in range(pasos):
+        atrasos.append(time.monotonic() - inicio - i * periodo)
+        generador.channel_1(1000 + 100 * (i + 1), 5, 10)
+        time.sleep(periodo)
+    return atrasos
+
+
+def con_secuencia(pasos, periodo):
+    generador = conectar()
+    secuencia = SecuenciaProgramada(generador, [(i * periodo, {"channel_1": (1000 + 100 * (i + 1), 5, 10)})
+                                                for i in range(pasos)])
+    return [r["jitter"] for r in secuencia.ejecutar()]
+
+
+def main():
+    pasos = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    periodo = float(sys.argv[2]) if len(sys.argv) > 2 else 0.1
+    print("%-22s %14s %14s" % ("forma", "atraso final ms", "jitter max ms"))
+    for nombre, funcion in (("channel_1 + sleep", con_sleep), ("SecuenciaProgramada", con_secuencia)):
+        atrasos = funcion(pasos, periodo)
+        print("%-22s %14.2f %14.2f" % (nombre, atrasos[-1] * 1e3, max(abs(a) for a in atrasos) * 1e3))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark del servidor local (servidor_generador.py) con el simulador:
+  - Pedidos por segundo de un cliente esperando cada respuesta y enviandolos encadenados (pipelining).
+  - Latencia de una lectura respondida desde el cache contra una que pasa por la cola.
+  - Latencia de un cliente interactivo mientras otro cliente tiene cientos de pedidos en cola.
+
+Uso:
+    python bench_servidor.py [pedidos]
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, "BenjaminMorales"))
+sys.path.insert(0, os.path.join(RAIZ, "Herramientas"))
+
+from cliente_generador import ClienteGenerador  # noqa: E402
+from generador_funciones import GeneradorFunciones  # noqa: E402
+from servidor_generador import ServidorGenerador  # noqa: E402
+from simulador_dg1022 import SimuladorResourceManager  # noqa: E402
+
+DIRECCION = ("127.0.0.1", 5099)
+
+
+def iniciar_servidor(**opciones):
+    servidor = ServidorGenerador(GeneradorFunciones(resource_manager=SimuladorResourceManager(), ruta_cache=None),
+                                 **opciones)
+    loop = asyncio.new_event_loop()
+    listo = threading.Event()
+
+    def correr():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(servidor.iniciar(DIRECCION))
+        listo.set()
+        loop.run_forever()
+
+    threading.Thread(target=correr, daemon=True).start()
+    listo.wait()
+    return servidor, loop
+
+
+def medir(funcion, repeticiones=1):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) / repeticiones
+
+
+def main():
+    logging.basicConfig(level=logging.ERROR)
+    pedidos = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    servidor, loop = iniciar_servidor()
+    cliente = ClienteGenerador(DIRECCION)
+    cliente.connect()
+
+    secuencial = medir(lambda: [cliente.channel_2(1000 + i, 2) for i in range(pedidos)])
+    encadenado = medir(lambda: [f.result() for f in [cliente.enviar("channel_2", 2000 + i, 2) for i in range(pedidos)]])
+    print("%d escrituras, esperando cada una: %8.1f pedidos/s" % (pedidos, pedidos / secuencial))
+    print("%d escrituras, encadenadas:        %8.1f pedidos/s" % (pedidos, pedidos / encadenado))
+
+    cliente.read_channel_2_state()  # Llena el cache
+    print("lectura desde cache:      %7.3f ms" % (medir(cliente.read_channel_2_state, 200) * 1e3))
+    servidor.vigencia_cache = 0
+    print("lectura por la cola:      %7.3f ms" % (medir(cliente.read_channel_2_state, 200) * 1e3))
+
+    masivo = ClienteGenerador(DIRECCION)
+    masivo.connect()
+    futuros = [masivo.enviar("channel_2", 3000 + i, 2) for i in range(pedidos)]
+    interactivo = medir(lambda: cliente.channel_1(1000, 5, 10))
+    print("cliente interactivo con %d pedidos de otro cliente en cola: %.1f ms (%d de ellos ya atendidos)"
+          % (pedidos, interactivo * 1e3, sum(f.done() for f in futuros)))
+    for futuro in futuros:
+        futuro.result()
+    masivo.close()
+    cliente.close()
+    asyncio.run_coroutine_threadsafe(servidor.detener(), loop).result()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de latencia de GeneradorFunciones segun el modo de sincronizacion.
+
+Compara la espera fija original ("sleep", 0.5 s por comando) con la confirmacion por *OPC?
+y por peticion de servicio (SRQ) contra un DG1022 simulado. Imprime el tiempo de cada
+metodo publico en cada modo.
+
+Uso:
+    python bench_sincronizacion.py
+"""
+
+import contextlib
+import io
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, "BenjaminMorales"))
+sys.path.insert(0, os.path.join(RAIZ, "Herramientas"))
+
+from generador_funciones import GeneradorFunciones  # noqa: E402
+from simulador_dg1022 import SimuladorResourceManager  # noqa: E402
+
+METODOS = [
+    ("connect", ()),
+    ("turn_on", ()),
+    ("channel_1", (1000, 5, 10)),
+    ("read_channel_1_state", ()),
+    ("channel_2", (4800, 5)),
+    ("read_channel_2_state", ()),
+    ("turn_off", ()),
+]
+
+
+def medir_modo(modo):
+    """Retorna un diccionario metodo -> segundos para el modo de sincronizacion indicado."""
+    generador = GeneradorFunciones(modo_sincronizacion=modo, resource_manager=SimuladorResourceManager(),
+                                    ruta_cache=None)
+    tiempos = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for nombre, argumentos in METODOS:
+            inicio = time.perf_counter()
+            getattr(generador, nombre)(*argumentos)
+            tiempos[nombre] = time.perf_counter() - inicio
+    return tiempos
+
+
+def main():
+    modos = ("sleep", "opc", "srq")  # "sleep" reproduce el comportamiento anterior
+    resultados = {modo: medir_modo(modo) for modo in modos}
+    print("%-22s" % "metodo" + "".join("%12s" % modo for modo in modos))
+    for nombre, _ in METODOS:
+        print("%-22s" % nombre + "".join("%11.3fs" % resultados[modo][nombre] for modo in modos))
+    print("%-22s" % "TOTAL" + "".join("%11.3fs" % sum(resultados[modo].values()) for modo in modos))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+Microbenchmark de sintesis_formas: costo de generar cada forma la primera vez (fallo de cache)
+y al pedirla de nuevo (acierto), comparado con el calculo original de dg1022.gauss().
+
+Uso:
+    python bench_sintesis.py
+"""
+
+import os
+import sys
+import timeit
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, "PedroPerlaza"))
+
+import sintesis_formas  # noqa: E402
+
+FORMAS = (
+    ("tono_gaussiano", lambda: sintesis_formas.tono_gaussiano(20, sigma = 0.15)),
+    ("chirp", lambda: sintesis_formas.chirp(1, 100)),
+    ("sinc", lambda: sintesis_formas.sinc(12)),
+    ("coseno_alzado", lambda: sintesis_formas.coseno_alzado(16, 0.35)),
+    ("tren_cuadrado", lambda: sintesis_formas.tren_cuadrado(10, 0.25)),
+    ("tren_triangular", lambda: sintesis_formas.tren_triangular(10)),
+    ("armonicos", lambda: sintesis_formas.armonicos([1, 0.5, 0.33, 0.25, 0.2])),
+)
+
+
+def gauss_original(n):
+    """Copia del calculo anterior de dg1022.gauss, usada como referencia."""
+    t = np.linspace(0,1,100)
+    return np.exp(-((t-0.5)/0.5)**2)*np.sin(n*2*np.pi*t)
+
+
+def medir(funcion, repeticiones = 200):
+    return min(timeit.repeat(funcion, number=1, repeat=repeticiones))
+
+
+def main():
+    print("%16s %7s %12s %12s" % ("forma", "puntos", "fallo", "acierto"))
+    for nombre, funcion in FORMAS:
+        def fallo():
+            sintesis_formas.limpiar_cache()
+            funcion()
+        t_fallo = medir(fallo)
+        funcion()
+        t_acierto = medir(funcion)
+        print("%16s %7d %10.1fus %10.1fus" % (nombre, funcion().size, t_fallo * 1e6, t_acierto * 1e6))
+    print()
+    print("gauss original (100 puntos, sin cache): %.1fus" % (medir(lambda: gauss_original(5)) * 1e6))
+    print("cache:", sintesis_formas.info_cache())
+
+
+if __name__ == "__main__":
+    main()
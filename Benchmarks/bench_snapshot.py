@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de snapshot(): lee el estado completo del generador simulado (ambos canales, burst,
+disparo, salidas, barrido y forma arbitraria) con una consulta por campo, como hacian read_channel_*_state() y
+get_burst_state(), y con la consulta compuesta de snapshot(). Imprime viajes USB y tiempos.
+
+Uso:
+    python bench_snapshot.py [repeticiones]
+"""
+
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, "BenjaminMorales"))
+sys.path.insert(0, os.path.join(RAIZ, "Herramientas"))
+
+from generador_funciones import CONSULTAS_SNAPSHOT, GeneradorFunciones  # noqa: E402
+from simulador_dg1022 import SimuladorResourceManager  # noqa: E402
+
+
+def conectar(modo):
+    generador = GeneradorFunciones(modo_sincronizacion=modo, resource_manager=SimuladorResourceManager(),
+                                   ruta_cache=None)
+    generador.connect()
+    return generador
+
+
+def medir(funcion, repeticiones):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) / repeticiones
+
+
+def main():
+    repeticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    original = conectar("sleep")
+    original.espera_fallback = 0.1  # Espera fija de dg1022.write()
+    por_campo = conectar("opc")
+    compuesta = conectar("opc")
+    filas = [
+        ("por campo, espera fija", len(CONSULTAS_SNAPSHOT),
+         medir(lambda: [original._consultar(c) for c in CONSULTAS_SNAPSHOT], max(1, repeticiones // 10))),
+        ("por campo, sin espera", len(CONSULTAS_SNAPSHOT),
+         medir(lambda: [por_campo._consultar(c) for c in CONSULTAS_SNAPSHOT], repeticiones)),
+        ("snapshot()", 1, medir(compuesta.snapshot, repeticiones)),
+    ]
+    print("%-24s %8s %10s" % ("lectura", "viajes", "ms"))
+    for nombre, viajes, segundos in filas:
+        print("%-24s %8d %10.2f" % (nombre, viajes, segundos * 1e3))
+    print()
+    print(compuesta.snapshot())
+
+
+if __name__ == "__main__":
+    main()
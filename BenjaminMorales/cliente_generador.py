@@ -0,0 +1,235 @@
+import dataclasses
+import itertools
+import json
+import logging
+import os
+import socket
+import threading
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as TiempoAgotado
+
+from generador_funciones import EstadoGenerador, GeneradorFunciones, estado_desde_dict
+
+log = logging.getLogger(__name__)
+
+PUERTO = 5026 # 5025 es el puerto SCPI de los instrumentos en red; el servidor local usa el siguiente
+VARIABLE_ENTORNO = "DG1022_SERVIDOR" # "host:puerto" o ruta de un socket Unix
+
+
+def codificar_resultado(valor):
+    """Convierte el resultado de un metodo de GeneradorFunciones en algo que se puede enviar como JSON."""
+    if isinstance(valor, EstadoGenerador):
+        return {"EstadoGenerador": dataclasses.asdict(valor)}
+    return valor
+
+
+def decodificar_resultado(valor):
+    """Inverso de codificar_resultado(): reconstruye el EstadoGenerador de snapshot()."""
+    if isinstance(valor, dict) and "EstadoGenerador" in valor:
+        return estado_desde_dict(valor["EstadoGenerador"])
+    return valor
+
+
+def interpretar_direccion(texto):
+    """'host:puerto' -> (host, puerto); cualquier otro texto es la ruta de un socket Unix."""
+    host, separador, puerto = texto.rpartition(":")
+    if separador and puerto.isdigit():
+        return (host or "127.0.0.1", int(puerto))
+    return texto
+
+
+class ErrorServidor(Exception):
+    """Error que el servidor reporto al ejecutar un pedido."""
+
+
+class ClienteGenerador:
+    """
+    Cliente del servidor local (servidor_generador.py) con la misma interfaz que GeneradorFunciones.
+
+    El servidor es el único dueño de la sesión USB; varios programas (menú, scripts, dashboard) usan el
+    generador a través de él sin pelear por el dispositivo. Cada método envía un pedido y espera la
+    respuesta. enviar(metodo, *args) retorna un Future sin esperar, para encadenar varios pedidos sin
+    esperar cada respuesta (pipelining); el cliente se puede usar desde varios hilos.
+
+    Parámetros:
+        direccion: (host, puerto) o ruta de un socket Unix. Por defecto la variable de entorno
+                   DG1022_SERVIDOR o 127.0.0.1:PUERTO.
+        timeout (float): Segundos máximos de espera de cada respuesta.
+
+    connect() abre el socket y retorna True si el servidor tiene el generador conectado. disconnect() y
+    close() solo cierran el socket de este cliente: el generador sigue encendido para los demás.
+
+    Como en GeneradorFunciones, si el servidor reporta un error, no responde a tiempo o se corta la
+    conexión, el error se registra y los métodos que configuran retornan False y las lecturas None.
+    enviar() no atrapa nada: su Future termina con ErrorServidor o ConnectionError.
+
+    Ejemplo de uso:
+        generador = ClienteGenerador()
+        if generador.connect():
+            generador.channel_1(1000, 5, 10)
+            print(generador.read_channel_1_state())
+        generador.close()
+    """
+    def __init__(self, direccion=None, timeout=30.0):
+        if direccion is None:
+            direccion = interpretar_direccion(os.environ.get(VARIABLE_ENTORNO, "127.0.0.1:%d" % PUERTO))
+        self.direccion = direccion
+        self.timeout = timeout
+        self._socket = None
+        self._lector = None
+        self._esperando = {} # id del pedido -> Future
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _abrir_socket(self):
+        familia = socket.AF_UNIX if isinstance(self.direccion, str) else socket.AF_INET
+        conexion = socket.socket(familia, socket.SOCK_STREAM)
+        conexion.settimeout(self.timeout)
+        conexion.connect(self.direccion)
+        conexion.settimeout(None) # El hilo lector espera sin limite; el timeout se aplica a cada Future
+        if familia == socket.AF_INET:
+            conexion.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._socket = conexion
+        self._lector = threading.Thread(target=self._leer, args=(conexion,), name="cliente-dg1022", daemon=True)
+        self._lector.start()
+
+    def _leer(self, conexion):
+        ##############################################################################################
+        # Hilo lector: entrega cada respuesta al Future de su pedido. Si se corta la conexion, todos #
+        # los pedidos pendientes terminan con ConnectionError                                        #
+        ##############################################################################################
+        error = ConnectionError("Se perdió la conexión con el servidor")
+        try:
+            for linea in conexion.makefile("rb"):
+                respuesta = json.loads(linea)
+                with self._lock:
+                    futuro = self._esperando.pop(respuesta["id"], None)
+                if futuro is None:
+                    continue
+                if respuesta.get("error"):
+                    futuro.set_exception(ErrorServidor(respuesta["error"]))
+                else:
+                    futuro.set_result(decodificar_resultado(respuesta.get("resultado")))
+        except (OSError, ValueError) as e:
+            error = ConnectionError("Se perdió la conexión con el servidor: %s" % e)
+        with self._lock:
+            pendientes, self._esperando = self._esperando, {}
+            if self._socket is conexion:
+                self._socket = None
+        for futuro in pendientes.values():
+            futuro.set_exception(error)
+
+    def enviar(self, metodo, *args):
+        ###########################################################################
+        # Envia un pedido sin esperar la respuesta; retorna un Future              #
+        ###########################################################################
+        futuro = Future()
+        with self._lock:
+            if self._socket is None:
+                self._abrir_socket()
+            identificador = next(self._ids)
+            self._esperando[identificador] = futuro
+            mensaje = json.dumps({"id": identificador, "metodo": metodo, "args": list(args)}) + "\n"
+            try:
+                self._socket.sendall(mensaje.encode("utf-8"))
+            except OSError:
+                self._esperando.pop(identificador, None)
+                raise
+        return futuro
+
+    def _llamar(self, metodo, *args, fallo=False):
+        ##############################################################################################
+        # Envia el pedido y espera la respuesta. Si falla registra el error y retorna `fallo`         #
+        # (False en las configuraciones, None en las lecturas), como GeneradorFunciones               #
+        ##############################################################################################
+        try:
+            return self.enviar(metodo, *args).result(self.timeout)
+        except ErrorServidor as e:
+            log.error("El servidor del generador reportó un error en %s: %s", metodo, e)
+        except TiempoAgotado:
+            log.error("El servidor del generador no respondió %s en %s s.", metodo, self.timeout)
+        except (OSError, ConnectionError) as e:
+            log.error("Error de comunicación con el servidor del generador en %s: %s", metodo, e)
+        return fallo
+
+    def connect(self):
+        return bool(self._llamar("is_connected")) # Si el servidor no responde, _llamar registra el error
+
+    def is_connected(self):
+        return self._socket is not None
+
+    def turn_on(self):
+        return self._llamar("turn_on")
+
+    def turn_off(self):
+        return self._llamar("turn_off")
+
+    def channel_1(self, frecuencia, amplitud, ciclos, offset=0):
+        return self._llamar("channel_1", frecuencia, amplitud, ciclos, offset)
+
+    def channel_2(self, frecuencia=4800, amplitud=5, offset=0):
+        return self._llamar("channel_2", frecuencia, amplitud, offset)
+
+    def read_channel_1_state(self):
+        return self._llamar("read_channel_1_state", fallo=None)
+
+    def read_channel_2_state(self):
+        return self._llamar("read_channel_2_state", fallo=None)
+
+    def snapshot(self):
+        return self._llamar("snapshot", fallo=None)
+
+    def custom_signal(self, signal, v_max=1.0, v_min=-1.0):
+        return self._llamar("custom_signal", [float(v) for v in signal], v_max, v_min)
+
+    def barrido(self, frecuencia_inicio, frecuencia_fin, tiempo, espaciado="LIN", disparo="IMM"):
+        return self._llamar("barrido", frecuencia_inicio, frecuencia_fin, tiempo, espaciado, disparo, fallo=None)
+
+    def barrido_software(self, frecuencia_inicio, frecuencia_fin, puntos, tiempo=0, espaciado="LIN", canal=1):
+        return self._llamar("barrido_software", frecuencia_inicio, frecuencia_fin, puntos, tiempo, espaciado, canal)
+
+    def invalidar_estado(self, canal=None):
+        return self._llamar("invalidar_estado", canal, fallo=None)
+
+    def guardar_preset(self, nombre):
+        return self._llamar("guardar_preset", nombre)
+
+    def recuperar_preset(self, nombre, verificar=False):
+        return self._llamar("recuperar_preset", nombre, verificar)
+
+    def listar_presets(self):
+        return self._llamar("listar_presets", fallo=None)
+
+    def eliminar_preset(self, nombre):
+        return self._llamar("eliminar_preset", nombre)
+
+    def disconnect(self):
+        ###########################################################################
+        # Cierra el socket de este cliente; el generador queda en el servidor      #
+        ###########################################################################
+        with self._lock:
+            conexion, self._socket = self._socket, None
+        if conexion is not None:
+            try:
+                conexion.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            conexion.close()
+
+    close = disconnect
+
+
+def abrir_generador(**opciones):
+    """
+    Retorna un ClienteGenerador si hay un servidor local escuchando (o si DG1022_SERVIDOR esta definida),
+    o un GeneradorFunciones nuevo que abre el USB directamente. Asi el menu y los scripts comparten el
+    generador cuando el servidor esta corriendo.
+    """
+    cliente = ClienteGenerador(timeout=opciones.pop("timeout_servidor", 30.0))
+    try:
+        cliente._abrir_socket()
+        return cliente
+    except OSError:
+        if VARIABLE_ENTORNO in os.environ:
+            raise
+        return GeneradorFunciones(**opciones)
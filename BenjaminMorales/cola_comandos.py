@@ -0,0 +1,245 @@
+import collections
+import logging
+import threading
+from concurrent.futures import Future
+
+from generador_funciones import GeneradorFunciones
+
+log = logging.getLogger(__name__)
+
+
+class _Pedido:
+    # Llamada pendiente en la cola. `futuros` incluye los de los pedidos que se combinaron con este
+    __slots__ = ("metodo", "args", "kwargs", "clave", "futuros")
+
+    def __init__(self, metodo, args, kwargs, clave, futuro):
+        self.metodo = metodo
+        self.args = args
+        self.kwargs = kwargs
+        self.clave = clave
+        self.futuros = [futuro]
+
+
+class ColaComandos:
+    """
+    Serializa todas las llamadas a un driver (GeneradorFunciones, dg1022 o cualquier objeto) en un único
+    hilo de E/S alimentado por una cola, para usarlo desde varios hilos sin que los pares write/read de
+    uno se mezclen con los de otro en la sesión VISA.
+
+    enviar() encola la llamada y retorna un concurrent.futures.Future con su resultado. Las llamadas al
+    mismo método con la misma `clave` se combinan mientras esperan: si llega una nueva antes de que la
+    anterior empiece, la anterior toma sus argumentos y conserva su lugar en la cola (no pasa por delante
+    ni por detrás de las demás llamadas pendientes); los futuros de ambas reciben el resultado de la que
+    se ejecutó. Así, si se acumulan cinco cambios de frecuencia durante una transacción lenta, solo viaja
+    el último. Las llamadas sin clave se ejecutan todas, en orden, y las llamadas anteriores a una sin
+    clave ya no se combinan con las posteriores.
+
+    Parámetros:
+        objeto: Driver cuyas llamadas se serializan.
+        nombre (str): Nombre del hilo de E/S.
+
+    Una llamada encolada desde el propio hilo de E/S (por ejemplo dentro de un callback del futuro) se
+    ejecuta en el momento, porque esperarla en la cola bloquearía al hilo para siempre.
+
+    Ejemplo de uso:
+        with ColaComandos(generador) as cola:
+            futuro = cola.enviar("channel_2", 1000, 5, clave="channel_2")
+            print(futuro.result())
+    """
+    def __init__(self, objeto, nombre="dg1022-io"):
+        self.objeto = objeto
+        self._pendientes = collections.OrderedDict() # id -> _Pedido, en orden de ejecucion
+        self._por_clave = {} # (metodo, clave) -> id del pedido pendiente combinable
+        self._siguiente = 0
+        self._condicion = threading.Condition()
+        self._cerrada = False
+        self.estadisticas = {"encolados": 0, "ejecutados": 0, "combinados": 0, "errores": 0}
+        self._hilo = threading.Thread(target=self._trabajar, name=nombre, daemon=True)
+        self._hilo.start()
+
+    def enviar(self, metodo, *args, clave=None, **kwargs):
+        ##############################################################################################
+        # Encola objeto.metodo(*args, **kwargs) (o metodo(objeto, ...) si `metodo` es una funcion) y  #
+        # retorna un Future. Con `clave`, se combina con la llamada pendiente al mismo metodo y con   #
+        # la misma clave, en su lugar de la cola.                                                     #
+        ##############################################################################################
+        futuro = Future()
+        if threading.current_thread() is self._hilo:
+            self._ejecutar(_Pedido(metodo, args, kwargs, clave, futuro))
+            return futuro
+        with self._condicion:
+            if self._cerrada:
+                raise RuntimeError("La cola de comandos está cerrada")
+            self.estadisticas["encolados"] += 1
+            if clave is not None and (metodo, clave) in self._por_clave:
+                anterior = self._pendientes[self._por_clave[(metodo, clave)]]
+                anterior.args, anterior.kwargs = args, kwargs
+                anterior.futuros.append(futuro)
+                self.estadisticas["combinados"] += 1
+                return futuro
+            self._pendientes[self._siguiente] = _Pedido(metodo, args, kwargs, clave, futuro)
+            if clave is not None:
+                self._por_clave[(metodo, clave)] = self._siguiente
+            else:
+                self._por_clave.clear() # Lo anterior a una llamada sin clave debe ejecutarse antes que ella
+            self._siguiente += 1
+            self._condicion.notify()
+        return futuro
+
+    def pendientes(self):
+        with self._condicion:
+            return len(self._pendientes)
+
+    def _trabajar(self):
+        while True:
+            with self._condicion:
+                while not self._pendientes and not self._cerrada:
+                    self._condicion.wait()
+                if not self._pendientes:
+                    return # Cerrada y sin pedidos
+                indice, pedido = self._pendientes.popitem(last=False)
+                if self._por_clave.get((pedido.metodo, pedido.clave)) == indice:
+                    del self._por_clave[(pedido.metodo, pedido.clave)]
+            self._ejecutar(pedido)
+
+    def _ejecutar(self, pedido):
+        # Los futuros cancelados mientras esperaban no reciben resultado; si todos lo estan, no se ejecuta
+        futuros = [futuro for futuro in pedido.futuros if futuro.set_running_or_notify_cancel()]
+        if not futuros:
+            return
+        try:
+            if callable(pedido.metodo):
+                resultado = pedido.metodo(self.objeto, *pedido.args, **pedido.kwargs)
+            else:
+                resultado = getattr(self.objeto, pedido.metodo)(*pedido.args, **pedido.kwargs)
+        except Exception as e:
+            self.estadisticas["errores"] += 1
+            log.error("Error al ejecutar %s en la cola de comandos: %s", pedido.metodo, e)
+            for futuro in futuros:
+                futuro.set_exception(e)
+            return
+        finally:
+            self.estadisticas["ejecutados"] += 1
+        for futuro in futuros:
+            futuro.set_result(resultado)
+
+    def cancelar_pendientes(self):
+        ##############################################################################
+        # Cancela las llamadas que aun no empezaron; retorna cuantas se cancelaron    #
+        ##############################################################################
+        with self._condicion:
+            cantidad = len(self._pendientes)
+            for pedido in self._pendientes.values():
+                for futuro in pedido.futuros:
+                    futuro.cancel()
+            self._pendientes.clear()
+            self._por_clave.clear()
+        return cantidad
+
+    def cerrar(self, esperar=True):
+        ##############################################################################################
+        # No acepta mas pedidos; los pendientes se ejecutan igual. Con esperar=True espera al hilo    #
+        ##############################################################################################
+        with self._condicion:
+            self._cerrada = True
+            self._condicion.notify()
+        if esperar and threading.current_thread() is not self._hilo:
+            self._hilo.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+
+class GeneradorFuncionesConcurrente:
+    """
+    GeneradorFunciones seguro para varios hilos: toda la E/S pasa por el hilo de una ColaComandos y cada
+    método retorna un concurrent.futures.Future con lo que retornaría el método de GeneradorFunciones.
+
+    Las configuraciones se combinan mientras esperan en la cola (solo se envía la última de cada tipo,
+    en el lugar de la primera):
+        channel_1, channel_2, custom_signal, barrido: la última llamada de cada método.
+        turn_on, turn_off: las repetidas del mismo método; un turn_off y un turn_on se envían ambos.
+        recuperar_preset: se recupera el último preset pedido.
+        read_channel_1_state, read_channel_2_state, snapshot: las lecturas repetidas reciben todas la misma
+        respuesta, leída después de los comandos anteriores.
+    connect, disconnect, close, guardar_preset y barrido_software se ejecutan siempre, en orden.
+
+    Recibe los mismos argumentos que GeneradorFunciones. El GeneradorFunciones interno queda en
+    `generador`; no llame sus métodos directamente mientras la cola esté en uso.
+
+    Ejemplo de uso:
+        generador = GeneradorFuncionesConcurrente(resource_manager=rm)
+        generador.connect().result()
+        # desde cualquier hilo:
+        futuro = generador.channel_2(1000, 5)
+        print(futuro.result(), generador.read_channel_2_state().result())
+        generador.close().result()
+    """
+    def __init__(self, *args, **kwargs):
+        self.generador = GeneradorFunciones(*args, **kwargs)
+        self.cola = ColaComandos(self.generador)
+
+    def is_connected(self):
+        return self.generador.is_connected()
+
+    def connect(self):
+        return self.cola.enviar("connect")
+
+    def disconnect(self):
+        return self.cola.enviar("disconnect")
+
+    def turn_on(self):
+        return self.cola.enviar("turn_on", clave="salida")
+
+    def turn_off(self):
+        return self.cola.enviar("turn_off", clave="salida")
+
+    def channel_1(self, frecuencia, amplitud, ciclos, offset=0):
+        return self.cola.enviar("channel_1", frecuencia, amplitud, ciclos, offset, clave="channel_1")
+
+    def channel_2(self, frecuencia=4800, amplitud=5, offset=0):
+        return self.cola.enviar("channel_2", frecuencia, amplitud, offset, clave="channel_2")
+
+    def read_channel_1_state(self):
+        return self.cola.enviar("read_channel_1_state", clave="read_channel_1_state")
+
+    def read_channel_2_state(self):
+        return self.cola.enviar("read_channel_2_state", clave="read_channel_2_state")
+
+    def snapshot(self):
+        return self.cola.enviar("snapshot", clave="snapshot")
+
+    def custom_signal(self, signal, v_max=1.0, v_min=-1.0):
+        return self.cola.enviar("custom_signal", signal, v_max, v_min, clave="custom_signal")
+
+    def barrido(self, frecuencia_inicio, frecuencia_fin, tiempo, espaciado="LIN", disparo="IMM"):
+        return self.cola.enviar("barrido", frecuencia_inicio, frecuencia_fin, tiempo, espaciado, disparo,
+                                clave="barrido")
+
+    def guardar_preset(self, nombre):
+        return self.cola.enviar("guardar_preset", nombre)
+
+    def recuperar_preset(self, nombre, verificar=False):
+        return self.cola.enviar("recuperar_preset", nombre, verificar, clave="preset")
+
+    def barrido_software(self, frecuencia_inicio, frecuencia_fin, puntos, tiempo=0, espaciado="LIN", canal=1):
+        return self.cola.enviar("barrido_software", frecuencia_inicio, frecuencia_fin, puntos, tiempo,
+                                espaciado, canal)
+
+    def ejecutar(self, funcion, *args, **kwargs):
+        ##############################################################################################
+        # Ejecuta funcion(generador, *args, **kwargs) en el hilo de E/S, sin combinar. Sirve para     #
+        # secuencias que deben ir juntas, por ejemplo un lote: ejecutar(lambda g: ...)                #
+        ##############################################################################################
+        return self.cola.enviar(funcion, *args, **kwargs)
+
+    def close(self):
+        ###################################################################
+        # Cierra la conexion y detiene el hilo de E/S al terminar         #
+        ###################################################################
+        futuro = self.cola.enviar("close")
+        self.cola.cerrar(esperar=False) # El hilo termina despues de ejecutar close y lo que estaba antes
+        return futuro
@@ -0,0 +1,196 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from generador_funciones import FILTRO_VISA, GeneradorFunciones
+from importacion_diferida import importar_diferido # Herramientas, agregado a sys.path por generador_funciones
+
+log = logging.getLogger(__name__)
+pyvisa = importar_diferido("pyvisa")
+
+
+class FlotaGeneradores:
+    """
+    Controla varios generadores RIGOL DG1022 en paralelo.
+
+    descubrir() busca todos los recursos VISA RIGOL que contienen 'DG1D200', los conecta en paralelo y los
+    identifica por el número de serie que responde *IDN?. aplicar() envía configuraciones a todas las
+    unidades a la vez desde un pool de hilos (una sesión VISA por unidad), con un tiempo límite para la
+    llamada completa, y retorna el resultado y el tiempo de cada una. Así reconfigurar el rack completo
+    toma lo que tarda la unidad más lenta y no la suma de todas.
+
+    Una unidad que no termina a tiempo queda ocupada: su hilo no se puede interrumpir y sigue usando la
+    sesión VISA, por eso las llamadas siguientes no le envían nada (su resultado es el error "ocupada")
+    hasta que ese hilo termine.
+
+    Parámetros:
+        resource_manager: ResourceManager compartido por todas las unidades (por defecto uno de pyvisa).
+        timeout: Segundos máximos de cada llamada a descubrir() o aplicar(), contados desde que empieza;
+            las unidades que no terminaron para entonces quedan con el error "timeout". Con más unidades
+            que max_hilos, las que esperan un hilo libre consumen el mismo plazo.
+        max_hilos: Cantidad máxima de unidades atendidas a la vez.
+        **opciones: Argumentos para cada GeneradorFunciones (modo_sincronizacion, espera_fallback, ...).
+
+    Configuraciones:
+        Una configuración es un diccionario {metodo: argumentos} que se ejecuta en orden sobre la unidad,
+        por ejemplo {"channel_1": (1000, 5, 10), "channel_2": (4800, 5), "turn_on": ()}, o una función
+        que recibe el GeneradorFunciones de la unidad.
+
+    Ejemplo de uso:
+        flota = FlotaGeneradores()
+        flota.descubrir()
+        resultados = flota.aplicar_a_todos({"channel_1": (1000, 5, 10), "turn_on": ()})
+        for serie, resultado in resultados.items():
+            print(serie, resultado["ok"], resultado["segundos"])
+        flota.close()
+    """
+    FILTRO = "DG1D200" # Texto que identifica a un DG1022 en el nombre del recurso VISA
+
+    def __init__(self, resource_manager=None, timeout=10.0, max_hilos=16, **opciones):
+        self.pyvisa = resource_manager if resource_manager is not None else pyvisa.ResourceManager()
+        self.timeout = timeout
+        self.opciones = opciones
+        self.unidades = {} # numero de serie -> GeneradorFunciones conectado
+        self._ocupadas = {} # serie o recurso -> futuro de una tarea que supero el timeout y sigue en curso
+        self._executor = ThreadPoolExecutor(max_workers=max_hilos, thread_name_prefix="flota")
+
+    def _en_paralelo(self, tareas, al_terminar_vencida=None):
+        #####################################################################################################
+        # Ejecuta {clave: funcion} en el pool y retorna {clave: {"ok", "segundos", "resultado", "error"}}    #
+        # Las unidades que no terminan dentro de self.timeout quedan con error "timeout". Su hilo no se puede #
+        # interrumpir: el resultado se entrega sin esperarlas y la clave queda en self._ocupadas hasta que   #
+        # el hilo termina; entonces se llama al_terminar_vencida(clave), si se entrego.                     #
+        #####################################################################################################
+        def medir(funcion):
+            inicio = time.perf_counter()
+            try:
+                resultado = funcion()
+                return {"ok": resultado is not False, "resultado": resultado, "error": None,
+                        "segundos": time.perf_counter() - inicio}
+            except Exception as e:
+                return {"ok": False, "resultado": None, "error": str(e), "segundos": time.perf_counter() - inicio}
+
+        futuros = {clave: self._executor.submit(medir, funcion) for clave, funcion in tareas.items()}
+        wait(futuros.values(), timeout=self.timeout)
+        resultados = {}
+        for clave, futuro in futuros.items():
+            if futuro.done():
+                resultados[clave] = futuro.result()
+            else:
+                resultados[clave] = {"ok": False, "resultado": None, "error": "timeout", "segundos": self.timeout}
+                self._ocupadas[clave] = futuro
+                futuro.add_done_callback(lambda _, c=clave: self._liberar(c, al_terminar_vencida))
+        return resultados
+
+    def _liberar(self, clave, al_terminar_vencida):
+        ##############################################################################
+        # Corre en el hilo de la tarea vencida cuando por fin termina                 #
+        ##############################################################################
+        try:
+            if al_terminar_vencida is not None:
+                al_terminar_vencida(clave)
+        finally:
+            self._ocupadas.pop(clave, None)
+            log.info("%s terminó la tarea que había superado el tiempo límite.", clave)
+
+    def ocupada(self, clave):
+        ##############################################################################
+        # True si la unidad (serie o recurso) sigue con una tarea vencida en curso    #
+        ##############################################################################
+        return clave in self._ocupadas
+
+    @staticmethod
+    def _resultado_ocupada():
+        return {"ok": False, "resultado": None, "error": "ocupada", "segundos": 0.0}
+
+    def descubrir(self):
+        ##############################################################################################
+        # Lista los recursos DG1022, los conecta en paralelo y los registra por numero de serie.     #
+        # Los recursos de unidades ya registradas no se vuelven a abrir, y los que siguen ocupados   #
+        # por una conexion vencida se reportan "ocupada". Retorna {recurso: resultado}               #
+        ##############################################################################################
+        registrados = {g.recurso_conectado for g in self.unidades.values()}
+        recursos = [r for r in self.pyvisa.list_resources(FILTRO_VISA) if self.FILTRO in r and r not in registrados]
+        libres = [r for r in recursos if not self.ocupada(r)]
+        generadores = {r: GeneradorFunciones(resource_manager=self.pyvisa, recurso=r, **self.opciones)
+                       for r in libres}
+        # Una conexion vencida que termina despues no queda en la flota: solo se cierra su sesion,
+        # sin disconnect() que enviaria OUTP OFF a una unidad que no se llego a configurar
+        resultados = self._en_paralelo({r: generadores[r].connect for r in libres},
+                                       al_terminar_vencida=lambda r: self._cerrar_sesion(generadores[r]))
+        resultados.update({r: self._resultado_ocupada() for r in recursos if r not in generadores})
+        for recurso, resultado in resultados.items():
+            generador = generadores.get(recurso)
+            if generador is not None and resultado["ok"] and generador.identificacion:
+                self.unidades[generador.identificacion.get("serie", recurso)] = generador
+            else:
+                log.warning("No se pudo conectar %s: %s", recurso, resultado["error"] or "sin respuesta")
+        log.info("Generadores conectados: %s (%s recursos nuevos)", len(self.unidades), len(recursos))
+        return resultados
+
+    @staticmethod
+    def _cerrar_sesion(generador):
+        ##############################################################################
+        # Cierra la sesion VISA de la unidad sin enviarle ningun comando              #
+        ##############################################################################
+        if generador.instrument is None:
+            return
+        try:
+            generador.instrument.close()
+        except Exception as e:
+            log.warning("No se pudo cerrar la sesión de %s: %s", generador.recurso_conectado, e)
+        generador.instrument = None
+
+    def _ejecutar_configuracion(self, generador, configuracion):
+        ################################################################################
+        # Aplica una configuracion (diccionario de metodos o funcion) a una unidad     #
+        # Retorna False si algun metodo reporto un fallo                               #
+        ################################################################################
+        if callable(configuracion):
+            return configuracion(generador)
+        resultados = [getattr(generador, metodo)(*argumentos) for metodo, argumentos in configuracion.items()]
+        return all(resultado is not False for resultado in resultados)
+
+    def aplicar(self, configuraciones):
+        #############################################################################################
+        # Aplica a cada unidad su configuracion: {serie: configuracion}.                             #
+        # Retorna {serie: {"ok", "segundos", "resultado", "error"}}                                  #
+        #############################################################################################
+        desconocidas = set(configuraciones) - set(self.unidades)
+        if desconocidas:
+            raise KeyError(f"Generadores no descubiertos: {', '.join(sorted(desconocidas))}")
+        inicio = time.perf_counter()
+        resultados = self._en_paralelo({
+            serie: (lambda g=self.unidades[serie], c=configuracion: self._ejecutar_configuracion(g, c))
+            for serie, configuracion in configuraciones.items() if not self.ocupada(serie)
+        })
+        resultados.update({serie: self._resultado_ocupada() for serie in configuraciones if serie not in resultados})
+        total = time.perf_counter() - inicio
+        fallidas = [serie for serie, resultado in resultados.items() if not resultado["ok"]]
+        log.info("Configuradas %s de %s unidades en %.3f s", len(resultados) - len(fallidas), len(resultados), total)
+        return resultados
+
+    def aplicar_a_todos(self, configuracion):
+        #############################################################
+        # Aplica la misma configuracion a todas las unidades        #
+        #############################################################
+        return self.aplicar({serie: configuracion for serie in self.unidades})
+
+    def close(self):
+        ###########################################################################################
+        # Desconecta todas las unidades y cierra el ResourceManager compartido una sola vez       #
+        # Las unidades ocupadas no se tocan: su hilo todavia usa la sesion. Se espera a esos      #
+        # hilos hasta self.timeout; si alguno sigue en curso el ResourceManager queda abierto,    #
+        # porque cerrarlo invalidaria la sesion que ese hilo esta usando.                         #
+        ###########################################################################################
+        for serie in self._ocupadas:
+            log.warning("%s sigue ocupada con una tarea vencida, no se desconecta.", serie)
+        self._en_paralelo({serie: generador.disconnect for serie, generador in self.unidades.items()
+                           if not self.ocupada(serie)})
+        self.unidades.clear()
+        _, pendientes = wait(list(self._ocupadas.values()), timeout=self.timeout)
+        self._executor.shutdown(wait=False)
+        if pendientes:
+            log.warning("%s tareas vencidas siguen en curso, el ResourceManager no se cierra.", len(pendientes))
+            return
+        self.pyvisa.close()
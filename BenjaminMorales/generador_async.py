@@ -0,0 +1,77 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from generador_funciones import GeneradorFunciones
+
+
+class GeneradorFuncionesAsync:
+    """
+    Contraparte asyncio de GeneradorFunciones para controlar varios instrumentos desde un mismo proceso.
+
+    Cada instancia tiene un hilo de E/S propio: las llamadas VISA bloqueantes se ejecutan en ese hilo
+    con run_in_executor, así el event loop nunca se bloquea y las operaciones de un mismo instrumento
+    no se mezclan en la sesión VISA. Con los modos de sincronización "opc"/"srq" no hay esperas fijas;
+    en el modo "sleep" la espera ocurre en el hilo del instrumento, no en el event loop.
+
+    Métodos (todos son corutinas):
+        connect(), disconnect(), close(), turn_on(), turn_off(),
+        channel_1(frecuencia, amplitud, ciclos, offset=0), channel_2(frecuencia=4800, amplitud=5, offset=0),
+        read_channel_1_state(), read_channel_2_state(), custom_signal(signal, v_max=1.0, v_min=-1.0)
+    Recibe los mismos argumentos que GeneradorFunciones.
+
+    Ejemplo de uso (varios generadores configurados en paralelo):
+        async def configurar(generadores):
+            await asyncio.gather(*(g.connect() for g in generadores))
+            await asyncio.gather(*(g.channel_1(1000, 5, 10) for g in generadores))
+
+        asyncio.run(configurar([GeneradorFuncionesAsync(), GeneradorFuncionesAsync(resource_manager=rm)]))
+    """
+    def __init__(self, *args, **kwargs):
+        self.generador = GeneradorFunciones(*args, **kwargs) # Driver sincrono que realiza la E/S
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dg1022")
+
+    async def _ejecutar(self, metodo, *args):
+        ##############################################################################
+        # Ejecuta un metodo del driver sincrono en el hilo de E/S de este instrumento #
+        ##############################################################################
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: metodo(*args))
+
+    def is_connected(self):
+        return self.generador.is_connected()
+
+    async def connect(self):
+        return await self._ejecutar(self.generador.connect)
+
+    async def disconnect(self):
+        return await self._ejecutar(self.generador.disconnect)
+
+    async def turn_on(self):
+        return await self._ejecutar(self.generador.turn_on)
+
+    async def turn_off(self):
+        return await self._ejecutar(self.generador.turn_off)
+
+    async def channel_1(self, frecuencia, amplitud, ciclos, offset=0):
+        return await self._ejecutar(self.generador.channel_1, frecuencia, amplitud, ciclos, offset)
+
+    async def channel_2(self, frecuencia=4800, amplitud=5, offset=0):
+        return await self._ejecutar(self.generador.channel_2, frecuencia, amplitud, offset)
+
+    async def read_channel_1_state(self):
+        return await self._ejecutar(self.generador.read_channel_1_state)
+
+    async def read_channel_2_state(self):
+        return await self._ejecutar(self.generador.read_channel_2_state)
+
+    async def custom_signal(self, signal, v_max=1.0, v_min=-1.0):
+        return await self._ejecutar(self.generador.custom_signal, signal, v_max, v_min)
+
+    async def close(self):
+        ###################################################################
+        # Cierra la conexion y libera el hilo de E/S de este instrumento  #
+        ###################################################################
+        try:
+            return await self._ejecutar(self.generador.close)
+        finally:
+            self._executor.shutdown(wait=False)
@@ -1,6 +1,172 @@
-import pyvisa
+import contextlib
+import dataclasses
+import json
+import logging
+import math
+import os
+import random
+import sys
 import time
 
+CARPETA = os.path.dirname(os.path.abspath(__file__))
+# importar_diferido() es compartido con el driver de PedroPerlaza y esta en Herramientas
+sys.path.append(os.path.join(os.path.dirname(CARPETA), "Herramientas"))
+from importacion_diferida import importar_diferido  # noqa: E402
+
+# Los mensajes se emiten con logging: el programa que usa la clase decide el nivel (los menus usan INFO)
+log = logging.getLogger(__name__)
+
+# Importar pyvisa toma del orden de 0.2 s y no hace falta hasta crear el ResourceManager
+pyvisa = importar_diferido("pyvisa")
+# hashlib (OpenSSL) suma varios ms y solo se usa con los presets
+presets = importar_diferido("presets", os.path.join(CARPETA, "presets.py"))
+
+# Consulta VISA que solo enumera generadores RIGOL DG1022 por USB (vendor 0x1AB1, producto 0x0588)
+FILTRO_VISA = "USB?*::0x1AB1::0x0588::?*::INSTR"
+RUTA_CACHE = os.path.join(os.path.expanduser("~"), ".generador_funciones.json") # Ultimo recurso conocido
+RUTA_PRESETS = os.path.join(os.path.expanduser("~"), ".generador_presets.json") # Indice de presets (presets.py)
+
+# Rangos que aceptan el menu y las recetas (minimo, maximo)
+RANGO_FRECUENCIA = (0.000001, 20000000) # Hz
+RANGO_CICLOS = (1, 50000)
+RANGO_AMPLITUD = (0.002, 10) # Vpp
+
+
+class ErrorSCPI(Exception):
+    """Error reportado por el generador en su cola de errores (SYST:ERR?)."""
+
+
+class EstimadorTimeout:
+    """
+    Timeout adaptativo de un tipo de operacion VISA, calculado como el RTO de TCP (RFC 6298):
+    promedio movil de la latencia mas 4 veces su desviacion, entre `minimo` y `maximo` segundos.
+    Mientras no hay medidas usa `inicial`. Cada timeout duplica el valor hasta la siguiente medida.
+    """
+    def __init__(self, inicial, minimo, maximo):
+        self.inicial, self.minimo, self.maximo = inicial, minimo, maximo
+        self.promedio = None
+        self.desviacion = None
+        self.valor = inicial
+
+    def registrar(self, segundos):
+        if self.promedio is None:
+            self.promedio, self.desviacion = segundos, segundos / 2
+        else:
+            self.desviacion = 0.75 * self.desviacion + 0.25 * abs(self.promedio - segundos)
+            self.promedio = 0.875 * self.promedio + 0.125 * segundos
+        self.valor = min(self.maximo, max(self.minimo, self.promedio + 4 * self.desviacion))
+
+    def expirado(self):
+        self.valor = min(self.maximo, 2 * self.valor)
+
+
+# Campos del modelo en memoria de cada canal (None = valor desconocido). "barrido" es SWE:STAT (solo canal 1)
+CAMPOS_ESTADO = ("funcion", "frecuencia", "amplitud", "offset", "burst", "modo_burst",
+                 "ciclos", "fase", "disparo", "salida", "barrido")
+CAMPOS_APPLY = ("funcion", "frecuencia", "amplitud", "offset")
+CAMPOS_BURST = ("burst", "modo_burst", "ciclos", "fase", "disparo")
+
+
+def formato_apply(estado):
+    """Arma la respuesta de APPLy? a partir del modelo: 'SIN,1.000000e+03,5.000000e+00,0.000000e+00'."""
+    return "%s,%e,%e,%e" % (estado["funcion"], estado["frecuencia"], estado["amplitud"], estado["offset"])
+
+
+def interpretar_apply(respuesta):
+    """
+    Convierte la respuesta de APPLy? en un diccionario con funcion, frecuencia, amplitud y offset.
+    Acepta tanto 'SIN,1.0e+03,5.0e+00,0.0e+00' como 'CH1:"SIN,1.0e+03,5.0e+00,0.0e+00"'.
+    """
+    respuesta = respuesta.strip()
+    if '"' in respuesta:
+        respuesta = respuesta.split('"')[1]
+    campos = respuesta.split(",")
+    estado = {"funcion": campos[0].strip().upper()}
+    for clave, valor in zip(CAMPOS_APPLY[1:], campos[1:]):
+        estado[clave] = float(valor)
+    return estado
+
+
+@dataclasses.dataclass(frozen=True)
+class EstadoCanal:
+    """Estado de un canal leido con snapshot()."""
+    funcion: str
+    frecuencia: float
+    amplitud: float
+    offset: float
+    salida: bool
+
+
+@dataclasses.dataclass(frozen=True)
+class EstadoBurst:
+    """Configuracion del modo Burst del canal 1 leida con snapshot()."""
+    activo: bool
+    modo: str
+    ciclos: int
+    fase: float
+
+
+@dataclasses.dataclass(frozen=True)
+class EstadoBarrido:
+    """Configuracion del barrido de frecuencia del canal 1 leida con snapshot()."""
+    activo: bool
+    inicio: float
+    fin: float
+    espaciado: str
+    tiempo: float
+
+
+@dataclasses.dataclass(frozen=True)
+class EstadoGenerador:
+    """Estado completo e inmutable del generador retornado por snapshot()."""
+    canal_1: EstadoCanal
+    canal_2: EstadoCanal
+    burst: EstadoBurst
+    disparo: str
+    barrido: EstadoBarrido
+    forma_usuario: str # Forma arbitraria seleccionada para FUNC:USER (VOLATILE o el nombre de una ranura)
+    instante: float # time.monotonic() del momento de la lectura
+
+
+# Consultas de snapshot(), en el orden en que llegan las respuestas de la consulta compuesta
+CONSULTAS_SNAPSHOT = ("APPLy?", "OUTP?", "APPLy:CH2?", "OUTP:CH2?", "BURS:STAT?", "BURS:MODE?",
+                      "BURS:NCYC?", "BURS:PHAS?", "TRIG:SOUR?", "SWE:STAT?", "FREQ:STAR?", "FREQ:STOP?",
+                      "SWE:SPAC?", "SWE:TIME?", "FUNC:USER?")
+
+
+def interpretar_snapshot(respuestas, instante):
+    """Convierte las respuestas a CONSULTAS_SNAPSHOT (en el mismo orden) en un EstadoGenerador."""
+    r = [respuesta.strip() for respuesta in respuestas]
+    encendido = lambda texto: texto.upper() in ("ON", "1")
+    return EstadoGenerador(
+        canal_1=EstadoCanal(salida=encendido(r[1]), **interpretar_apply(r[0])),
+        canal_2=EstadoCanal(salida=encendido(r[3]), **interpretar_apply(r[2])),
+        burst=EstadoBurst(activo=encendido(r[4]), modo=r[5].upper(), ciclos=int(float(r[6])), fase=float(r[7])),
+        disparo=r[8].upper(),
+        barrido=EstadoBarrido(activo=encendido(r[9]), inicio=float(r[10]), fin=float(r[11]),
+                              espaciado=r[12].upper()[:3], tiempo=float(r[13])),
+        forma_usuario=r[14].upper(),
+        instante=instante,
+    )
+
+
+def estado_desde_dict(campos):
+    """Reconstruye un EstadoGenerador desde dataclasses.asdict() (JSON del servidor o índice de presets)."""
+    campos = dict(campos)
+    campos["canal_1"] = EstadoCanal(**campos["canal_1"])
+    campos["canal_2"] = EstadoCanal(**campos["canal_2"])
+    campos["burst"] = EstadoBurst(**campos["burst"])
+    campos["barrido"] = EstadoBarrido(**campos["barrido"])
+    return EstadoGenerador(**campos)
+
+
+class Grabacion(list):
+    """Comandos capturados por GeneradorFunciones.grabar(); `avisos` son los mensajes de registro pendientes."""
+    def __init__(self):
+        super().__init__()
+        self.avisos = []
+
+
 class GeneradorFunciones:
     """
     Clase para controlar un generador de funciones RIGOL DG1022 mediante VISA.
@@ -11,8 +177,9 @@ class GeneradorFunciones:
 
     Métodos:
         connect(): Intenta conectar con el generador de funciones especificado en la lista de recursos VISA.
-                   Busca un dispositivo que contenga 'DG1D200' en su descripción. Si lo encuentra, establece
-                   una conexión y configura un tiempo de espera. Retorna True si la conexión es exitosa.
+                   Busca el recurso `recurso` o, si no se indicó, un dispositivo que contenga 'DG1D200' en su
+                   descripción. Si lo encuentra, establece una conexión y configura un tiempo de espera.
+                   Retorna True si la conexión es exitosa.
         disconnect(): Cierra la conexión activa con el generador y apaga el dispositivo de forma segura.
         is_connected(): Verifica si hay una conexión activa con el generador de funciones.
         turn_on(): Enciende el generador de funciones si está conectado.
@@ -22,9 +189,85 @@ class GeneradorFunciones:
         channel_2(frecuencia=4800, amplitud=5, offset=0): Configura el canal 2 con una onda sinusoidal.
         read_channel_1_state(): Consulta y retorna el estado actual del canal 1.
         read_channel_2_state(): Consulta y retorna el estado actual del canal 2.
-        handle_disconnection(): Maneja la desconexión intentando cerrar la conexión actual y
-                                reconectando si es posible.
+        custom_signal(signal, v_max=1.0, v_min=-1.0): Carga una señal arbitraria en la memoria volátil
+                                                      y la selecciona en el canal 1.
+        handle_disconnection(): Cierra la conexión actual y reintenta conectar con espera exponencial;
+                                retorna True si se reconectó (ver "Reconexión").
         close(): Cierra todos los recursos VISA asociados al generador de funciones.
+        Los métodos que configuran el generador (turn_on, turn_off, channel_1, channel_2, custom_signal)
+        retornan True si la configuración se aplicó y False si falló.
+        lote(): Context manager que agrupa los comandos enviados dentro del bloque en un solo mensaje SCPI.
+        grabar(): Context manager que captura los comandos del bloque sin enviarlos; con agrupar_mensajes()
+                  y enviar_mensajes() se envian despues (ver secuencia.py).
+        resincronizar(canal=None): Vuelve a leer del generador el estado de ambos canales.
+        snapshot(): Lee ambos canales, burst, disparo, salidas, barrido y forma arbitraria seleccionada
+                    en una sola consulta compuesta y retorna un EstadoGenerador inmutable
+                    (EstadoCanal, EstadoBurst, EstadoBarrido).
+        invalidar_estado(canal=None): Descarta el modelo en memoria de uno o ambos canales.
+        guardar_preset(nombre): Guarda la configuración completa actual en una ranura *SAV del generador.
+        recuperar_preset(nombre, verificar=False): Vuelve a esa configuración con un solo *RCL.
+        listar_presets(): Retorna los presets de este generador; eliminar_preset(nombre) quita uno.
+        timeouts(): Retorna el timeout VISA actual (segundos) de cada tipo de operación.
+        barrido(frecuencia_inicio, frecuencia_fin, tiempo, ...): Programa el barrido de frecuencia interno
+                                                                del generador en el canal 1.
+        barrido_software(frecuencia_inicio, frecuencia_fin, puntos, tiempo, ...): Recorre las frecuencias
+                                                                desde Python con un calendario fijo.
+
+    Sincronización:
+        Cada escritura se confirma con el modo indicado en `modo_sincronizacion`:
+            "opc":   consulta *OPC? y espera la respuesta (el generador la entrega al terminar el comando).
+            "srq":   habilita el bit OPC en *ESE/*SRE, envía *OPC y espera la petición de servicio VISA.
+            "sleep": espera fija de `espera_fallback` segundos (comportamiento original).
+        Si el instrumento no soporta el modo elegido, connect() vuelve automáticamente a "sleep".
+
+    Lotes de comandos:
+        Dentro de `with generador.lote():` los comandos no se envían uno a uno: al cerrar el bloque se
+        unen con ';' en la menor cantidad de mensajes que acepta el buffer de entrada del DG1022
+        (LONGITUD_MAXIMA_MENSAJE) y la cola de errores se revisa una sola vez con SYST:ERR?.
+        Si el generador reporta errores se lanza ErrorSCPI.
+
+    Estado en memoria:
+        La clase mantiene un modelo de ambos canales (forma de onda, frecuencia, amplitud, offset,
+        burst, ciclos y salida). read_channel_*_state() responde desde ese modelo sin usar el USB y
+        channel_*()/turn_*() solo envían los parámetros que cambiaron. El modelo asume que nadie más
+        modifica el generador: si se usa el panel frontal llame a invalidar_estado(). Con
+        `periodo_resincronizacion` (segundos) las lecturas vuelven a consultar APPLy? cuando el
+        modelo tiene más antigüedad que ese periodo.
+
+    Conexión:
+        El constructor no enumera recursos. connect() prueba primero el último recurso conocido, guardado
+        en `ruta_cache`, con un solo *IDN?; solo si falla enumera los recursos con la consulta
+        `filtro_visa`, que evita recorrer los backends serie/GPIB. El tiempo de conexión se imprime y
+        queda en `tiempo_conexion`.
+
+    Mensajes e instrumentación:
+        Los mensajes se emiten con el logger "generador_funciones" (logging) en vez de print(): INFO para
+        las confirmaciones, WARNING/ERROR para los fallos. Con `instrumentacion` (un objeto
+        Instrumentacion de Herramientas/instrumentacion.py) cada write/read/query queda medido por
+        cabecera SCPI, junto con las esperas deliberadas (time.sleep). Un GrabadorSCPI
+        (Herramientas/grabador_scpi.py) en el mismo parámetro escribe además cada operación en un diario
+        para analizarla o reproducirla sin el equipo. Sin instrumentación la sesión VISA se usa directamente.
+
+    Presets:
+        guardar_preset() lee el estado del generador y lo guarda con *SAV en una de RANURAS_PRESET.
+        Un índice en `ruta_presets` (presets.py) asocia el nombre a la ranura, la huella SHA-1 y el
+        estado guardado; si la configuración no cambió no se vuelve a escribir la ranura. Recuperar
+        envía un solo mensaje ("*RCL n;:SYST:ERR?", un viaje USB) en vez de reenviar cada parámetro, y
+        el modelo en memoria toma el estado del índice. Con verificar=True se lee el estado (un viaje
+        más) y si no coincide con la huella la ranura se marca obsoleta: fue sobrescrita fuera de este
+        programa y no se recupera hasta guardarla de nuevo.
+
+    Reconexión:
+        Ante un error de comunicación, handle_disconnection() hace hasta REINTENTOS_RECONEXION intentos con
+        espera exponencial con jitter (entre la mitad y el total de RECONEXION_BASE * 2**intento, hasta
+        RECONEXION_MAXIMA segundos). Cada intento prueba el último recurso y, si no responde, vuelve a enumerar los recursos
+        buscando el mismo número de serie (el USB pudo re-enumerarse con otro nombre). Si se reconecta, la
+        operación que falló se repite una vez: todas envían valores absolutos (APPLy, FREQ, OUTP ON...),
+        así que repetirlas es idempotente. Si no, el circuito queda abierto durante PAUSA_CIRCUITO segundos
+        (duplicándose hasta PAUSA_CIRCUITO_MAXIMA si sigue fallando): los métodos retornan False de
+        inmediato, sin esperas, y pasada la pausa el siguiente llamado hace un único intento de reconexión.
+        Con `timeout_adaptativo` el timeout VISA de cada tipo de operación (consulta, sincronización, lote,
+        carga de datos) se ajusta a su latencia medida (EstimadorTimeout) en vez de usar 10 s para todo.
 
     Ejemplo de uso:
         generador = GeneradorFunciones()
@@ -36,19 +279,74 @@ class GeneradorFunciones:
             generador.turn_off()
         generador.close()
     """
-    def __init__(self):
-        self.pyvisa = pyvisa.ResourceManager() # Instancia de PYVISA, Gestor de comunicaciones con los dispositivos
-        self.pyvisa_list = self.pyvisa.list_resources()
+    MODOS_SINCRONIZACION = ("opc", "srq", "sleep")
+    PUNTOS_MAXIMOS = 4096 # Puntos que acepta la memoria volatil del DG1022
+    DAC_MAXIMO = 16383 # El DAC del DG1022 es de 14 bits
+    LONGITUD_MAXIMA_MENSAJE = 256 # Caracteres por mensaje SCPI que se envian juntos al buffer de entrada
+    TIMEOUT_INICIAL = 10.0 # Segundos de timeout VISA hasta tener medidas de latencia (y al abrir la sesion)
+    TIMEOUT_MINIMO = 1.0
+    TIMEOUT_MAXIMO = 10.0
+    REINTENTOS_RECONEXION = 4
+    RECONEXION_BASE = 0.25 # Segundos; la espera antes del intento n es al azar entre BASE * 2**n / 2 y BASE * 2**n
+    RECONEXION_MAXIMA = 4.0
+    PAUSA_CIRCUITO = 5.0 # Segundos sin intentar reconectar tras agotar los reintentos
+    PAUSA_CIRCUITO_MAXIMA = 60.0
+    RANURAS_PRESET = tuple(range(1, 11)) # Ranuras de *SAV/*RCL de la memoria interna que pueden ocupar los presets
+
+    def __init__(self, modo_sincronizacion="opc", espera_fallback=0.5, resource_manager=None,
+                 periodo_resincronizacion=None, recurso=None, filtro_visa=FILTRO_VISA, ruta_cache=RUTA_CACHE,
+                 instrumentacion=None, timeout_adaptativo=True, ruta_presets=RUTA_PRESETS):
+        if modo_sincronizacion not in self.MODOS_SINCRONIZACION:
+            raise ValueError(f"Modo de sincronización no válido: {modo_sincronizacion}")
+        # Instancia de PYVISA, Gestor de comunicaciones con los dispositivos (se puede inyectar uno simulado)
+        self.pyvisa = resource_manager if resource_manager is not None else pyvisa.ResourceManager()
+        self.pyvisa_list = () # Se llena en connect() solo si hay que enumerar los recursos
+        self.filtro_visa = filtro_visa # Consulta VISA para enumerar solo los generadores RIGOL
+        self.ruta_cache = ruta_cache # Archivo con el ultimo recurso conocido, None para no usarlo
+        self.recurso_conectado = None # Nombre VISA del recurso abierto
+        self.tiempo_conexion = None # Segundos que tomo la ultima conexion
         self.index = None ## Almacena el indice donde se debe intentar la conexccion
         self.instrument = None # Objeto que representa y contiene la conexion activa con el generador de funciones
+        self.recurso = recurso # Nombre VISA del generador a usar; None = el primero que contenga DG1D200
+        self.identificacion = None # Campos de *IDN?: fabricante, modelo, serie y firmware
+        self.modo_sincronizacion = modo_sincronizacion # Forma de esperar a que el generador termine cada comando
+        self.espera_fallback = espera_fallback # Segundos de espera fija cuando se usa el modo "sleep"
+        self._lote = None # Lista de comandos pendientes mientras hay un lote abierto
+        self._avisos = [] # Mensajes de registro (formato, args) que esperan a que el lote se aplique
+        self.periodo_resincronizacion = periodo_resincronizacion # Antigüedad maxima del modelo, None = sin vencimiento
+        self._estado = {1: dict.fromkeys(CAMPOS_ESTADO), 2: dict.fromkeys(CAMPOS_ESTADO)} # Modelo de cada canal
+        self._estado_leido = {1: None, 2: None} # Instante (time.monotonic) de la ultima lectura de cada canal
+        self.instrumentacion = instrumentacion # Registro de latencias (Herramientas/instrumentacion.py), None = sin medir
+        self._consultas_compuestas = None # None = sin probar; False si el firmware no responde consultas con ';'
+        self.timeout_adaptativo = timeout_adaptativo # Ajusta el timeout VISA a la latencia medida de cada operacion
+        self._timeouts = {} # Tipo de operacion -> EstimadorTimeout
+        self._timeout_actual = None # Timeout (ms) configurado en la sesion VISA
+        self._circuito_abierto = False # True tras agotar los reintentos de reconexion
+        self._reabrir_en = 0.0 # Instante (time.monotonic) desde el que se vuelve a intentar reconectar
+        self._pausa_circuito = None # Pausa actual del circuito abierto (segundos)
+        self.ruta_presets = ruta_presets # Indice de presets (presets.py), None = solo en memoria
+        self._presets = None # IndicePresets del generador conectado, se crea al usarlo
         
     def connect(self):
     #############################################################################################################################
-    # Este metodo listara los recursos deisponibles por PYVISA, los recorre y espera que alguno de ellos contenga DG1D200       #
-    # Si no es el generador especificado, cierra la conexion pyvisa retorna FALSE eh imprime por consola Que no se encontro     #
+    # Busca el generador en este orden, deteniendose en el primero que responda:                                               #
+    #   1. El recurso indicado en `recurso`, o el ultimo recurso conocido guardado en `ruta_cache`, validado con un *IDN?       #
+    #   2. La lista de recursos de PYVISA filtrada con `filtro_visa`, buscando uno que contenga DG1D200                         #
+    # Si no se encuentra, retorna FALSE eh imprime por consola Que no se encontro                                               #
     # Si salta algun error en en este flujo, imprime el error por consola y no se interrumpe el codigo.                         #
+    # El tiempo que toma conectar queda en self.tiempo_conexion (segundos)                                                      #
     #############################################################################################################################
+        inicio = time.perf_counter()
         try:
+            if self.recurso is None:
+                recurso = self._leer_cache()
+                if recurso is not None and self._abrir(recurso, validar=True):
+                    return self._conectado(inicio, "último recurso conocido")
+            else:
+                self._abrir(self.recurso)
+                return self._conectado(inicio, "recurso indicado")
+
+            self.pyvisa_list = self.pyvisa.list_resources(self.filtro_visa)
             for i, device in enumerate(self.pyvisa_list):
                 if "DG1D200" in device:
                     self.index = i  # Asigna el índice a self.index
@@ -56,34 +354,93 @@ class GeneradorFunciones:
             else:
             # Si no se encuentra el dispositivo, establece self.index en None
                 self.index = None
-                print("Dispositivo no encontrado.")
+                log.warning("Dispositivo no encontrado.")
                 return False
 
             # Abre la conexión con el dispositivo en `self.index`
             if self.index is not None:
-                self.instrument = self.pyvisa.open_resource(self.pyvisa_list[self.index])
-                self.instrument.timeout = 10000  # Aumenta el timeout a 10 segundos
-                # Envía el comando de identificación, espera un momento, y lee la respuesta
-                self.instrument.write('*IDN?')
-                time.sleep(0.5)  
-                idn_response = self.instrument.read()  # Lee la respuesta
-                idn_response = idn_response.split(",")
-                marca = idn_response[0]
-                modelo = idn_response[1]
-                print("Se a conectado exitosamente al dispositivo")
-                print("Fabricante: " ,marca)
-                print("Modelo: ",modelo)
-                return True  # Conexión exitosa
+                self._abrir(self.pyvisa_list[self.index])
+                return self._conectado(inicio, "enumeración de recursos")
             else:
-                print("Índice no válido para abrir el recurso.")
+                log.warning("Índice no válido para abrir el recurso.")
                 return False
         
         except pyvisa.VisaIOError as e:
-            print("Error de comunicación con el dispositivo:", str(e))
+            log.error("Error de comunicación con el dispositivo: %s", str(e))
+            return False
+        except Exception as e:
+            log.error("Error inesperado al conectar: %s", str(e))
             return False
+
+    def _abrir(self, recurso, validar=False):
+        ##########################################################################################
+        # Abre el recurso, envia *IDN? y guarda la identificacion del generador.                  #
+        # Con validar=True (recurso tomado del cache) un fallo o un equipo que no es un DG1022    #
+        # no es un error: se cierra la sesion y retorna False para seguir con la enumeracion.     #
+        ##########################################################################################
+        try:
+            self.instrument = self.pyvisa.open_resource(recurso)
+            if self.instrumentacion is not None:
+                self.instrument = self.instrumentacion.envolver(self.instrument)
+            self.instrument.timeout = self._timeout_actual = int(self.TIMEOUT_INICIAL * 1000)
+            # Envía el comando de identificación y lee la respuesta
+            idn_response = self._consultar('*IDN?').split(",")
+            if validar and (len(idn_response) < 2 or "DG1022" not in idn_response[1]):
+                raise ValueError(f"{recurso} no es un DG1022")
         except Exception as e:
-            print("Error inesperado al conectar:", str(e))
+            if not validar:
+                raise
+            log.warning("Recurso %s no disponible (%s), se buscará en la lista de recursos.", recurso, e)
+            if self.instrument is not None:
+                try:
+                    self.instrument.close()
+                except Exception:
+                    pass
+            self.instrument = None
             return False
+        self.identificacion = dict(zip(("fabricante", "modelo", "serie", "firmware"),
+                                       (campo.strip() for campo in idn_response)))
+        self.recurso_conectado = recurso
+        return True
+
+    def _conectado(self, inicio, origen):
+        ##################################################################################
+        # Termina la conexion: sincronizacion, modelo en memoria, cache y tiempo medido   #
+        ##################################################################################
+        log.info("Se a conectado exitosamente al dispositivo")
+        log.info("Fabricante: %s", self.identificacion.get("fabricante"))
+        log.info("Modelo: %s", self.identificacion.get("modelo"))
+        self._verificar_sincronizacion()
+        self.invalidar_estado()
+        if self.recurso is None:
+            self._guardar_cache(self.recurso_conectado)
+        self.tiempo_conexion = time.perf_counter() - inicio
+        log.info("Conexión establecida en %.1f ms (%s).", self.tiempo_conexion * 1000, origen)
+        return True  # Conexión exitosa
+
+    def _leer_cache(self):
+        ##############################################################################
+        # Retorna el ultimo recurso conocido guardado en disco, o None si no hay      #
+        ##############################################################################
+        if not self.ruta_cache or not os.path.exists(self.ruta_cache):
+            return None
+        try:
+            with open(self.ruta_cache, encoding="utf-8") as archivo:
+                return json.load(archivo).get("recurso")
+        except (OSError, ValueError):
+            return None
+
+    def _guardar_cache(self, recurso):
+        ##############################################################################
+        # Guarda en disco el recurso al que se conecto para el proximo arranque        #
+        ##############################################################################
+        if not self.ruta_cache:
+            return
+        try:
+            with open(self.ruta_cache, "w", encoding="utf-8") as archivo:
+                json.dump({"recurso": recurso, "serie": self.identificacion.get("serie")}, archivo)
+        except OSError as e:
+            log.warning("No se pudo guardar el cache de recursos: %s", e)
 
     def disconnect(self):
     #####################################################################################    
@@ -95,39 +452,509 @@ class GeneradorFunciones:
                 self.turn_off()
                 self.instrument.close()
                 self.instrument = None
-                print("Generador desconectado y apagado.")
+                log.info("Generador desconectado y apagado.")
             except pyvisa.VisaIOError as e:
-                print(f"Error al desconectar el generador: {e}")
+                log.error("Error al desconectar el generador: %s", e)
             except Exception as e:
-                print(f"Error inesperado al desconectar: {e}")
+                log.error("Error inesperado al desconectar: %s", e)
         else:
-            print("No hay instrumento que desconectar.")
+            log.warning("No hay instrumento que desconectar.")
    
     def is_connected(self): 
         ########################################################################################################
         # Retorna TRUE si hay una conexion activa con el generador de funciones en caso contrario retorna FALSE#
         ########################################################################################################
         return self.instrument is not None
-   
-    def turn_on(self): 
+
+    def _escribir(self, comando):
+        ##########################################################################################
+        # Envia un comando SCPI y espera a que el generador lo termine segun modo_sincronizacion #
+        # Si hay un lote abierto, el comando solo se acumula y se envia al cerrar el lote         #
+        ##########################################################################################
+        if self._lote is not None:
+            self._lote.append(comando)
+            return
+        with self._operacion("sincronizacion"):
+            if self.modo_sincronizacion == "opc":
+                # *OPC? en el mismo mensaje: el comando y su confirmacion cuestan un solo viaje
+                self.instrument.query(comando + ";*OPC?")
+            else:
+                self.instrument.write(comando)
+                self._sincronizar()
+
+    @contextlib.contextmanager
+    def lote(self):
+        ###########################################################################################
+        # Agrupa los comandos escritos dentro del bloque `with` y los envia juntos al salir.       #
+        # Si el bloque termina con una excepcion no se envia nada. Los lotes anidados se unen al   #
+        # lote exterior.                                                                          #
+        ###########################################################################################
+        if self._lote is not None:
+            yield
+            return
+        self._lote = []
+        self._avisos = []
+        try:
+            yield
+            comandos, avisos = self._lote, self._avisos
+        finally:
+            self._lote = None
+            self._avisos = []
+        if comandos:
+            self.enviar_mensajes(self.agrupar_mensajes(comandos), avisos)
+        else:
+            self._emitir_avisos(avisos)
+
+    @contextlib.contextmanager
+    def grabar(self):
+        ###########################################################################################
+        # Captura los comandos escritos dentro del bloque sin enviarlos y los entrega en la lista  #
+        # del `with`. El modelo en memoria avanza como si se hubieran enviado, por eso cada        #
+        # grabacion contiene solo los cambios respecto de la anterior. Los mensajes de registro    #
+        # de los metodos quedan en grabados.avisos. Para enviarlos despues:                        #
+        # enviar_mensajes(agrupar_mensajes(grabados), grabados.avisos). Lo usa secuencia.py.       #
+        ###########################################################################################
+        if self._lote is not None:
+            raise RuntimeError("No se puede grabar dentro de un lote abierto")
+        grabados = Grabacion()
+        self._lote = grabados
+        self._avisos = grabados.avisos
+        try:
+            yield grabados
+        finally:
+            self._lote = None
+            self._avisos = []
+
+    def _informar(self, mensaje, *args):
+        ###########################################################################################
+        # Registra que una configuracion se aplico. Dentro de un lote o una grabacion el mensaje   #
+        # espera a que enviar_mensajes() confirme el lote con SYST:ERR?                            #
+        ###########################################################################################
+        if self._lote is not None:
+            self._avisos.append((mensaje, args))
+        else:
+            log.info(mensaje, *args)
+
+    @staticmethod
+    def _emitir_avisos(avisos):
+        for mensaje, args in avisos:
+            log.info(mensaje, *args)
+
+    def agrupar_mensajes(self, comandos):
+        ##############################################################################################
+        # Une los comandos con ';' sin superar LONGITUD_MAXIMA_MENSAJE.                               #
+        # Los comandos que no son comunes (*XXX) llevan ':' para volver a la raiz del arbol SCPI      #
+        ##############################################################################################
+        mensajes = []
+        actual = ""
+        for comando in comandos:
+            if not comando.startswith(("*", ":")):
+                comando = ":" + comando
+            if actual and len(actual) + 1 + len(comando) > self.LONGITUD_MAXIMA_MENSAJE:
+                mensajes.append(actual)
+                actual = ""
+            actual = comando if not actual else actual + ";" + comando
+        if actual:
+            mensajes.append(actual)
+        return mensajes
+
+    def enviar_mensajes(self, mensajes, avisos=()):
+        ################################################################################################
+        # Envia mensajes ya agrupados con agrupar_mensajes() y revisa la cola de errores una sola vez.  #
+        # Los avisos (ver _informar) se registran solo si el generador no reporto errores.              #
+        # En modo "opc"/"srq" la consulta SYST:ERR? viaja al final del ultimo mensaje: como el DG1022   #
+        # procesa los comandos en orden, su respuesta llega cuando termino todo el lote (un solo viaje) #
+        ################################################################################################
+        if self.modo_sincronizacion == "sleep":
+            for mensaje in mensajes:
+                self.instrument.write(mensaje)
+            self._dormir(self.espera_fallback, "sincronizacion")
+            error = self._consultar("SYST:ERR?")
+        else:
+            # La carga de datos del DAC tarda mucho mas que un lote de configuracion: timeout aparte
+            with self._operacion("carga" if any("DATA:" in mensaje for mensaje in mensajes) else "lote"):
+                for mensaje in mensajes[:-1]:
+                    self.instrument.write(mensaje)
+                ultimo = mensajes[-1]
+                if len(ultimo) + len(";:SYST:ERR?") <= self.LONGITUD_MAXIMA_MENSAJE:
+                    error = self.instrument.query(ultimo + ";:SYST:ERR?")
+                else:
+                    self.instrument.write(ultimo)
+                    error = self.instrument.query("SYST:ERR?")
+        self._revisar_errores(error)
+        self._emitir_avisos(avisos)
+
+    def _revisar_errores(self, error):
+        ###############################################################################################
+        # Recibe la primera respuesta de SYST:ERR? y vacia el resto de la cola. Lanza ErrorSCPI si hay #
+        ###############################################################################################
+        errores = []
+        while not error.strip().startswith(("0,", "+0,")):
+            errores.append(error.strip())
+            if len(errores) >= 20: # La cola del DG1022 es finita, evita un bucle infinito
+                break
+            error = self.instrument.query("SYST:ERR?")
+        if errores:
+            raise ErrorSCPI("; ".join(errores))
+
+    def invalidar_estado(self, canal=None):
+        ##########################################################################################
+        # Marca como desconocido el modelo de un canal (o de ambos si canal es None).             #
+        # La siguiente lectura consultara al generador y la siguiente escritura enviara todo.     #
+        ##########################################################################################
+        for c in ((1, 2) if canal is None else (canal,)):
+            self._estado[c] = dict.fromkeys(CAMPOS_ESTADO)
+            self._estado_leido[c] = None
+
+    def resincronizar(self, canal=None):
+        ##########################################################################################
+        # Lee el estado completo del generador y reemplaza el modelo en memoria con lo leido.     #
+        # Se leen siempre ambos canales: con la consulta compuesta cuesta un solo viaje USB.      #
+        # `canal` se conserva por compatibilidad. Retorna el EstadoGenerador leido.               #
+        ##########################################################################################
+        estado = interpretar_snapshot(self._consultar_snapshot(), time.monotonic())
+        self._adoptar_estado(estado)
+        return estado
+
+    def _adoptar_estado(self, estado):
+        ##########################################################################################
+        # Reemplaza el modelo en memoria de ambos canales por un EstadoGenerador                  #
+        ##########################################################################################
+        for c, canal_leido in ((1, estado.canal_1), (2, estado.canal_2)):
+            self._estado[c].update(dataclasses.asdict(canal_leido))
+            self._estado_leido[c] = estado.instante
+        self._estado[1].update({"burst": estado.burst.activo, "modo_burst": estado.burst.modo,
+                                "ciclos": estado.burst.ciclos, "fase": estado.burst.fase, "disparo": estado.disparo,
+                                "barrido": estado.barrido.activo})
+
+    def _consultar_snapshot(self):
+        ###############################################################################################
+        # Retorna las respuestas a CONSULTAS_SNAPSHOT. Primero intenta una sola consulta compuesta     #
+        # (':APPLy?;:OUTP?;...'), cuya respuesta llega separada por ';'. Si el firmware no la responde #
+        # completa se recuerda y desde entonces se envia una consulta por campo.                       #
+        ###############################################################################################
+        if self._consultas_compuestas is not False:
+            try:
+                respuestas = self._consultar(";".join(":" + c for c in CONSULTAS_SNAPSHOT)).strip().split(";")
+            except pyvisa.VisaIOError:
+                if self._consultas_compuestas:
+                    raise # Ya funciono antes: es un problema de comunicacion, no del firmware
+                respuestas = None
+            if respuestas is not None and len(respuestas) == len(CONSULTAS_SNAPSHOT):
+                self._consultas_compuestas = True
+                return respuestas
+            log.warning("El generador no acepta consultas compuestas, se consultará campo por campo.")
+            self._consultas_compuestas = False
+            self.instrument.write("*CLS") # Descarta el error o respuesta parcial de la consulta compuesta
+        return [self._consultar(consulta) for consulta in CONSULTAS_SNAPSHOT]
+
+    def snapshot(self):
+        ##############################################################################################
+        # Lee en un solo viaje el estado de ambos canales, el burst, la fuente de disparo, las       #
+        # salidas, el barrido y la forma arbitraria seleccionada, y lo retorna como un              #
+        # EstadoGenerador inmutable, por ejemplo:                                                    #
+        #   estado.canal_1.frecuencia -> 1000.0, estado.burst.ciclos -> 10, estado.canal_2.salida    #
+        # Tambien actualiza el modelo en memoria. Retorna None si no se pudo leer.                  #
+        ##############################################################################################
+        if self._disponible():
+            try:
+                return self._con_reintento(self.resincronizar)
+            except ErrorSCPI as e:
+                self.invalidar_estado()
+                log.error("El generador reportó un error al leer su estado: %s", e)
+            except pyvisa.VisaIOError as e:
+                log.error("Error de comunicación al leer el estado del generador: %s", e)
+                self.handle_disconnection()
+            except Exception as e:
+                log.error("Error inesperado al leer el estado del generador: %s", e)
+                self.invalidar_estado()
+        else:
+            log.warning("No hay conexión activa con el generador.")
+        return None
+
+    def _indice_presets(self):
+        ##########################################################################################
+        # Indice de presets del generador conectado, identificado por su numero de serie          #
+        ##########################################################################################
+        serie = (self.identificacion or {}).get("serie") or self.recurso_conectado
+        if self._presets is None or self._presets.serie != serie:
+            self._presets = presets.IndicePresets(serie, self.ruta_presets, self.RANURAS_PRESET)
+        return self._presets
+
+    def guardar_preset(self, nombre):
+        ##########################################################################################
+        # Guarda la configuracion completa actual del generador en una ranura con *SAV.           #
+        # Se lee el estado real (un viaje) para calcular la huella; si el preset ya tiene esa     #
+        # huella no se reescribe la ranura. Retorna True si el preset quedo guardado              #
+        ##########################################################################################
+        if self._disponible():
+            try:
+                indice = self._indice_presets()
+                estado = self._con_reintento(self.resincronizar)
+                huella = presets.huella_estado(estado)
+                ranura, guardar = indice.ranura_para(nombre, huella)
+                if guardar:
+                    self._con_reintento(lambda: self.enviar_mensajes([f"*SAV {ranura}"]))
+                indice.registrar(nombre, ranura, huella, estado)
+                log.info("Preset %s guardado en la ranura %s%s.", nombre, ranura, "" if guardar else " (sin cambios)")
+                return True
+            except ErrorSCPI as e:
+                log.error("El generador rechazó guardar el preset %s: %s", nombre, e)
+            except pyvisa.VisaIOError as e:
+                log.error("Error de comunicación al guardar el preset %s: %s", nombre, e)
+                self.handle_disconnection()
+            except Exception as e:
+                log.error("Error inesperado al guardar el preset %s: %s", nombre, e)
+                self.handle_disconnection()
+        else:
+            log.warning("No hay conexión activa con el generador.")
+        return False
+
+    def recuperar_preset(self, nombre, verificar=False):
+        ##########################################################################################
+        # Vuelve a la configuracion guardada con guardar_preset(): "*RCL n;:SYST:ERR?" es un solo #
+        # mensaje y un solo viaje, y el modelo en memoria toma el estado guardado en el indice.   #
+        # Con verificar=True lee el estado (un viaje mas); si no coincide con la huella o *RCL    #
+        # falla, la ranura se marca obsoleta. Retorna True si se recupero el preset               #
+        ##########################################################################################
+        if self._disponible():
+            indice = self._indice_presets()
+            entrada = indice.buscar(nombre)
+            if entrada is None:
+                log.warning("No hay un preset llamado %s en este generador.", nombre)
+                return False
+            if entrada["obsoleto"]:
+                log.warning("El preset %s está obsoleto, guárdelo de nuevo antes de usarlo.", nombre)
+                return False
+            try:
+                self._con_reintento(lambda: self.enviar_mensajes([f"*RCL {entrada['ranura']}"]))
+                if verificar:
+                    if presets.huella_estado(self._con_reintento(self.resincronizar)) != entrada["hash"]:
+                        indice.marcar_obsoleto(nombre)
+                        log.warning("La ranura %s ya no contiene el preset %s (fue sobrescrita); quedó obsoleto.",
+                                    entrada["ranura"], nombre)
+                        return False
+                else:
+                    self._adoptar_estado(estado_desde_dict(dict(entrada["estado"], instante=time.monotonic())))
+                indice.usar(nombre)
+                log.info("Preset %s recuperado de la ranura %s.", nombre, entrada["ranura"])
+                return True
+            except ErrorSCPI as e:
+                self.invalidar_estado()
+                indice.marcar_obsoleto(nombre)
+                log.error("El generador rechazó recuperar el preset %s: %s", nombre, e)
+            except pyvisa.VisaIOError as e:
+                self.invalidar_estado()
+                log.error("Error de comunicación al recuperar el preset %s: %s", nombre, e)
+                self.handle_disconnection()
+            except Exception as e:
+                self.invalidar_estado()
+                log.error("Error inesperado al recuperar el preset %s: %s", nombre, e)
+                self.handle_disconnection()
+        else:
+            log.warning("No hay conexión activa con el generador.")
+        return False
+
+    def listar_presets(self):
+        ##########################################################################################
+        # Retorna {nombre: {"ranura", "hash", "obsoleto"}} de los presets de este generador       #
+        ##########################################################################################
+        if not self.is_connected():
+            log.warning("No hay conexión activa con el generador.")
+            return {}
+        return {nombre: {clave: entrada[clave] for clave in ("ranura", "hash", "obsoleto")}
+                for nombre, entrada in self._indice_presets().presets.items()}
+
+    def eliminar_preset(self, nombre):
+        ##########################################################################################
+        # Quita el preset del indice; la ranura queda libre para el siguiente guardar_preset()    #
+        ##########################################################################################
+        if self.is_connected():
+            self._indice_presets().eliminar(nombre)
+
+    def _estado_canal(self, canal, campos=CAMPOS_APPLY + ("burst",)):
+        ##########################################################################################
+        # Retorna el modelo del canal. Solo consulta al generador si alguno de los campos pedidos #
+        # es desconocido o si el modelo supero el periodo de resincronizacion                     #
+        ##########################################################################################
+        leido = self._estado_leido[canal]
+        vencido = (self.periodo_resincronizacion is not None and leido is not None
+                   and time.monotonic() - leido > self.periodo_resincronizacion)
+        if vencido or any(self._estado[canal][clave] is None for clave in campos):
+            self.resincronizar()
+        return self._estado[canal]
+
+    def _comandos_cambiados(self, canal, deseado):
+        ##########################################################################################
+        # Compara la configuracion deseada con el modelo y retorna solo los comandos necesarios.  #
+        # Si cambia la forma de onda (o es desconocida) se usa APPLy, que puede desactivar el     #
+        # burst, por eso en ese caso los campos de burst se reenvian. Si solo cambia frecuencia,  #
+        # amplitud u offset se usan FREQ/VOLT/VOLT:OFFS, que no tocan el burst.                   #
+        # El barrido y el burst son excluyentes: si hay que apagar el barrido (o su estado es     #
+        # desconocido) SWE:STAT OFF va primero, antes que BURS:STAT ON.                           #
+        ##########################################################################################
+        actual = self._estado[canal]
+        sufijo = "" if canal == 1 else ":CH2"
+        comandos = []
+        if "barrido" in deseado and deseado["barrido"] != actual["barrido"]:
+            comandos.append(f"SWE:STAT{sufijo} {'ON' if deseado['barrido'] else 'OFF'}")
+        reenviar_burst = False
+        if any(clave in deseado for clave in CAMPOS_APPLY):
+            if actual["funcion"] is None or deseado["funcion"] != actual["funcion"]:
+                comandos.append(f"APPLy:{deseado['funcion']}{sufijo} {deseado['frecuencia']},"
+                                f"{deseado['amplitud']},{deseado['offset']}")
+                reenviar_burst = True
+            else:
+                for clave, cabecera in (("frecuencia", "FREQ"), ("amplitud", "VOLT"), ("offset", "VOLT:OFFS")):
+                    if deseado[clave] != actual[clave]:
+                        comandos.append(f"{cabecera}{sufijo} {deseado[clave]}")
+        burst = {
+            "burst": lambda v: f"BURS:STAT{sufijo} {'ON' if v else 'OFF'}",
+            "modo_burst": lambda v: f"BURS:MODE{sufijo} {v}",
+            "ciclos": lambda v: f"BURS:NCYC{sufijo} {v}",
+            "fase": lambda v: f"BURS:PHAS{sufijo} {v:g}",
+            "disparo": lambda v: f"TRIG:SOUR{sufijo} {v}",
+        }
+        for clave in CAMPOS_BURST:
+            if clave in deseado and (reenviar_burst or deseado[clave] != actual[clave]):
+                comandos.append(burst[clave](deseado[clave]))
+        if "salida" in deseado and deseado["salida"] != actual["salida"]:
+            comandos.append(f"OUTP{sufijo} {'ON' if deseado['salida'] else 'OFF'}")
+        return comandos
+
+    def _aplicar(self, canal, deseado):
+        ##########################################################################################
+        # Envia en un lote solo los comandos que cambian y actualiza el modelo si no hubo errores #
+        # Retorna la cantidad de comandos enviados                                                #
+        ##########################################################################################
+        comandos = self._comandos_cambiados(canal, deseado)
+        if not comandos:
+            return 0
+        try:
+            with self.lote():
+                for comando in comandos:
+                    self._escribir(comando)
+        except Exception:
+            self.invalidar_estado(canal) # No se sabe que parte del lote se aplico
+            raise
+        if any(comando.startswith("APPLy") for comando in comandos):
+            # APPLy pudo cambiar campos de burst que no se reenviaron
+            for clave in CAMPOS_BURST:
+                if clave not in deseado:
+                    self._estado[canal][clave] = None
+        self._estado[canal].update(deseado)
+        if self._estado_leido[canal] is None:
+            self._estado_leido[canal] = time.monotonic() # Desde aqui corre el periodo de resincronizacion
+        return len(comandos)
+
+    def _consultar(self, comando):
+        #############################################################################################
+        # Envia una consulta SCPI y retorna la respuesta.                                           #
+        # En modo "opc"/"srq" la lectura bloquea hasta que llega la respuesta, no se necesita espera #
+        # En modo "sleep" se conserva la espera fija antes de leer                                   #
+        #############################################################################################
+        if self.modo_sincronizacion == "sleep":
+            self.instrument.write(comando)
+            self._dormir(self.espera_fallback, "consulta")
+            return self.instrument.read()
+        with self._operacion("consulta"):
+            return self.instrument.query(comando)
+
+    @contextlib.contextmanager
+    def _operacion(self, tipo):
+        ##############################################################################################
+        # Configura el timeout VISA que corresponde al tipo de operacion y mide cuanto tarda.         #
+        # Con timeout_adaptativo=False se mantiene el TIMEOUT_INICIAL de siempre                      #
+        ##############################################################################################
+        if not self.timeout_adaptativo:
+            yield
+            return
+        estimador = self._timeouts.get(tipo)
+        if estimador is None:
+            estimador = self._timeouts[tipo] = EstimadorTimeout(self.TIMEOUT_INICIAL, self.TIMEOUT_MINIMO,
+                                                                self.TIMEOUT_MAXIMO)
+        timeout = math.ceil(estimador.valor * 100) * 10 # ms, redondeado hacia arriba a 10 ms
+        if timeout != self._timeout_actual:
+            self.instrument.timeout = self._timeout_actual = timeout
+        inicio = time.perf_counter()
+        try:
+            yield
+        except pyvisa.VisaIOError:
+            estimador.expirado()
+            raise
+        estimador.registrar(time.perf_counter() - inicio)
+
+    def timeouts(self):
+        ##############################################################################
+        # Retorna el timeout actual (segundos) de cada tipo de operacion              #
+        ##############################################################################
+        return {tipo: estimador.valor for tipo, estimador in self._timeouts.items()}
+
+    def _sincronizar(self):
+        ###############################################################################
+        # Espera a que el generador termine de procesar los comandos ya enviados      #
+        #   - "opc": *OPC? responde "1" solo cuando terminan las operaciones previas  #
+        #   - "srq": *OPC activa el bit OPC del ESR y con ello la peticion de servicio #
+        #   - "sleep": espera fija de respaldo                                        #
+        ###############################################################################
+        if self.modo_sincronizacion == "opc":
+            self.instrument.query("*OPC?")
+        elif self.modo_sincronizacion == "srq":
+            self.instrument.write("*OPC")
+            self.instrument.wait_for_srq(self.instrument.timeout)
+            self.instrument.query("*ESR?")  # Limpia el registro de eventos y la peticion de servicio
+        else:
+            self._dormir(self.espera_fallback, "sincronizacion")
+
+    def _dormir(self, segundos, motivo):
+        ################################################################################
+        # time.sleep deliberado; si hay instrumentacion queda registrado con su motivo  #
+        ################################################################################
+        time.sleep(segundos)
+        if self.instrumentacion is not None:
+            self.instrumentacion.registrar_espera(segundos, motivo)
+
+    def _verificar_sincronizacion(self):
+        ##########################################################################################
+        # Comprueba que el generador responde al modo de sincronizacion elegido.                  #
+        # Si no lo soporta (firmware antiguo o backend VISA sin SRQ) vuelve a la espera fija.     #
+        ##########################################################################################
+        if self.modo_sincronizacion == "sleep":
+            return
+        try:
+            if self.modo_sincronizacion == "srq":
+                if not hasattr(self.instrument, "wait_for_srq"):
+                    raise AttributeError("El recurso VISA no soporta peticiones de servicio")
+                self.instrument.write("*ESE 1")   # Bit 0 del ESR: operacion completa
+                self.instrument.write("*SRE 32")  # Bit 5 del STB: resumen de eventos (ESB)
+            self._sincronizar()
+        except (pyvisa.VisaIOError, AttributeError, NotImplementedError) as e:
+            log.warning("Modo de sincronización '%s' no soportado (%s), se usará espera fija.",
+                        self.modo_sincronizacion, e)
+            self.modo_sincronizacion = "sleep"
+
+    def turn_on(self):
         ##########################################################################################################
         # Si esta conectado, Manda señal de encendido al generador de funciones                                  #
         # Si salta algun error en este proceso, imprime por consola el error y maneja una desconeccion segura    #
         ##########################################################################################################
-        if self.is_connected():
+        if self._disponible():
             try:
-                self.instrument.write("OUTP ON")
-                time.sleep(0.5)
-                print("Generador encendido.")
+                self._con_reintento(lambda: self._aplicar(1, {"salida": True}))
+                self._informar("Generador encendido.")
+                return True
+            except ErrorSCPI as e:
+                self.invalidar_estado(1)
+                log.error("El generador rechazó encender la salida: %s", e)
             except pyvisa.VisaIOError as e:
-                print(f"Error de comunicación al encender el generador: {e}")
+                log.error("Error de comunicación al encender el generador: %s", e)
                 self.handle_disconnection()
             except Exception as e:
-                print(f"Error inesperado al encender el generador: {e}")
+                log.error("Error inesperado al encender el generador: %s", e)
                 self.handle_disconnection()
         else:
-            print("No hay conexión activa con el generador.")
-            return
+            log.warning("No hay conexión activa con el generador.")
+        return False
 
     def channel_2(self, frecuencia=4800, amplitud=5, offset=0): 
         ###########################################################################################
@@ -135,19 +962,25 @@ class GeneradorFunciones:
         # Offset, es opcional, es para hacer que la funcion ocile entre estos valores en voltaje  #    
         # Frecuencia en Hz; Amplitud en Voltaje pico a pico (Vpp); Offset en Voltaje              #
         ###########################################################################################
-        if self.is_connected():
+        if self._disponible():
             try:
-                command = f"APPL:SIN:CH2 {frecuencia},{amplitud},{offset}"
-                self.instrument.write(command)
-                print(f"Onda sinusoidal en CH2 configurada: {frecuencia} Hz, {amplitud} Vpp, Offset {offset} V.")
+                self._con_reintento(lambda: self._aplicar(2, {"funcion": "SIN", "frecuencia": float(frecuencia),
+                                                              "amplitud": float(amplitud), "offset": float(offset)}))
+                self._informar("Onda sinusoidal en CH2 configurada: %s Hz, %s Vpp, Offset %s V.",
+                         frecuencia, amplitud, offset)
+                return True
+            except ErrorSCPI as e:
+                self.invalidar_estado(2)
+                log.error("El generador rechazó la configuración de CH2: %s", e)
             except pyvisa.VisaIOError as e:
-                print(f"Error de comunicación al configurar CH2: {e}")
+                log.error("Error de comunicación al configurar CH2: %s", e)
                 self.handle_disconnection()
             except Exception as e:
-                print(f"Error inesperado al configurar CH2: {e}")
+                log.error("Error inesperado al configurar CH2: %s", e)
                 self.handle_disconnection()
         else:
-            print("No hay conexión activa con el generador.")
+            log.warning("No hay conexión activa con el generador.")
+        return False
    
     def read_channel_2_state(self):
     ###########################################################################################
@@ -155,23 +988,23 @@ class GeneradorFunciones:
     # La salida esperada es del tipo : "SIN,1.000000e+03,5.000000e+00,-1.500000e+00"          #
     # Que representa un configuracion de : Frecuencia 1000Hz; Amplitud 5.0Vpp; Offset -1.5 V  #
     ###########################################################################################
-        if self.is_connected():
+        if self._disponible():
             try:
-                time.sleep(0.5)
-                # comando de consulta para leer el estado de CH2
-                self.instrument.write('APPLy:CH2?')
-                time.sleep(0.5)
-                response = self.instrument.read()
-                print(f"Estado del Canal 2: {response}")
+                # Se responde desde el modelo en memoria; solo se consulta APPLy:CH2? si es desconocido
+                response = formato_apply(self._con_reintento(lambda: self._estado_canal(2, CAMPOS_APPLY)))
+                log.info("Estado del Canal 2: %s", response)
                 return response
+            except ErrorSCPI as e:
+                self.invalidar_estado(2)
+                log.error("El generador reportó un error al leer el estado de CH2: %s", e)
             except pyvisa.VisaIOError as e:
-                print(f"Error de comunicación al leer el estado de CH2: {e}")
+                log.error("Error de comunicación al leer el estado de CH2: %s", e)
                 self.handle_disconnection()
             except Exception as e:
-                print(f"Error inesperado al leer el estado de CH2: {e}")
+                log.error("Error inesperado al leer el estado de CH2: %s", e)
                 self.handle_disconnection()
         else:
-            print("No hay conexión activa con el generador.")
+            log.warning("No hay conexión activa con el generador.")
    
     def channel_1(self, frecuencia, amplitud, ciclos, offset=0):
         #############################################################
@@ -182,31 +1015,34 @@ class GeneradorFunciones:
         #    - ciclos: Número de ciclos en el modo Burst            #
         #############################################################
 
-        if self.is_connected():
+        if self._disponible():
             try:
-                command = f"APPLy:SINusoid {frecuencia},{amplitud},{offset}"
-                self.instrument.write(command)
-                time.sleep(0.5)
-                print(f"Canal 1 configurado: {frecuencia} Hz, {amplitud} Vpp")
-                self.instrument.write("BURS:STAT ON") # Habilita el modo Burst
-                time.sleep(0.5)
-                self.instrument.write("BURS:MODE TRIG") # Establece el modo de Burst a "Triggered"
-                time.sleep(0.5)
-                self.instrument.write(f"BURS:NCYC {ciclos}") # Número de ciclos en Burst
-                time.sleep(0.5)
-                self.instrument.write("BURS:PHAS 0") # Configura fase inicial en 0
-                time.sleep(0.5)
-                self.instrument.write("TRIG:SOUR IMM") # Configura el disparo como inmediato
-                time.sleep(0.5)
+                # Solo viajan los comandos que cambiaron, todos en un mismo mensaje con una revision de errores
+                self._con_reintento(lambda: self._aplicar(1, {
+                    "funcion": "SIN", "frecuencia": float(frecuencia), "amplitud": float(amplitud),
+                    "offset": float(offset),
+                    "burst": True,           # Habilita el modo Burst
+                    "modo_burst": "TRIG",    # Establece el modo de Burst a "Triggered"
+                    "ciclos": int(ciclos),   # Número de ciclos en Burst
+                    "fase": 0.0,             # Configura fase inicial en 0
+                    "disparo": "IMM",        # Configura el disparo como inmediato
+                    "barrido": False,        # Apaga el barrido si lo hay: no convive con el burst
+                }))
+                self._informar("Canal 1 configurado: %s Hz, %s Vpp", frecuencia, amplitud)
+                return True
 
+            except ErrorSCPI as e:
+                self.invalidar_estado(1)
+                log.error("El generador rechazó la configuración de CH1: %s", e)
             except pyvisa.VisaIOError as e:
-                print(f"Error de comunicación al configurar CH1 en modo Burst: {e}")
+                log.error("Error de comunicación al configurar CH1 en modo Burst: %s", e)
                 self.handle_disconnection()
             except Exception as e:
-                print(f"Error inesperado al configurar CH1 en modo Burst: {e}")
+                log.error("Error inesperado al configurar CH1 en modo Burst: %s", e)
                 self.handle_disconnection()
         else:
-            print("No hay conexión activa con el generador.")
+            log.warning("No hay conexión activa con el generador.")
+        return False
    
     def read_channel_1_state(self):
         #################################################################################
@@ -214,67 +1050,302 @@ class GeneradorFunciones:
         # la salida esperada es del tipo : "SIN,1.000000e+03,5.000000e+00,0.000000e+00" #
         # Que representa wave_type; Frecuencia 1000Hz; Amplitud 5.0Vpp; Offset 0 V      #
         #################################################################################
-        if self.is_connected():
+        if self._disponible():
             try:
-                self.instrument.write('BURS:STAT?')
-                time.sleep(0.5)
-                burst =  self.instrument.read()
-                time.sleep(0.5)
-                self.instrument.write('APPLy?')
-                time.sleep(0.5)
-                response = self.instrument.read()
-                print(f"Estado actual del Canal 1: {response}")
-                print(f"Estado actual de modo burst en el canal 1 es: {burst}")
+                # Se responde desde el modelo en memoria; solo se consulta al generador si es desconocido
+                estado = self._con_reintento(lambda: self._estado_canal(1))
+                burst = "ON" if estado["burst"] else "OFF"
+                response = formato_apply(estado)
+                log.info("Estado actual del Canal 1: %s", response)
+                log.info("Estado actual de modo burst en el canal 1 es: %s", burst)
                 return response
                
+            except ErrorSCPI as e:
+                self.invalidar_estado(1)
+                log.error("El generador reportó un error al leer el estado de CH1: %s", e)
             except pyvisa.VisaIOError as e:
-                print(f"Error de comunicación al leer el estado de CH1: {e}")
+                log.error("Error de comunicación al leer el estado de CH1: %s", e)
                 self.handle_disconnection()
             except Exception as e:
-                print(f"Error inesperado al leer el estado de CH1: {e}")
+                log.error("Error inesperado al leer el estado de CH1: %s", e)
                 self.handle_disconnection()
         else:
-            print("No hay conexión activa con el generador.")
+            log.warning("No hay conexión activa con el generador.")
         
+    @staticmethod
+    def frecuencias_barrido(frecuencia_inicio, frecuencia_fin, puntos, espaciado="LIN"):
+        ###########################################################################################
+        # Retorna la lista de `puntos` frecuencias entre inicio y fin, lineal ("LIN") o log ("LOG") #
+        ###########################################################################################
+        if puntos < 2:
+            return [float(frecuencia_inicio)]
+        if espaciado == "LOG":
+            razon = (frecuencia_fin / frecuencia_inicio) ** (1 / (puntos - 1))
+            return [frecuencia_inicio * razon ** i for i in range(puntos)]
+        paso = (frecuencia_fin - frecuencia_inicio) / (puntos - 1)
+        return [frecuencia_inicio + paso * i for i in range(puntos)]
+
+    def barrido(self, frecuencia_inicio, frecuencia_fin, tiempo, espaciado="LIN", disparo="IMM"):
+        ##############################################################################################
+        # Programa el barrido de frecuencia interno del DG1022 en el canal 1 con un solo lote SCPI.   #
+        #    Parámetros:                                                                              #
+        #    - frecuencia_inicio, frecuencia_fin: Frecuencias en Hz                                   #
+        #    - tiempo: Duracion de cada barrido en segundos                                           #
+        #    - espaciado: "LIN" o "LOG"                                                               #
+        #    - disparo: Fuente de disparo "IMM", "EXT" o "BUS"                                        #
+        # El barrido del generador es continuo, no tiene puntos. Retorna un diccionario con el tiempo #
+        # que tomo configurarlo y la duracion programada de cada barrido, o None.                    #
+        ##############################################################################################
+        if espaciado not in ("LIN", "LOG"):
+            log.warning("El espaciado debe ser 'LIN' o 'LOG'.")
+            return None
+        if self._disponible():
+            try:
+                def configurar():
+                    with self.lote():
+                        self._escribir("BURS:STAT OFF") # El barrido y el modo Burst son excluyentes
+                        self._escribir(f"FREQ:STAR {frecuencia_inicio}")
+                        self._escribir(f"FREQ:STOP {frecuencia_fin}")
+                        self._escribir(f"SWE:SPAC {espaciado}")
+                        self._escribir(f"SWE:TIME {tiempo}")
+                        self._escribir(f"TRIG:SOUR {disparo}")
+                        self._escribir("SWE:STAT ON")
+                inicio = time.perf_counter()
+                self._con_reintento(configurar)
+                configuracion = time.perf_counter() - inicio
+                # Durante el barrido la frecuencia no es fija
+                self._estado[1].update({"burst": False, "barrido": True, "frecuencia": None, "disparo": disparo})
+                resultado = {"modo": "hardware", "segundos_configuracion": configuracion,
+                             "segundos_barrido": float(tiempo)}
+                self._informar("Barrido de %s a %s Hz (%s, %s s) configurado en %.1f ms.",
+                         frecuencia_inicio, frecuencia_fin, espaciado, tiempo, configuracion * 1000)
+                return resultado
+            except ErrorSCPI as e:
+                self.invalidar_estado(1)
+                log.error("El generador rechazó la configuración del barrido: %s", e)
+            except pyvisa.VisaIOError as e:
+                log.error("Error de comunicación al configurar el barrido: %s", e)
+                self.handle_disconnection()
+            except Exception as e:
+                log.error("Error inesperado al configurar el barrido: %s", e)
+                self.handle_disconnection()
+        else:
+            log.warning("No hay conexión activa con el generador.")
+        return None
+
+    def barrido_software(self, frecuencia_inicio, frecuencia_fin, puntos, tiempo=0, espaciado="LIN", canal=1):
+        ##############################################################################################
+        # Respaldo para cuando no se puede usar el barrido interno: recorre `puntos` frecuencias     #
+        # enviando FREQ en cada paso. Todos los comandos se arman antes de empezar y cada uno se     #
+        # envia en su instante del calendario (time.monotonic), repartidos en `tiempo` segundos.     #
+        # Con tiempo=0 se envian tan rapido como el generador los confirme; en modo "opc" cada paso  #
+        # es "FREQ f;*OPC?", un solo viaje. Si un paso llega tarde no se salta, se envia de inmediato.#
+        # Retorna un diccionario con puntos, segundos, puntos_por_segundo y atraso_maximo, o False  #
+        # si los parametros no son validos o el barrido fallo.                                       #
+        ##############################################################################################
+        if espaciado not in ("LIN", "LOG"):
+            log.warning("El espaciado debe ser 'LIN' o 'LOG'.")
+            return False
+        if puntos < 2:
+            log.warning("El barrido necesita al menos 2 puntos.")
+            return False
+        if espaciado == "LOG" and (frecuencia_inicio <= 0 or frecuencia_fin <= 0):
+            log.warning("El barrido logarítmico necesita frecuencias mayores que 0 Hz.")
+            return False
+        sufijo = "" if canal == 1 else ":CH2"
+        frecuencias = self.frecuencias_barrido(frecuencia_inicio, frecuencia_fin, puntos, espaciado)
+        comandos = [f"FREQ{sufijo} {f}" for f in frecuencias]
+        intervalo = tiempo / (len(comandos) - 1) if len(comandos) > 1 else 0
+        if self._disponible():
+            try:
+                atraso_maximo = 0.0
+                inicio = time.monotonic()
+                for i, comando in enumerate(comandos):
+                    limite = inicio + i * intervalo
+                    restante = limite - time.monotonic()
+                    if restante > 0:
+                        self._dormir(restante, "barrido")
+                    elif intervalo > 0:
+                        atraso_maximo = max(atraso_maximo, -restante)
+                    self._escribir(comando)
+                segundos = time.monotonic() - inicio
+                self._estado[canal]["frecuencia"] = float(frecuencias[-1])
+                resultado = {"modo": "software", "puntos": len(comandos), "segundos": segundos,
+                             "puntos_por_segundo": len(comandos) / segundos if segundos > 0 else float("inf"),
+                             "atraso_maximo": atraso_maximo}
+                log.info("Barrido por software: %s puntos en %.3f s (%.1f puntos/s, atraso máximo %.1f ms).",
+                         len(comandos), segundos, resultado["puntos_por_segundo"], atraso_maximo * 1000)
+                return resultado
+            except pyvisa.VisaIOError as e:
+                self.invalidar_estado(canal)
+                log.error("Error de comunicación durante el barrido: %s", e)
+                self.handle_disconnection()
+            except Exception as e:
+                self.invalidar_estado(canal)
+                log.error("Error inesperado durante el barrido: %s", e)
+                self.handle_disconnection()
+        else:
+            log.warning("No hay conexión activa con el generador.")
+        return False
+
+    def custom_signal(self, signal, v_max=1.0, v_min=-1.0):
+        ##########################################################################################
+        # Carga una señal arbitraria en la memoria volatil y la selecciona en el canal 1          #
+        #    Parámetros:                                                                          #
+        #    - signal: Iterable de numeros (hasta PUNTOS_MAXIMOS), se escala al rango del DAC     #
+        #    - v_max, v_min: Voltaje que corresponde al maximo y al minimo de la señal            #
+        ##########################################################################################
+        valores = [float(v) for v in signal]
+        if not 1 <= len(valores) <= self.PUNTOS_MAXIMOS:
+            log.warning("La señal debe tener entre 1 y %s puntos.", self.PUNTOS_MAXIMOS)
+            return False
+        if self._disponible():
+            try:
+                alto, bajo = max(valores), min(valores)
+                if alto == bajo:
+                    dac = [self.DAC_MAXIMO // 2] * len(valores) # Señal plana: punto medio del DAC
+                else:
+                    # Codigo mas cercano: truncar podia dejar el maximo en DAC_MAXIMO - 1 (coma flotante)
+                    escala = self.DAC_MAXIMO / (alto - bajo)
+                    dac = [round((v - bajo) * escala) for v in valores]
+                def cargar():
+                    with self.lote():
+                        self._escribir("VOLT:UNIT VPP")
+                        self._escribir(f"VOLT:HIGH {v_max}")
+                        self._escribir(f"VOLT:LOW {v_min}")
+                        self._escribir("DATA:DEL VOLATILE")
+                        self._escribir("DATA:DAC VOLATILE," + ",".join(map(str, dac)))
+                        self._escribir("FUNC:USER VOLATILE")
+                self._con_reintento(cargar)
+                self._estado[1].update({"funcion": "USER", "amplitud": float(v_max - v_min),
+                                        "offset": float(v_max + v_min) / 2})
+                self._informar("Señal arbitraria cargada en CH1: %s puntos, %s a %s V.", len(dac), v_min, v_max)
+                return True
+            except ErrorSCPI as e:
+                self.invalidar_estado(1)
+                log.error("El generador rechazó la señal arbitraria: %s", e)
+            except pyvisa.VisaIOError as e:
+                log.error("Error de comunicación al cargar la señal arbitraria: %s", e)
+                self.handle_disconnection()
+            except Exception as e:
+                log.error("Error inesperado al cargar la señal arbitraria: %s", e)
+                self.handle_disconnection()
+        else:
+            log.warning("No hay conexión activa con el generador.")
+        return False
+
     def turn_off(self):
     ############################################################################################
     # Si esta conectado, Manda una señal de APAGADO, Y maneja errores y una desconeccion segura#
     ############################################################################################
-        if self.is_connected():
+        if self._disponible():
             try:
-                self.instrument.write("OUTP OFF")
-                time.sleep(0.5)
-                print("Generador apagado.")
+                self._con_reintento(lambda: self._aplicar(1, {"salida": False}))
+                self._informar("Generador apagado.")
+                return True
+            except ErrorSCPI as e:
+                self.invalidar_estado(1)
+                log.error("El generador rechazó apagar la salida: %s", e)
             except pyvisa.VisaIOError as e:
-                print(f"Error de comunicación al apagar el generador: {e}")
+                log.error("Error de comunicación al apagar el generador: %s", e)
                 self.handle_disconnection()
             except Exception as e:
-                print(f"Error inesperado al apagar el generador: {e}")
+                log.error("Error inesperado al apagar el generador: %s", e)
         else:
-            print("No hay conexión activa con el generador.")
+            log.warning("No hay conexión activa con el generador.")
+        return False
    
     def handle_disconnection(self):
     ###############################################################################################################################
-    # Este metodo cierra la coneccion de pyvisa con el generador de funciones de manera correcta e intenta reconectar una sola vez#
+    # Este metodo cierra la coneccion de pyvisa con el generador de funciones de manera correcta e intenta reconectar             #
+    # con espera exponencial con jitter. Si se agotan los intentos abre el circuito: durante la pausa no se reintenta y los       #
+    # metodos fallan de inmediato. Con el circuito abierto y la pausa cumplida se hace un solo intento. Retorna True si reconecto #
     ###############################################################################################################################
-        print("Manejando desconexión...")
+        log.warning("Manejando desconexión...")
         if self.instrument:
             try:
                 self.instrument.close()
             except pyvisa.VisaIOError as e:
-                print(f"No se pudo cerrar la conexión correctamente: {e}")
+                log.warning("No se pudo cerrar la conexión correctamente: %s", e)
             except Exception as e:
-                print(f"Error inesperado al cerrar la conexión: {e}")
+                log.error("Error inesperado al cerrar la conexión: %s", e)
             finally:
                 self.instrument = None
         else:
-            print("No hay conexión activa con el generador.")
+            log.warning("No hay conexión activa con el generador.")
+        self.invalidar_estado() # Tras un corte no se sabe que comandos llegaron
 
-        time.sleep(2)  # intentar reconectar
-        if self.connect():
-            print("Reconectado exitosamente.")
+        if self._circuito_abierto and time.monotonic() < self._reabrir_en:
+            log.warning("Generador no disponible, próximo intento de reconexión en %.1f s.",
+                        self._reabrir_en - time.monotonic())
+            return False
+        intentos = 1 if self._circuito_abierto else self.REINTENTOS_RECONEXION
+        for intento in range(intentos):
+            # Mitad fija (da tiempo a que el USB se re-enumere) y mitad al azar, para que varios programas que
+            # pierden el USB a la vez no reintenten juntos
+            tope = min(self.RECONEXION_MAXIMA, self.RECONEXION_BASE * 2 ** intento)
+            self._dormir(tope / 2 + random.uniform(0, tope / 2), "reconexion")
+            if self._reconectar():
+                log.info("Reconectado exitosamente.")
+                self._circuito_abierto = False
+                self._pausa_circuito = None
+                return True
+        if self._circuito_abierto:
+            self._pausa_circuito = min(self.PAUSA_CIRCUITO_MAXIMA, 2 * self._pausa_circuito)
         else:
-            print("No se pudo reconectar.")
+            self._pausa_circuito = self.PAUSA_CIRCUITO
+        self._circuito_abierto = True
+        self._reabrir_en = time.monotonic() + self._pausa_circuito
+        log.error("No se pudo reconectar; los comandos fallarán de inmediato durante %.0f s.", self._pausa_circuito)
+        return False
+
+    def _reconectar(self):
+        ###############################################################################################
+        # Un intento de reconexion: primero el ultimo recurso; si no responde, una enumeracion nueva  #
+        # buscando el mismo numero de serie, porque al re-enumerarse el USB el nombre VISA cambia     #
+        ###############################################################################################
+        inicio = time.perf_counter()
+        anterior = self.recurso_conectado or self.recurso
+        if anterior is None:
+            return self.connect() # Nunca se conecto: busqueda normal
+        try:
+            if self._abrir(anterior, validar=True):
+                return self._conectado(inicio, "reconexión")
+            serie = (self.identificacion or {}).get("serie")
+            for recurso in self.pyvisa.list_resources(self.filtro_visa):
+                if recurso != anterior and (serie in recurso if serie else "DG1D200" in recurso):
+                    if self._abrir(recurso, validar=True):
+                        return self._conectado(inicio, "reconexión con recurso re-enumerado")
+        except Exception as e:
+            log.warning("Intento de reconexión fallido: %s", e)
+        return False
+
+    def _disponible(self):
+        ##############################################################################################
+        # Retorna True si hay conexion. Sin conexion y con el circuito abierto, una vez cumplida la   #
+        # pausa hace un solo intento de reconexion; antes de eso retorna False sin esperar            #
+        ##############################################################################################
+        if self.instrument is not None:
+            return True
+        if self._circuito_abierto and time.monotonic() >= self._reabrir_en:
+            log.info("Reintentando la conexión con el generador...")
+            return self.handle_disconnection()
+        return False
+
+    def _con_reintento(self, operacion):
+        ##############################################################################################
+        # Ejecuta operacion(); si falla la comunicacion, reconecta y la repite una sola vez.          #
+        # Las operaciones envian valores absolutos y el modelo queda invalidado al reconectar, por    #
+        # eso al repetirlas se reenvia la configuracion completa sin efectos duplicados.              #
+        # Si no se pudo reconectar se relanza el error original.                                      #
+        ##############################################################################################
+        try:
+            return operacion()
+        except pyvisa.VisaIOError as e:
+            log.warning("Error de comunicación (%s), se reconecta y se repite la operación.", e)
+            if not self.handle_disconnection():
+                raise
+        return operacion()
    
     def close(self):
     ############################################################################################################
@@ -284,7 +1355,7 @@ class GeneradorFunciones:
             self.disconnect()
             self.pyvisa.close()
         else:
-            print("No hay conexión activa con el generador.")
+            log.warning("No hay conexión activa con el generador.")
 
 ## IMPORTANTE, NOTA:
 # Las validaciones de los rangos estan en el menu
@@ -1,13 +1,13 @@
-from generador_funciones import GeneradorFunciones  
+import logging
+
+from generador_funciones import RANGO_AMPLITUD, RANGO_CICLOS, RANGO_FRECUENCIA
 #################################################################################
 # Menu para interactuar con el generador de funciones                           #
 # Ademas valida las entradas para frecuencia amplitud y ciclos para el canal 1  #
 # Para el canal 2 solo se valida frecuencia y amplitud                          #
 #################################################################################
 
-
-controller = GeneradorFunciones()
-controller.connect()
+controller = None # Se crea y conecta en main(), importar el menu no toca el hardware
 
 def display_menu():
     """
@@ -36,7 +36,7 @@ def delCanal1():
     while True:
         try:
             frequency = float(input("Ingrese frecuencia en Hz (0.000001 a 20 000 000): "))
-            if frequency < 0.000001 or frequency > 20000000:
+            if frequency < RANGO_FRECUENCIA[0] or frequency > RANGO_FRECUENCIA[1]:
                 raise ValueError("La frecuencia debe estar entre 0.000001 Hz y 20 000 000 Hz")
             break
         except ValueError as e:
@@ -44,7 +44,7 @@ def delCanal1():
     while True:
         try:
             cycles = int(input("Ingresa la cantidad de ciclos (1 a 50 000): "))
-            if cycles < 1 or cycles > 50000:
+            if cycles < RANGO_CICLOS[0] or cycles > RANGO_CICLOS[1]:
                 raise ValueError("La cantidad de ciclos debe estar entre 1 y 50 000")
             break
         except ValueError as e:
@@ -53,7 +53,7 @@ def delCanal1():
     while True:
         try:
             amplitude = float(input("Ingresa el valor de amplitud en Vpp (0.002 a 10): "))
-            if amplitude < 0.002 or amplitude > 10:
+            if amplitude < RANGO_AMPLITUD[0] or amplitude > RANGO_AMPLITUD[1]:
                 raise ValueError("La amplitud debe estar entre 0.002 y 10 Vpp.")
             break
         except ValueError as e:
@@ -65,7 +65,9 @@ def estadoCanal1():
     #####################################
     # Leer el estado actual del canal 1 #
     # ###################################
-    controller.read_channel_1_state()
+    estado = controller.read_channel_1_state()
+    if estado is not None:
+        print(f"Estado actual del canal 1: {estado}")
 
 def delCanal2():
     #############################################
@@ -79,7 +81,7 @@ def delCanal2():
                 frequency = 4800
             else:
                 frequency = float(freq_input)
-                if frequency < 0.000001 or frequency > 20000000:
+                if frequency < RANGO_FRECUENCIA[0] or frequency > RANGO_FRECUENCIA[1]:
                     raise ValueError("La frecuencia debe estar entre 0.000001 Hz y 20 000 000 Hz")
             break
         except ValueError as e:
@@ -93,7 +95,7 @@ def delCanal2():
                 amplitude = 5
             else:
                 amplitude = float(amp_input)
-                if amplitude < 0.002 or amplitude > 10:
+                if amplitude < RANGO_AMPLITUD[0] or amplitude > RANGO_AMPLITUD[1]:
                     raise ValueError("La amplitud debe estar entre 0.002 y 10 Vpp.")
             break
         except ValueError as e:
@@ -104,7 +106,9 @@ def estadoCanal2():
     #####################################
     # Leer el estado actual del canal 2 #
     # ###################################
-    controller.read_channel_2_state()
+    estado = controller.read_channel_2_state()
+    if estado is not None:
+        print(f"Estado actual del canal 2: {estado}")
 
 def apagarGenerador():
     #####################################
@@ -113,10 +117,20 @@ def apagarGenerador():
     controller.turn_off()
 
 def salir():
+    ################################################################################
+    # Apaga la salida antes de desconectar. Con el servidor, disconnect() solo     #
+    # cierra el socket del menu, por eso el apagado se pide aparte                 #
+    ################################################################################
+    controller.turn_off()
     controller.disconnect()
 
 def main():
     """Función principal que ejecuta el menú de opciones."""
+    global controller
+    logging.basicConfig(level=logging.INFO, format="%(message)s") # Muestra los mensajes del generador por consola
+    from cliente_generador import abrir_generador # Solo al ejecutar el menu: importar el menu sigue siendo rapido
+    controller = abrir_generador() # Usa el servidor local (servidor_generador.py) si esta corriendo
+    controller.connect()
     while True:
         display_menu()
         try:
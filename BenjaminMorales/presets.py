@@ -0,0 +1,145 @@
+"""
+Índice en disco de las configuraciones completas guardadas en la memoria interna del DG1022.
+
+El generador guarda una configuración completa (ambos canales, burst, disparo, barrido) con *SAV n y
+la recupera con *RCL n en un solo comando, en vez de reenviar cada parámetro. El equipo solo conoce
+números de ranura; este índice asocia un nombre a cada ranura junto con la huella (SHA-1) y el
+estado que tenía el generador al guardarla. Con la huella, guardar de nuevo la misma configuración
+no reescribe la ranura, y al recuperar con verificación se detecta una ranura sobrescrita desde el
+panel frontal u otro programa (queda marcada como obsoleta hasta guardarla otra vez).
+
+El archivo puede guardar el índice de varios generadores: cada uno bajo su número de serie. Si se
+necesita una ranura y están todas ocupadas se reutiliza la de un preset obsoleto o, si no hay, la menos
+usada (LRU).
+"""
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import time
+
+log = logging.getLogger(__name__)
+
+# Campos de EstadoGenerador que toda entrada del indice debe tener para que su huella sea comparable
+CAMPOS_HUELLA = {"canal_1", "canal_2", "burst", "disparo", "barrido", "forma_usuario"}
+
+
+def huella_estado(estado):
+    """
+    SHA-1 de la configuración de un EstadoGenerador (sin el instante de lectura): ambos canales, burst,
+    disparo, barrido y forma arbitraria seleccionada, es decir todo lo que lee snapshot().
+    """
+    datos = dataclasses.asdict(estado)
+    datos.pop("instante", None)
+    return hashlib.sha1(json.dumps(datos, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class IndicePresets:
+    """
+    Nombres, ranuras y huellas de las configuraciones guardadas en un generador.
+
+    Parámetros:
+        serie (str): Número de serie del generador (clave del índice en el archivo).
+        ruta (str): Archivo JSON del índice. None para no guardar en disco.
+        ranuras (tuple): Ranuras de *SAV/*RCL que puede ocupar el índice (GeneradorFunciones.RANURAS_PRESET).
+
+    Cada entrada de `presets` es {"ranura", "hash", "estado", "uso", "obsoleto"}; "estado" es el
+    EstadoGenerador guardado como diccionario, sin el instante.
+    """
+    def __init__(self, serie, ruta, ranuras):
+        self.serie = serie
+        self.ruta = ruta
+        self.ranuras = tuple(ranuras)
+        self.presets = {} # nombre -> entrada
+        self.cargar()
+
+    def cargar(self):
+        ##############################################################################
+        # Lee las entradas de este generador desde disco, si el archivo existe        #
+        ##############################################################################
+        if not self.ruta or not os.path.exists(self.ruta):
+            return
+        try:
+            with open(self.ruta, encoding="utf-8") as archivo:
+                indice = json.load(archivo)
+        except (OSError, ValueError) as e:
+            log.warning("No se pudo leer el índice de presets %s: %s", self.ruta, e)
+            return
+        self.presets = {nombre: entrada for nombre, entrada in indice.get(self.serie, {}).items()
+                        if entrada.get("ranura") in self.ranuras}
+        for entrada in self.presets.values():
+            if not CAMPOS_HUELLA <= set(entrada.get("estado", {})):
+                # Guardada antes de que la huella cubriera el barrido y la forma arbitraria: no es confiable
+                entrada["obsoleto"] = True
+
+    def guardar(self):
+        ##############################################################################
+        # Escribe el indice sin perder las entradas de otros generadores              #
+        ##############################################################################
+        if not self.ruta:
+            return
+        indice = {}
+        if os.path.exists(self.ruta):
+            try:
+                with open(self.ruta, encoding="utf-8") as archivo:
+                    indice = json.load(archivo)
+            except (OSError, ValueError):
+                indice = {}
+        indice[self.serie] = self.presets
+        temporal = self.ruta + ".tmp"
+        try:
+            with open(temporal, "w", encoding="utf-8") as archivo:
+                json.dump(indice, archivo, indent=1)
+            os.replace(temporal, self.ruta) # Reemplazo atomico, igual que cache_formas: nunca queda a medio escribir
+        except OSError as e:
+            log.warning("No se pudo guardar el índice de presets: %s", e)
+
+    def buscar(self, nombre):
+        return self.presets.get(nombre)
+
+    def ranura_para(self, nombre, huella):
+        ##############################################################################################
+        # Retorna (ranura, hay_que_guardar). Un nombre conocido conserva su ranura y solo se vuelve   #
+        # a guardar si cambió la huella o la ranura está obsoleta. Uno nuevo toma una ranura libre, o #
+        # la de un preset obsoleto o el usado hace más tiempo, que sale del índice                    #
+        ##############################################################################################
+        entrada = self.presets.get(nombre)
+        if entrada is not None:
+            return entrada["ranura"], entrada["hash"] != huella or entrada["obsoleto"]
+        ocupadas = {e["ranura"]: n for n, e in self.presets.items()}
+        libres = [ranura for ranura in self.ranuras if ranura not in ocupadas]
+        if libres:
+            return libres[0], True
+        # Primero las ranuras obsoletas, despues la usada hace mas tiempo
+        desalojado = min(self.presets, key=lambda n: (not self.presets[n]["obsoleto"], self.presets[n]["uso"]))
+        log.info("Se reutiliza la ranura %s del preset %s.", self.presets[desalojado]["ranura"], desalojado)
+        return self.presets.pop(desalojado)["ranura"], True
+
+    def registrar(self, nombre, ranura, huella, estado):
+        ##############################################################################
+        # Anota la configuracion guardada en `ranura` (estado: EstadoGenerador)       #
+        ##############################################################################
+        datos = dataclasses.asdict(estado)
+        datos.pop("instante", None)
+        self.presets[nombre] = {"ranura": ranura, "hash": huella, "estado": datos, "uso": time.time(),
+                                "obsoleto": False}
+        self.guardar()
+
+    def usar(self, nombre):
+        self.presets[nombre]["uso"] = time.time()
+        self.guardar()
+
+    def marcar_obsoleto(self, nombre):
+        ##############################################################################
+        # La ranura ya no tiene lo que dice el indice: no se recupera hasta guardarla #
+        ##############################################################################
+        self.presets[nombre]["obsoleto"] = True
+        self.guardar()
+
+    def eliminar(self, nombre):
+        ##############################################################################
+        # Quita el nombre del indice; la ranura del generador no se borra             #
+        ##############################################################################
+        if self.presets.pop(nombre, None) is not None:
+            self.guardar()
@@ -0,0 +1,306 @@
+"""
+Ejecuta recetas de configuración en generadores DG1022 sin interacción (reemplaza al menú en producción).
+
+Una receta (JSON o TOML) indica en qué generadores se ejecuta y la lista de pasos, en orden:
+
+    {
+        "generadores": "todos",                  # "primero" (por defecto), "todos" o lista de números de serie
+        "pasos": [
+            {"canal_1": {"frecuencia": 1000, "amplitud": 5, "ciclos": 10, "offset": 0}},
+            {"canal_2": {"frecuencia": 4800, "amplitud": 5}},
+            {"senal": {"archivo": "forma.txt", "v_max": 1, "v_min": -1}},   # o "puntos": [0, 0.5, 1, ...]
+            {"barrido": {"inicio": 100, "fin": 10000, "tiempo": 2, "espaciado": "LOG"}},
+            {"salida": true},
+            {"esperar": 5.0}
+        ]
+    }
+
+La receta completa se valida antes de conectar, con los mismos rangos que el menú (RANGO_FRECUENCIA,
+RANGO_CICLOS y RANGO_AMPLITUD de generador_funciones). Luego se ejecuta en todos los generadores en
+paralelo, cada paso confirmado con *OPC? (sin esperas fijas). El progreso se escribe en un archivo JSON
+Lines: una línea por paso con su duración y una línea final por generador.
+
+Uso:
+    python receta.py receta.json -r resultados.jsonl
+    python receta.py receta.toml --validar
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+from flota import FlotaGeneradores
+from generador_funciones import RANGO_AMPLITUD, RANGO_CICLOS, RANGO_FRECUENCIA, GeneradorFunciones
+
+try:
+    import tomllib # Python 3.11+
+except ImportError:
+    tomllib = None
+
+
+class ErrorReceta(ValueError):
+    """La receta no es valida. `errores` tiene un mensaje por cada problema encontrado."""
+    def __init__(self, errores):
+        super().__init__("\n".join(errores))
+        self.errores = errores
+
+
+# Tipos de paso y los campos que acepta cada uno
+PASOS = {
+    "canal_1": ("frecuencia", "amplitud", "ciclos", "offset"),
+    "canal_2": ("frecuencia", "amplitud", "offset"),
+    "senal": ("puntos", "archivo", "v_max", "v_min"),
+    "barrido": ("inicio", "fin", "tiempo", "espaciado"),
+    "salida": (),
+    "esperar": (),
+}
+
+
+def leer_receta(ruta):
+    ###########################################################################
+    # Lee una receta JSON o TOML (segun la extension) y la retorna validada    #
+    ###########################################################################
+    if ruta.endswith(".toml"):
+        if tomllib is None:
+            raise ErrorReceta(["Las recetas TOML necesitan Python 3.11 o superior (tomllib)."])
+        with open(ruta, "rb") as archivo:
+            receta = tomllib.load(archivo)
+    else:
+        with open(ruta, encoding="utf-8") as archivo:
+            receta = json.load(archivo)
+    return validar_receta(receta, os.path.dirname(os.path.abspath(ruta)))
+
+
+def _numero(errores, lugar, valor, rango=None, entero=False):
+    # Agrega a `errores` el problema del valor, si lo hay, y lo retorna convertido
+    tipos = (int,) if entero else (int, float)
+    if isinstance(valor, bool) or not isinstance(valor, tipos):
+        errores.append(f"{lugar}: se esperaba un {'entero' if entero else 'numero'}, no {valor!r}")
+        return None
+    if rango is not None and not rango[0] <= valor <= rango[1]:
+        errores.append(f"{lugar}: {valor} fuera del rango {rango[0]} a {rango[1]}")
+    return valor
+
+
+def _leer_puntos(errores, lugar, ruta):
+    # Archivo de texto con un valor por linea (o separados por coma)
+    try:
+        with open(ruta, encoding="utf-8") as archivo:
+            texto = archivo.read().replace(",", "\n")
+        return [float(linea) for linea in texto.split() if linea]
+    except (OSError, ValueError) as e:
+        errores.append(f"{lugar}: no se pudo leer {ruta}: {e}")
+        return None
+
+
+def validar_receta(receta, carpeta="."):
+    ##############################################################################################
+    # Revisa la receta completa antes de tocar el hardware, con los mismos rangos que el menu.   #
+    # Retorna la receta normalizada: {"generadores": "primero" | "todos" | [series],             #
+    # "pasos": [(tipo, parametros), ...]}. Lanza ErrorReceta con todos los problemas encontrados. #
+    ##############################################################################################
+    errores = []
+    if not isinstance(receta, dict):
+        raise ErrorReceta(["La receta debe ser un objeto con la lista 'pasos'."])
+    generadores = receta.get("generadores", "primero")
+    if not (generadores in ("primero", "todos") or
+            (isinstance(generadores, list) and generadores and all(isinstance(g, str) for g in generadores))):
+        errores.append("generadores: debe ser 'primero', 'todos' o una lista de numeros de serie")
+    pasos = receta.get("pasos")
+    if not isinstance(pasos, list) or not pasos:
+        raise ErrorReceta(errores + ["pasos: la receta necesita una lista de pasos no vacia"])
+
+    normalizados = []
+    for i, paso in enumerate(pasos):
+        lugar = f"pasos[{i}]"
+        if not isinstance(paso, dict) or len(paso) != 1 or next(iter(paso)) not in PASOS:
+            errores.append(f"{lugar}: cada paso es un objeto con una sola clave de {', '.join(PASOS)}")
+            continue
+        tipo, valor = next(iter(paso.items()))
+        lugar = f"{lugar}.{tipo}"
+        if tipo == "salida":
+            if not isinstance(valor, bool):
+                errores.append(f"{lugar}: debe ser true o false")
+            normalizados.append((tipo, valor))
+            continue
+        if tipo == "esperar":
+            normalizados.append((tipo, _numero(errores, lugar, valor, (0, float("inf")))))
+            continue
+        if not isinstance(valor, dict):
+            errores.append(f"{lugar}: se esperaba un objeto con {', '.join(PASOS[tipo])}")
+            continue
+        for campo in set(valor) - set(PASOS[tipo]):
+            errores.append(f"{lugar}.{campo}: campo desconocido")
+        parametros = {}
+        if tipo in ("canal_1", "canal_2"):
+            obligatorios = ("frecuencia", "amplitud", "ciclos") if tipo == "canal_1" else ()
+            for campo in obligatorios:
+                if campo not in valor:
+                    errores.append(f"{lugar}.{campo}: falta")
+            if "frecuencia" in valor:
+                parametros["frecuencia"] = _numero(errores, f"{lugar}.frecuencia", valor["frecuencia"], RANGO_FRECUENCIA)
+            if "amplitud" in valor:
+                parametros["amplitud"] = _numero(errores, f"{lugar}.amplitud", valor["amplitud"], RANGO_AMPLITUD)
+            if "ciclos" in valor:
+                parametros["ciclos"] = _numero(errores, f"{lugar}.ciclos", valor["ciclos"], RANGO_CICLOS, entero=True)
+            if "offset" in valor:
+                parametros["offset"] = _numero(errores, f"{lugar}.offset", valor["offset"])
+        elif tipo == "senal":
+            if ("puntos" in valor) == ("archivo" in valor):
+                errores.append(f"{lugar}: indique 'puntos' o 'archivo' (solo uno)")
+                puntos = None
+            elif "archivo" in valor:
+                puntos = _leer_puntos(errores, f"{lugar}.archivo", os.path.join(carpeta, valor["archivo"]))
+            else:
+                puntos = valor["puntos"]
+                if not isinstance(puntos, list) or not all(
+                        isinstance(p, (int, float)) and not isinstance(p, bool) for p in puntos):
+                    errores.append(f"{lugar}.puntos: debe ser una lista de numeros")
+                    puntos = None
+            if puntos is not None and not 1 <= len(puntos) <= GeneradorFunciones.PUNTOS_MAXIMOS:
+                errores.append(f"{lugar}: la señal debe tener entre 1 y {GeneradorFunciones.PUNTOS_MAXIMOS} puntos")
+            v_max = _numero(errores, f"{lugar}.v_max", valor.get("v_max", 1.0))
+            v_min = _numero(errores, f"{lugar}.v_min", valor.get("v_min", -1.0))
+            if v_max is not None and v_min is not None:
+                _numero(errores, f"{lugar}: v_max - v_min", v_max - v_min, RANGO_AMPLITUD)
+            parametros = {"puntos": puntos, "v_max": v_max, "v_min": v_min}
+        elif tipo == "barrido":
+            for campo in ("inicio", "fin", "tiempo"):
+                if campo not in valor:
+                    errores.append(f"{lugar}.{campo}: falta")
+            parametros = {
+                "inicio": _numero(errores, f"{lugar}.inicio", valor.get("inicio", 1), RANGO_FRECUENCIA),
+                "fin": _numero(errores, f"{lugar}.fin", valor.get("fin", 1), RANGO_FRECUENCIA),
+                "tiempo": _numero(errores, f"{lugar}.tiempo", valor.get("tiempo", 1), (0.001, 500)),
+                "espaciado": valor.get("espaciado", "LIN"),
+            }
+            if parametros["espaciado"] not in ("LIN", "LOG"):
+                errores.append(f"{lugar}.espaciado: debe ser 'LIN' o 'LOG'")
+        normalizados.append((tipo, parametros))
+    if errores:
+        raise ErrorReceta(errores)
+    return {"generadores": generadores, "pasos": normalizados}
+
+
+def ejecutar_paso(generador, tipo, parametros):
+    #####################################################################
+    # Ejecuta un paso validado. Retorna False si el generador fallo      #
+    #####################################################################
+    if tipo == "canal_1":
+        return generador.channel_1(parametros["frecuencia"], parametros["amplitud"], parametros["ciclos"],
+                                   parametros.get("offset", 0))
+    if tipo == "canal_2":
+        return generador.channel_2(parametros.get("frecuencia", 4800), parametros.get("amplitud", 5),
+                                   parametros.get("offset", 0))
+    if tipo == "senal":
+        return generador.custom_signal(parametros["puntos"], parametros["v_max"], parametros["v_min"])
+    if tipo == "barrido":
+        return generador.barrido(parametros["inicio"], parametros["fin"], parametros["tiempo"],
+                                 parametros["espaciado"]) is not None
+    if tipo == "salida":
+        return generador.turn_on() if parametros else generador.turn_off()
+    if tipo == "esperar":
+        time.sleep(parametros)
+        return True
+    raise ValueError(f"Paso desconocido: {tipo}")
+
+
+class Resultados:
+    """
+    Archivo de resultados en formato JSON Lines: una linea por paso terminado y una linea final por
+    generador, escritas a medida que avanza la receta para poder seguir el progreso desde otro programa.
+    """
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.inicio = time.monotonic()
+        self._lock = threading.Lock()
+        if ruta:
+            open(ruta, "w", encoding="utf-8").close()
+
+    def registrar(self, evento):
+        evento = dict(evento, t=round(time.monotonic() - self.inicio, 6))
+        if self.ruta:
+            with self._lock, open(self.ruta, "a", encoding="utf-8") as archivo:
+                archivo.write(json.dumps(evento) + "\n")
+        return evento
+
+
+def ejecutar_en_generador(generador, serie, pasos, resultados):
+    ##################################################################################
+    # Ejecuta todos los pasos en un generador; se detiene en el primer paso que falle #
+    ##################################################################################
+    inicio = time.perf_counter()
+    for indice, (tipo, parametros) in enumerate(pasos):
+        comienzo = time.perf_counter()
+        try:
+            ok, error = ejecutar_paso(generador, tipo, parametros) is not False, None
+        except Exception as e:
+            ok, error = False, str(e)
+        resultados.registrar({"generador": serie, "paso": indice, "tipo": tipo, "ok": ok, "error": error,
+                              "segundos": round(time.perf_counter() - comienzo, 6)})
+        if not ok:
+            break
+    total = time.perf_counter() - inicio
+    resultados.registrar({"generador": serie, "fin": True, "ok": ok, "pasos_ejecutados": indice + 1,
+                          "pasos_totales": len(pasos), "segundos": round(total, 6)})
+    return ok
+
+
+def ejecutar_receta(receta, ruta_resultados=None, resource_manager=None, **opciones):
+    ##############################################################################################
+    # Conecta los generadores que pide la receta y la ejecuta en todos en paralelo.               #
+    # Retorna True si todos los generadores completaron todos los pasos.                          #
+    ##############################################################################################
+    resultados = Resultados(ruta_resultados)
+    flota = FlotaGeneradores(resource_manager=resource_manager, timeout=None, **opciones)
+    try:
+        flota.descubrir()
+        series = sorted(flota.unidades)
+        if receta["generadores"] == "primero":
+            series = series[:1]
+        elif receta["generadores"] != "todos":
+            faltantes = set(receta["generadores"]) - set(series)
+            if faltantes:
+                resultados.registrar({"error": f"Generadores no encontrados: {', '.join(sorted(faltantes))}"})
+                return False
+            series = receta["generadores"]
+        if not series:
+            resultados.registrar({"error": "No se encontro ningun generador"})
+            return False
+        pasos = receta["pasos"]
+        por_unidad = flota.aplicar({
+            serie: (lambda g, s=serie: ejecutar_en_generador(g, s, pasos, resultados)) for serie in series
+        })
+        return all(resultado["ok"] for resultado in por_unidad.values())
+    finally:
+        flota.close()
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(
+        description="Ejecuta una receta (JSON o TOML) en uno o varios generadores DG1022 sin interaccion.")
+    parser.add_argument("receta", help="Archivo .json o .toml con la receta")
+    parser.add_argument("-r", "--resultados", default="resultados.jsonl",
+                        help="Archivo JSON Lines con el progreso y los tiempos (por defecto resultados.jsonl)")
+    parser.add_argument("--modo", choices=GeneradorFunciones.MODOS_SINCRONIZACION, default="opc",
+                        help="Modo de sincronizacion de los comandos (por defecto opc)")
+    parser.add_argument("--validar", action="store_true", help="Solo valida la receta, sin conectar")
+    argumentos = parser.parse_args(argumentos)
+    try:
+        receta = leer_receta(argumentos.receta)
+    except (OSError, ValueError) as e:
+        errores = e.errores if isinstance(e, ErrorReceta) else [str(e)]
+        print(f"Receta no valida ({len(errores)} errores):", file=sys.stderr)
+        for error in errores:
+            print("  " + error, file=sys.stderr)
+        return 2
+    if argumentos.validar:
+        print(f"Receta valida: {len(receta['pasos'])} pasos.")
+        return 0
+    return 0 if ejecutar_receta(receta, argumentos.resultados, modo_sincronizacion=argumentos.modo) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
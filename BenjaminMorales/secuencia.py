@@ -0,0 +1,169 @@
+import logging
+import os
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+
+class SecuenciaProgramada:
+    """
+    Ejecuta una secuencia de configuraciones de un GeneradorFunciones en instantes fijos.
+
+    Cada paso es (instante, configuracion): `instante` en segundos desde el inicio de la secuencia y
+    `configuracion` como en FlotaGeneradores, un diccionario {metodo: argumentos} o una función que recibe
+    el generador. Antes de empezar, preparar() ejecuta cada configuración con generador.grabar(): así
+    todos los mensajes SCPI quedan armados de antemano y solo con los cambios respecto del paso anterior.
+    Si algún método retorna False (generador desconectado, valores inválidos) preparar() lanza
+    RuntimeError y la secuencia no empieza.
+    Durante la ejecución un hilo dedicado espera cada instante con el reloj monotónico (durmiendo hasta
+    `espera_activa` segundos antes y luego en espera activa) y envía los mensajes del paso sin calcular
+    nada. Las esperas de los pasos no se acumulan: un paso atrasado no corre los siguientes.
+
+    Para cada paso se registra el instante programado, el de envío real, el jitter (diferencia entre
+    ambos), el costo de la transacción (hasta que el generador confirma con SYST:ERR?) y la holgura que
+    quedó hasta el paso siguiente. Si la transacción de un paso dura más que el tiempo que queda hasta el
+    siguiente, se emite una advertencia.
+
+    Parámetros:
+        generador: GeneradorFunciones conectado.
+        pasos: Lista de (instante, configuracion), en cualquier orden.
+        espera_activa (float): Segundos finales de cada espera que se hacen en espera activa (mayor precisión).
+
+    Ejemplo de uso:
+        secuencia = SecuenciaProgramada(generador, [
+            (0.0, {"channel_1": (1000, 5, 10), "turn_on": ()}),
+            (2.0, {"channel_1": (2000, 5, 10)}),
+            (4.0, {"turn_off": ()}),
+        ])
+        resultados = secuencia.ejecutar()
+        print(secuencia.resumen())
+    """
+    def __init__(self, generador, pasos, espera_activa=0.002):
+        self.generador = generador
+        self.pasos = sorted(pasos, key=lambda paso: paso[0])
+        self.espera_activa = espera_activa
+        self.mensajes = None # Mensajes pre-codificados de cada paso, ver preparar()
+        self.avisos = None # Mensajes de registro de cada paso, se emiten cuando el generador lo confirma
+        self.resultados = []
+        self.error = None
+        self._hilo = None
+        self._detener = threading.Event()
+
+    def preparar(self):
+        ##############################################################################################
+        # Arma de antemano los mensajes SCPI de todos los pasos sin enviarlos. Si el modelo en        #
+        # memoria del generador es desconocido puede consultar al instrumento (antes de empezar).    #
+        # Los "configurado" de cada paso se registran recien al enviarlo y pasar SYST:ERR?           #
+        # Lanza RuntimeError si algun metodo retorna False (por ejemplo sin conexion o con valores   #
+        # fuera de rango); en ese caso el modelo en memoria se invalida y no queda nada preparado.   #
+        ##############################################################################################
+        self.mensajes = []
+        self.avisos = []
+        for indice, (instante, configuracion) in enumerate(self.pasos):
+            with self.generador.grabar() as comandos:
+                if callable(configuracion):
+                    fallidos = ["funcion"] if configuracion(self.generador) is False else []
+                else:
+                    fallidos = [metodo for metodo, argumentos in configuracion.items()
+                                if getattr(self.generador, metodo)(*argumentos) is False]
+            if fallidos:
+                self.mensajes = self.avisos = None
+                self.generador.invalidar_estado() # El modelo avanzo con pasos que no se van a enviar
+                raise RuntimeError(f"No se pudo preparar el paso {indice} ({instante} s): "
+                                   f"falló {', '.join(fallidos)}")
+            self.mensajes.append(self.generador.agrupar_mensajes(comandos) if comandos else [])
+            self.avisos.append(comandos.avisos)
+        return self.mensajes
+
+    def _subir_prioridad(self):
+        # Baja el nice del hilo de envio (Linux); sin permisos se sigue con la prioridad normal
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), -10)
+        except (AttributeError, OSError) as e:
+            log.debug("No se pudo subir la prioridad del hilo de la secuencia: %s", e)
+
+    def _esperar_hasta(self, limite):
+        restante = limite - time.monotonic()
+        if restante > self.espera_activa:
+            self._detener.wait(restante - self.espera_activa)
+        while time.monotonic() < limite and not self._detener.is_set():
+            pass
+
+    def _ejecutar(self):
+        self._subir_prioridad()
+        inicio = time.monotonic() + self.espera_activa # Pequeño margen para que el paso 0 tambien llegue a tiempo
+        try:
+            for indice, ((instante, _), mensajes, avisos) in enumerate(zip(self.pasos, self.mensajes, self.avisos)):
+                self._esperar_hasta(inicio + instante)
+                if self._detener.is_set():
+                    break
+                envio = time.monotonic()
+                if mensajes:
+                    self.generador.enviar_mensajes(mensajes, avisos)
+                fin = time.monotonic()
+                resultado = {"paso": indice, "programado": instante, "envio": envio - inicio,
+                             "jitter": envio - inicio - instante, "costo": fin - envio,
+                             "mensajes": len(mensajes), "holgura": None}
+                if indice + 1 < len(self.pasos):
+                    resultado["holgura"] = inicio + self.pasos[indice + 1][0] - fin
+                    if resultado["holgura"] < 0:
+                        log.warning("El paso %d tardó %.1f ms y atrasa %.1f ms al paso %d.", indice,
+                                    resultado["costo"] * 1000, -resultado["holgura"] * 1000, indice + 1)
+                self.resultados.append(resultado)
+        except Exception as e:
+            self.error = e
+            self.generador.invalidar_estado() # El modelo quedo en el estado del ultimo paso preparado
+            log.error("La secuencia se detuvo en el paso %d: %s", len(self.resultados), e)
+        if self._detener.is_set():
+            self.generador.invalidar_estado()
+
+    def iniciar(self):
+        ##############################################################################
+        # Prepara los mensajes (si no se hizo) y comienza la secuencia en otro hilo   #
+        ##############################################################################
+        if self.mensajes is None:
+            self.preparar()
+        self.resultados = []
+        self.error = None
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._ejecutar, name="secuencia", daemon=True)
+        self._hilo.start()
+
+    def esperar(self, timeout=None):
+        ##############################################################################
+        # Espera a que termine la secuencia y retorna la lista de resultados          #
+        ##############################################################################
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+        return self.resultados
+
+    def detener(self):
+        ##############################################################################
+        # Cancela los pasos que aun no se enviaron                                   #
+        ##############################################################################
+        self._detener.set()
+        return self.esperar()
+
+    def ejecutar(self):
+        ##############################################################################
+        # Ejecuta la secuencia completa y retorna los resultados de cada paso        #
+        ##############################################################################
+        self.iniciar()
+        return self.esperar()
+
+    def resumen(self):
+        ##################################################################################
+        # Retorna jitter maximo, medio y p95, costo maximo y pasos atrasados (segundos)   #
+        ##################################################################################
+        if not self.resultados:
+            return None
+        jitters = sorted(abs(r["jitter"]) for r in self.resultados)
+        return {
+            "pasos": len(self.resultados),
+            "jitter_maximo": jitters[-1],
+            "jitter_medio": sum(jitters) / len(jitters),
+            "jitter_p95": jitters[min(len(jitters) - 1, int(0.95 * len(jitters)))],
+            "costo_maximo": max(r["costo"] for r in self.resultados),
+            "pasos_atrasados": sum(1 for r in self.resultados if r["holgura"] is not None and r["holgura"] < 0),
+        }
@@ -0,0 +1,252 @@
+"""
+Servidor local que comparte un DG1022 entre varios procesos.
+
+Solo un proceso puede tener abierta la sesión USB-TMC. Este servidor la abre con GeneradorFunciones y
+atiende a varios clientes (ClienteGenerador de cliente_generador.py, el menú, scripts) por un socket TCP
+local o Unix, con mensajes JSON de una línea:
+
+    pedido:    {"id": 1, "metodo": "channel_1", "args": [1000, 5, 10]}
+    respuesta: {"id": 1, "resultado": true, "error": null, "cache": false}
+
+Cada cliente puede enviar varios pedidos sin esperar las respuestas (pipelining); se ejecutan en orden
+y las respuestas vuelven en ese mismo orden. Los pedidos de distintos clientes se atienden por turnos,
+uno por cliente en cada ronda, para que un script que encola cientos de comandos no deje esperando al
+menú. Toda la E/S VISA ocurre en un único hilo. Las lecturas de estado se responden desde un cache sin
+pasar por la cola mientras no haya escrituras nuevas ni pedidos pendientes de ese cliente. Si algún
+cliente tiene una escritura pendiente sobre el mismo canal, la lectura no usa el cache y se ejecuta
+después de esa escritura, para que nadie lea el estado anterior a un cambio ya pedido.
+
+Uso:
+    python servidor_generador.py [--direccion 127.0.0.1:5026 | --direccion /tmp/dg1022.sock]
+                                 [--modo opc|srq|sleep] [--vigencia-cache 1.0]
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from cliente_generador import PUERTO, VARIABLE_ENTORNO, codificar_resultado, interpretar_direccion
+from generador_funciones import GeneradorFunciones
+
+log = logging.getLogger(__name__)
+
+# Metodos de GeneradorFunciones que atiende el servidor y si cambian el generador
+ESCRITURAS = ("turn_on", "turn_off", "channel_1", "channel_2", "custom_signal", "barrido", "barrido_software",
+              "invalidar_estado", "guardar_preset", "recuperar_preset", "eliminar_preset")
+LECTURAS = ("read_channel_1_state", "read_channel_2_state", "snapshot", "listar_presets", "is_connected")
+# Canales que toca cada metodo; los que no aparecen (snapshot, presets, barrido_software...) cuentan como ambos
+CANALES = {"turn_on": (1,), "turn_off": (1,), "channel_1": (1,), "custom_signal": (1,), "barrido": (1,),
+           "read_channel_1_state": (1,), "channel_2": (2,), "read_channel_2_state": (2,)}
+
+
+class ServidorGenerador:
+    """
+    Atiende pedidos de varios clientes sobre un GeneradorFunciones ya creado.
+
+    Parámetros:
+        generador: GeneradorFunciones (se conecta en iniciar() si no lo está).
+        vigencia_cache (float): Segundos que una lectura cacheada sigue siendo válida; 0 desactiva el cache.
+    """
+    def __init__(self, generador, vigencia_cache=1.0):
+        self.generador = generador
+        self.vigencia_cache = vigencia_cache
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dg1022")
+        self._colas = collections.OrderedDict() # cliente -> deque de (pedido, futuro, previas) por ejecutar
+        self._escrituras = {1: set(), 2: set()} # canal -> futuros de escrituras encoladas o en ejecucion
+        self._sin_terminar = collections.Counter() # cliente -> pedidos encolados o en ejecucion
+        self._hay_pedidos = None # asyncio.Event, se crea dentro del event loop
+        self._cache = {} # metodo -> (resultado, time.monotonic())
+        self._servidor = None
+        self.estadisticas = {"clientes": 0, "pedidos": 0, "desde_cache": 0, "errores": 0}
+
+    async def iniciar(self, direccion):
+        ##############################################################################################
+        # Conecta el generador (en el hilo de E/S) y empieza a escuchar en `direccion`:               #
+        # (host, puerto) o ruta de un socket Unix                                                     #
+        ##############################################################################################
+        self._hay_pedidos = asyncio.Event()
+        if not self.generador.is_connected():
+            await asyncio.get_running_loop().run_in_executor(self._executor, self.generador.connect)
+        if isinstance(direccion, str):
+            if os.path.exists(direccion):
+                os.unlink(direccion) # Socket viejo de una ejecucion anterior
+            self._servidor = await asyncio.start_unix_server(self._atender, path=direccion)
+        else:
+            self._servidor = await asyncio.start_server(self._atender, *direccion)
+        self._despachador = asyncio.ensure_future(self._despachar())
+        log.info("Servidor del generador escuchando en %s", direccion)
+        return self._servidor
+
+    async def detener(self):
+        self._servidor.close()
+        await self._servidor.wait_closed()
+        self._despachador.cancel()
+        await asyncio.get_running_loop().run_in_executor(self._executor, self.generador.close)
+        self._executor.shutdown(wait=False)
+
+    async def _atender(self, lector, escritor):
+        ##############################################################################################
+        # Una conexion: lee pedidos y los encola sin esperar su resultado; otra tarea escribe las    #
+        # respuestas en orden a medida que terminan                                                   #
+        ##############################################################################################
+        cliente = object()
+        self._colas[cliente] = collections.deque()
+        respuestas = asyncio.Queue()
+        escritura = asyncio.ensure_future(self._responder(escritor, respuestas))
+        self.estadisticas["clientes"] += 1
+        try:
+            while True:
+                linea = await lector.readline()
+                if not linea:
+                    break
+                try:
+                    pedido = json.loads(linea)
+                    if not isinstance(pedido, dict):
+                        raise ValueError
+                except ValueError:
+                    await respuestas.put(({"id": None}, self._error("Pedido mal formado"), False))
+                    continue
+                await respuestas.put((pedido,) + self._recibir(cliente, pedido))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            # Los pedidos que quedaron en cola de un cliente que se fue no se ejecutan
+            for _, futuro, _ in self._colas.pop(cliente, ()):
+                futuro.cancel()
+            del self._sin_terminar[cliente]
+            await respuestas.put(None)
+            await escritura
+            escritor.close()
+
+    def _error(self, mensaje):
+        futuro = asyncio.get_running_loop().create_future()
+        futuro.set_exception(ValueError(mensaje))
+        return futuro
+
+    def _recibir(self, cliente, pedido):
+        ##############################################################################################
+        # Retorna (futuro, desde_cache). Una lectura se responde desde el cache si es valida, el      #
+        # cliente no tiene pedidos anteriores sin terminar (asi ve sus propias escrituras) y ningun   #
+        # cliente tiene escrituras pendientes en sus canales; el resto se encola. Una lectura         #
+        # encolada guarda esas escrituras pendientes (previas) y se ejecuta despues de ellas          #
+        ##############################################################################################
+        self.estadisticas["pedidos"] += 1
+        metodo = pedido.get("metodo")
+        futuro = asyncio.get_running_loop().create_future()
+        if metodo not in ESCRITURAS and metodo not in LECTURAS:
+            futuro.set_exception(ValueError("Método no permitido: %s" % metodo))
+            return futuro, False
+        canales = CANALES.get(metodo, (1, 2))
+        previas = ()
+        if metodo in LECTURAS:
+            previas = tuple(set().union(*(self._escrituras[canal] for canal in canales)))
+            if not self._sin_terminar[cliente] and not previas and metodo in self._cache:
+                resultado, instante = self._cache[metodo]
+                if time.monotonic() - instante <= self.vigencia_cache:
+                    self.estadisticas["desde_cache"] += 1
+                    futuro.set_result(resultado)
+                    return futuro, True
+        else:
+            for canal in canales:
+                self._escrituras[canal].add(futuro)
+                futuro.add_done_callback(self._escrituras[canal].discard)
+        self._colas[cliente].append((pedido, futuro, previas))
+        self._sin_terminar[cliente] += 1
+        self._hay_pedidos.set()
+        return futuro, False
+
+    async def _despachar(self):
+        ##############################################################################################
+        # Ronda por turnos: toma un pedido de cada cliente con pedidos y lo ejecuta en el hilo de E/S #
+        # Una lectura cuyas escrituras previas no terminaron espera a la ronda siguiente. El pedido   #
+        # mas antiguo nunca espera, asi que cada ronda ejecuta al menos uno                            #
+        ##############################################################################################
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._hay_pedidos.wait()
+            for cliente, cola in list(self._colas.items()):
+                if not cola or not all(previa.done() for previa in cola[0][2]):
+                    continue
+                pedido, futuro, _ = cola.popleft()
+                if futuro.cancelled():
+                    continue
+                try:
+                    resultado = await loop.run_in_executor(self._executor, self._ejecutar, pedido["metodo"],
+                                                           pedido.get("args") or [])
+                except Exception as e:
+                    self.estadisticas["errores"] += 1
+                    resultado = None
+                    if not futuro.cancelled():
+                        futuro.set_exception(e)
+                if cliente in self._colas:
+                    self._sin_terminar[cliente] -= 1
+                if not futuro.done():
+                    futuro.set_result(resultado)
+            if not any(self._colas.values()):
+                self._hay_pedidos.clear()
+
+    def _ejecutar(self, metodo, args):
+        # En el hilo de E/S. Una escritura invalida el cache; una lectura lo actualiza
+        resultado = codificar_resultado(getattr(self.generador, metodo)(*args))
+        if metodo in ESCRITURAS:
+            self._cache.clear()
+        elif self.vigencia_cache > 0 and metodo != "is_connected":
+            self._cache[metodo] = (resultado, time.monotonic())
+        return resultado
+
+    async def _responder(self, escritor, respuestas):
+        while True:
+            elemento = await respuestas.get()
+            if elemento is None:
+                return
+            pedido, futuro, desde_cache = elemento
+            respuesta = {"id": pedido.get("id"), "resultado": None, "error": None, "cache": desde_cache}
+            try:
+                respuesta["resultado"] = await futuro
+            except asyncio.CancelledError:
+                return
+            except Exception as e:
+                respuesta["error"] = "%s: %s" % (type(e).__name__, e)
+            try:
+                escritor.write((json.dumps(respuesta) + "\n").encode("utf-8"))
+                await escritor.drain()
+            except ConnectionError:
+                return
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Comparte un generador DG1022 entre varios procesos.")
+    parser.add_argument("--direccion", default=os.environ.get(VARIABLE_ENTORNO, "127.0.0.1:%d" % PUERTO),
+                        help="host:puerto o ruta de un socket Unix (por defecto 127.0.0.1:%d)" % PUERTO)
+    parser.add_argument("--modo", choices=GeneradorFunciones.MODOS_SINCRONIZACION, default="opc",
+                        help="Modo de sincronización de GeneradorFunciones")
+    parser.add_argument("--vigencia-cache", type=float, default=1.0,
+                        help="Segundos que una lectura de estado se responde desde el cache (0 = sin cache)")
+    argumentos = parser.parse_args(argumentos)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    servidor = ServidorGenerador(GeneradorFunciones(modo_sincronizacion=argumentos.modo),
+                                 vigencia_cache=argumentos.vigencia_cache)
+
+    async def correr():
+        await servidor.iniciar(interpretar_direccion(argumentos.direccion))
+        try:
+            await asyncio.Event().wait() # Hasta Ctrl+C
+        finally:
+            await servidor.detener()
+
+    try:
+        asyncio.run(correr())
+    except KeyboardInterrupt:
+        log.info("Servidor detenido.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,404 @@
+# -*- coding: utf-8 -*-
+"""
+Grabacion y reproduccion de sesiones SCPI de los drivers del DG1022.
+
+GrabadorSCPI se entrega a los drivers en el mismo parametro que Instrumentacion (ambos ofrecen
+envolver() y registrar_espera()) y escribe cada operacion VISA en un diario de solo agregado, un
+objeto JSON por linea: comando, respuesta, instante de inicio, duracion y error, ademas de las
+esperas deliberadas del driver (time.sleep) con su motivo. Cada linea se escribe al terminar la
+operacion, asi que el diario de una corrida que se corta queda completo hasta ese punto.
+
+Con el diario se puede, sin el instrumento:
+    - analizar(): repartir el tiempo de pared entre el bus (write/read/query), las esperas fijas del
+      driver y el resto, que es tiempo de Python entre operaciones.
+    - exportar_traza(): linea de tiempo en el formato de Chrome (chrome://tracing o Perfetto).
+    - exportar_plegado(): pilas plegadas para flamegraph.pl o speedscope.
+    - reproducir(): volver a ejecutar la sesion contra el simulador, al ritmo grabado (las pausas
+      entre operaciones se respetan) o a la maxima velocidad.
+
+Ejemplo de uso:
+    generador = GeneradorFunciones(instrumentacion=GrabadorSCPI("corrida.jsonl"))  # BenjaminMorales
+    generator = dg1022.dg1022(instrumentacion=GrabadorSCPI("corrida.jsonl"))       # PedroPerlaza
+
+    python grabador_scpi.py analizar corrida.jsonl --traza traza.json --plegado pilas.txt
+    python grabador_scpi.py reproducir corrida.jsonl [--maxima]
+"""
+
+import argparse
+import base64
+import datetime
+import itertools
+import json
+import sys
+import threading
+import time
+
+from instrumentacion import mnemonico
+
+VERSION = 1
+OPERACIONES = ("write", "write_raw", "write_binary_values", "read", "query", "wait_for_srq")
+PAUSA_MINIMA = 1e-4  # Segundos sin operaciones a partir de los cuales la linea de tiempo muestra el hueco
+
+
+class GrabadorSCPI:
+    """
+    Diario de la E/S VISA de un driver.
+
+    Parámetros:
+        ruta (str): Archivo del diario; se agrega al final si ya existe. None guarda los eventos solo
+            en la lista `eventos` (lo usa reproducir()).
+        instrumentacion: Instrumentacion opcional que ademas mide las mismas operaciones.
+
+    Cada evento tiene "op" (nombre de la operacion pyvisa, "espera", "abrir" o "atributo"), "t"
+    (segundos desde el inicio de la grabacion), "s" (duracion) y "sesion" (numero de la sesion VISA,
+    definido por su evento "abrir"). Segun la operacion tambien "msg", "resp", "error", "motivo".
+    """
+    def __init__(self, ruta=None, instrumentacion=None):
+        self.ruta = ruta
+        self.instrumentacion = instrumentacion
+        self.eventos = [] if ruta is None else None
+        self._archivo = open(ruta, "a", encoding="utf-8", buffering=1) if ruta else None  # Una linea por write
+        self._lock = threading.Lock()
+        self._sesiones = itertools.count(1)
+        self._inicio = time.perf_counter()
+        self._escribir({"op": "inicio", "version": VERSION, "epoca": time.time(),
+                        "fecha": datetime.datetime.now().isoformat(timespec="seconds")})
+
+    def _escribir(self, evento):
+        with self._lock:
+            if self._archivo is not None:
+                self._archivo.write(json.dumps(evento, separators=(",", ":"), default=str) + "\n")
+            else:
+                self.eventos.append(evento)
+
+    def anotar(self, evento, inicio=None, fin=None):
+        """Agrega un evento; `inicio` y `fin` son instantes de time.perf_counter()."""
+        fin = time.perf_counter() if fin is None else fin
+        evento["t"] = round((fin if inicio is None else inicio) - self._inicio, 6)
+        if inicio is not None:
+            evento["s"] = round(fin - inicio, 6)
+        self._escribir(evento)
+
+    def envolver(self, recurso):
+        """Retorna la sesion VISA envuelta; cada operacion queda en el diario."""
+        if self.instrumentacion is not None:
+            recurso = self.instrumentacion.envolver(recurso)
+        sesion = next(self._sesiones)
+        self.anotar({"op": "abrir", "sesion": sesion, "recurso": getattr(recurso, "resource_name", None)})
+        return RecursoGrabado(recurso, self, sesion)
+
+    def registrar_espera(self, segundos, motivo):
+        """Anota una espera deliberada del driver que acaba de terminar."""
+        fin = time.perf_counter()
+        self.anotar({"op": "espera", "motivo": motivo}, fin - segundos, fin)
+        if self.instrumentacion is not None:
+            self.instrumentacion.registrar_espera(segundos, motivo)
+
+    def cerrar(self):
+        if self._archivo is not None:
+            self._archivo.close()
+            self._archivo = None
+
+
+class RecursoGrabado:
+    """
+    Sesion VISA que anota cada operacion en un GrabadorSCPI y la delega a la sesion real.
+    Los cambios de atributos (timeout, terminadores) tambien se anotan, para repetirlos al reproducir.
+    """
+    def __init__(self, recurso, grabador, sesion):
+        object.__setattr__(self, "_recurso", recurso)
+        object.__setattr__(self, "_grabador", grabador)
+        object.__setattr__(self, "_sesion", sesion)
+
+    def __getattr__(self, nombre):
+        return getattr(self._recurso, nombre)
+
+    def __setattr__(self, nombre, valor):
+        setattr(self._recurso, nombre, valor)
+        self._grabador.anotar({"op": "atributo", "sesion": self._sesion, "nombre": nombre, "valor": valor})
+
+    def _operar(self, evento, funcion, *args, **kwargs):
+        evento["sesion"] = self._sesion
+        inicio = time.perf_counter()
+        try:
+            resultado = funcion(*args, **kwargs)
+        except Exception as e:
+            evento["error"] = str(e)
+            self._grabador.anotar(evento, inicio)
+            raise
+        if evento["op"] in ("read", "query"):
+            evento["resp"] = resultado
+        self._grabador.anotar(evento, inicio)
+        return resultado
+
+    def write(self, mensaje, *args, **kwargs):
+        return self._operar({"op": "write", "msg": mensaje}, self._recurso.write, mensaje, *args, **kwargs)
+
+    def write_raw(self, mensaje):
+        evento = {"op": "write_raw", "raw": base64.b64encode(mensaje).decode("ascii")}
+        return self._operar(evento, self._recurso.write_raw, mensaje)
+
+    def write_binary_values(self, mensaje, valores, *args, **kwargs):
+        evento = {"op": "write_binary_values", "msg": mensaje,
+                  "valores": valores.tolist() if hasattr(valores, "tolist") else list(valores),
+                  "opciones": kwargs}
+        return self._operar(evento, self._recurso.write_binary_values, mensaje, valores, *args, **kwargs)
+
+    def read(self, *args, **kwargs):
+        return self._operar({"op": "read"}, self._recurso.read, *args, **kwargs)
+
+    def query(self, mensaje, *args, **kwargs):
+        return self._operar({"op": "query", "msg": mensaje}, self._recurso.query, mensaje, *args, **kwargs)
+
+    def wait_for_srq(self, *args, **kwargs):
+        evento = {"op": "wait_for_srq", "args": list(args), "opciones": kwargs}
+        return self._operar(evento, self._recurso.wait_for_srq, *args, **kwargs)
+
+    def close(self):
+        return self._operar({"op": "close"}, self._recurso.close)
+
+
+# --- Lectura y analisis ------------------------------------------------------------------------
+
+def leer_diario(ruta):
+    """
+    Retorna las corridas del diario: una lista de eventos por cada evento "inicio" (un mismo archivo
+    puede acumular varias grabaciones).
+    """
+    corridas = []
+    with open(ruta, encoding="utf-8") as archivo:
+        for linea in archivo:
+            if not linea.strip():
+                continue
+            evento = json.loads(linea)
+            if evento["op"] == "inicio" or not corridas:
+                corridas.append([])
+            corridas[-1].append(evento)
+    return corridas
+
+
+def _medidos(eventos):
+    # Operaciones de E/S y esperas en orden de inicio, con el mnemonico SCPI de cada una. Un read o un
+    # wait_for_srq se atribuye al ultimo comando escrito en la misma sesion
+    ultimo = {}
+    medidos = []
+    for evento in eventos:
+        if evento["op"] == "espera":
+            medidos.append(("espera", evento["motivo"], evento))
+        elif evento["op"] in OPERACIONES:
+            if "msg" in evento:
+                ultimo[evento["sesion"]] = mnemonico(evento["msg"])
+            elif "raw" in evento:
+                ultimo[evento["sesion"]] = mnemonico(base64.b64decode(evento["raw"]))
+            medidos.append(("bus", "%s %s" % (evento["op"], ultimo.get(evento["sesion"], "")), evento))
+    medidos.sort(key=lambda medido: medido[2]["t"])
+    return medidos
+
+
+def analizar(eventos):
+    """
+    Reparte el tiempo de pared de una corrida, desde el inicio de la primera operacion hasta el fin
+    de la ultima, entre el bus, las esperas del driver y Python (lo que no es ninguno de los dos).
+
+    Retorna {"segundos_pared", "segundos_bus", "segundos_espera", "segundos_python", "operaciones",
+    "errores", "bus": {"op MNEMONICO": {"llamadas", "segundos"}}, "esperas": {motivo: {...}}}.
+    """
+    resumen = {"segundos_pared": 0.0, "segundos_bus": 0.0, "segundos_espera": 0.0, "segundos_python": 0.0,
+               "operaciones": 0, "errores": 0, "bus": {}, "esperas": {}}
+    medidos = _medidos(eventos)
+    if not medidos:
+        return resumen
+    for categoria, nombre, evento in medidos:
+        grupo = resumen["bus" if categoria == "bus" else "esperas"].setdefault(nombre, {"llamadas": 0, "segundos": 0.0})
+        grupo["llamadas"] += 1
+        grupo["segundos"] += evento["s"]
+        resumen["segundos_" + categoria] += evento["s"]
+        resumen["operaciones"] += categoria == "bus"
+        resumen["errores"] += "error" in evento
+    resumen["segundos_pared"] = max(e["t"] + e["s"] for _, _, e in medidos) - medidos[0][2]["t"]
+    # Con varios hilos las operaciones pueden solaparse; el tiempo de Python no baja de cero
+    resumen["segundos_python"] = max(0.0, resumen["segundos_pared"] - resumen["segundos_bus"]
+                                     - resumen["segundos_espera"])
+    return resumen
+
+
+def imprimir_resumen(resumen, filas=10):
+    """Imprime el reparto del tiempo de pared con las `filas` entradas mas costosas de cada grupo."""
+    pared = resumen["segundos_pared"] or 1.0
+
+    def fila(sangria, nombre, segundos, llamadas=None):
+        barra = "#" * int(round(40 * segundos / pared))
+        detalle = " (%d)" % llamadas if llamadas is not None else ""
+        print("%-44s %10.1f ms %6.1f %%  %s" % (sangria + nombre + detalle, segundos * 1e3, 100 * segundos / pared, barra))
+
+    print("%d operaciones, %d con error" % (resumen["operaciones"], resumen["errores"]))
+    fila("", "pared", resumen["segundos_pared"])
+    for categoria, grupo in (("bus", "bus"), ("espera", "esperas")):
+        fila("  ", categoria, resumen["segundos_" + categoria])
+        ordenados = sorted(resumen[grupo].items(), key=lambda item: -item[1]["segundos"])
+        for nombre, total in ordenados[:filas]:
+            fila("    ", nombre, total["segundos"], total["llamadas"])
+    fila("  ", "python", resumen["segundos_python"])
+
+
+def imprimir_linea_tiempo(eventos, limite=None):
+    """Imprime cada operacion con su instante y duracion, y los huecos de Python entre operaciones."""
+    medidos = _medidos(eventos)[:limite]
+    if not medidos:
+        return
+    origen = fin_anterior = medidos[0][2]["t"]
+    for categoria, nombre, evento in medidos:
+        if evento["t"] - fin_anterior > PAUSA_MINIMA:
+            print("%+11.3f ms %9.3f ms  python" % ((fin_anterior - origen) * 1e3, (evento["t"] - fin_anterior) * 1e3))
+        detalle = evento.get("msg", "")[:60]
+        if "error" in evento:
+            detalle += "  ERROR: " + evento["error"]
+        print("%+11.3f ms %9.3f ms  %-6s %-28s %s" % ((evento["t"] - origen) * 1e3, evento["s"] * 1e3, categoria,
+                                                      nombre, detalle))
+        fin_anterior = max(fin_anterior, evento["t"] + evento["s"])
+
+
+def exportar_traza(eventos, ruta):
+    """Escribe la linea de tiempo en el formato JSON de Chrome (un carril por sesion VISA y uno de esperas)."""
+    traza = []
+    for categoria, nombre, evento in _medidos(eventos):
+        argumentos = {clave: evento[clave] for clave in ("msg", "resp", "error", "motivo") if clave in evento}
+        if "msg" in argumentos:
+            argumentos["msg"] = argumentos["msg"][:200]
+        traza.append({"name": nombre, "cat": categoria, "ph": "X", "pid": 1, "tid": evento.get("sesion", 0),
+                      "ts": evento["t"] * 1e6, "dur": evento["s"] * 1e6, "args": argumentos})
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        json.dump({"traceEvents": traza, "displayTimeUnit": "ms"}, archivo)
+
+
+def exportar_plegado(eventos, ruta):
+    """Escribe el reparto de analizar() como pilas plegadas ('pared;bus;write APPL 1234', en microsegundos)."""
+    resumen = analizar(eventos)
+    lineas = []
+    for grupo, categoria in (("bus", "bus"), ("esperas", "espera")):
+        for nombre, total in resumen[grupo].items():
+            lineas.append("pared;%s;%s %d" % (categoria, nombre, round(total["segundos"] * 1e6)))
+    lineas.append("pared;python %d" % round(resumen["segundos_python"] * 1e6))
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        archivo.write("\n".join(lineas) + "\n")
+
+
+# --- Reproduccion ------------------------------------------------------------------------------
+
+def reproducir(eventos, gestor=None, velocidad=1.0, grabador=None):
+    """
+    Vuelve a ejecutar una corrida contra el instrumento de `gestor` (por defecto un simulador con los
+    mismos recursos) y la graba en `grabador` (por defecto en memoria) para analizarla igual.
+
+    Parámetros:
+        velocidad (float): 1 respeta los instantes grabados (incluidas las esperas y las pausas de
+            Python), 2 va al doble de rapido, 0 ejecuta todo sin pausas ni esperas.
+
+    Los timeouts grabados se repiten con inyectar_timeout() si el instrumento lo permite. Retorna
+    {"operaciones", "errores", "respuestas_distintas", "segundos", "grabador"}.
+    """
+    if gestor is None:
+        # Importado aca: grabar una corrida no necesita el simulador, solo reproducirla
+        from simulador_dg1022 import SimuladorResourceManager
+        recursos = sorted({e["recurso"] for e in eventos if e["op"] == "abrir" and e.get("recurso")})
+        gestor = SimuladorResourceManager(recursos or None)
+    grabador = grabador if grabador is not None else GrabadorSCPI()
+    resultado = {"operaciones": 0, "errores": 0, "respuestas_distintas": 0, "grabador": grabador}
+    sesiones = {}
+    programados = sorted((e for e in eventos if "t" in e), key=lambda e: e["t"])
+    origen = programados[0]["t"] if programados else 0.0
+    inicio = time.perf_counter()
+    for evento in programados:
+        if velocidad:
+            restante = (evento["t"] - origen) / velocidad - (time.perf_counter() - inicio)
+            if restante > 0:
+                time.sleep(restante)
+        operacion = evento["op"]
+        if operacion == "abrir":
+            sesiones[evento["sesion"]] = grabador.envolver(gestor.open_resource(evento["recurso"]))
+            continue
+        if operacion == "espera":
+            if velocidad:
+                time.sleep(evento["s"] / velocidad)
+                grabador.registrar_espera(evento["s"] / velocidad, evento["motivo"])
+            continue
+        sesion = sesiones.get(evento.get("sesion"))
+        if sesion is None:
+            continue
+        if operacion == "atributo":
+            try:
+                setattr(sesion, evento["nombre"], evento["valor"])
+            except Exception:
+                pass
+            continue
+        error = evento.get("error", "")
+        if operacion in ("read", "query") and ("TMO" in error or "imeout" in error):
+            inyectar = getattr(getattr(sesion, "_recurso", sesion), "inyectar_timeout", None)
+            if inyectar is not None:
+                inyectar()
+        resultado["operaciones"] += operacion != "close"
+        try:
+            if operacion == "write_raw":
+                respuesta = sesion.write_raw(base64.b64decode(evento["raw"]))
+            elif operacion == "write_binary_values":
+                respuesta = sesion.write_binary_values(evento["msg"], evento["valores"], **evento["opciones"])
+            elif operacion == "wait_for_srq":
+                respuesta = sesion.wait_for_srq(*evento["args"], **evento["opciones"])
+            elif operacion in ("read", "close"):
+                respuesta = getattr(sesion, operacion)()
+            else:
+                respuesta = getattr(sesion, operacion)(evento["msg"])
+        except Exception:
+            resultado["errores"] += 1
+            continue
+        if "resp" in evento and respuesta != evento["resp"]:
+            resultado["respuestas_distintas"] += 1
+    resultado["segundos"] = time.perf_counter() - inicio
+    return resultado
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Analiza o reproduce un diario de GrabadorSCPI.")
+    parser.add_argument("accion", choices=("analizar", "reproducir"))
+    parser.add_argument("diario", help="Archivo JSONL escrito por GrabadorSCPI")
+    parser.add_argument("--corrida", type=int, default=-1,
+                        help="Corrida del diario a usar si tiene varias (por defecto la ultima)")
+    parser.add_argument("--velocidad", type=float, default=1.0,
+                        help="Al reproducir: 1 = ritmo grabado, 2 = el doble de rapido, 0 = sin pausas")
+    parser.add_argument("--maxima", action="store_true", help="Reproduce a la maxima velocidad (--velocidad 0)")
+    parser.add_argument("--salida", help="Al reproducir: diario donde grabar la reproduccion")
+    parser.add_argument("--linea-tiempo", type=int, metavar="N", help="Imprime las primeras N operaciones")
+    parser.add_argument("--traza", help="Archivo JSON de linea de tiempo (chrome://tracing, Perfetto)")
+    parser.add_argument("--plegado", help="Archivo de pilas plegadas (flamegraph.pl, speedscope)")
+    argumentos = parser.parse_args(argumentos)
+
+    corridas = leer_diario(argumentos.diario)
+    if not corridas:
+        print("El diario esta vacio")
+        return 1
+    eventos = corridas[argumentos.corrida]
+    if len(corridas) > 1:
+        print("El diario tiene %d corridas, se usa la %d" % (len(corridas), argumentos.corrida % len(corridas) + 1))
+
+    if argumentos.accion == "reproducir":
+        print("Grabado:")
+        imprimir_resumen(analizar(eventos))
+        grabador = GrabadorSCPI(argumentos.salida)
+        resultado = reproducir(eventos, velocidad=0 if argumentos.maxima else argumentos.velocidad, grabador=grabador)
+        grabador.cerrar()
+        print("Reproducido: %d operaciones en %.1f ms, %d errores, %d respuestas distintas de las grabadas"
+              % (resultado["operaciones"], resultado["segundos"] * 1e3, resultado["errores"],
+                 resultado["respuestas_distintas"]))
+        eventos = leer_diario(argumentos.salida)[-1] if argumentos.salida else grabador.eventos
+    imprimir_resumen(analizar(eventos))
+    if argumentos.linea_tiempo:
+        imprimir_linea_tiempo(eventos, argumentos.linea_tiempo)
+    if argumentos.traza:
+        exportar_traza(eventos, argumentos.traza)
+    if argumentos.plegado:
+        exportar_plegado(eventos, argumentos.plegado)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
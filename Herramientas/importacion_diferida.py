@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+Importacion diferida de modulos, compartida por ambos drivers.
+
+importar_diferido() retorna el modulo sin ejecutarlo: su codigo corre recien cuando se usa el primer
+atributo. Importar pyvisa toma del orden de 0.2 s y NumPy otro tanto, y no hacen falta hasta conectar
+o cargar una señal. El modulo se busca al declararlo, asi que uno que no esta instalado lanza
+ImportError en la linea de la declaracion y no con el primer uso.
+
+Los modulos propios de un driver se cargan desde su archivo (parametro `ruta`) y no por nombre: las
+carpetas de los drivers no son paquetes y un nombre como "presets" podria resolver a otro modulo que
+este antes en sys.path.
+
+Ejemplo de uso:
+    pyvisa = importar_diferido("pyvisa")
+    presets = importar_diferido("presets", os.path.join(os.path.dirname(__file__), "presets.py"))
+"""
+
+import importlib.util
+import os
+import sys
+
+_ARCHIVOS = {}  # nombre -> archivo de los modulos cargados aqui (leer __file__ de un modulo diferido lo ejecuta)
+
+
+def importar_diferido(nombre, ruta=None):
+    """
+    Retorna el modulo `nombre`, que se ejecuta al usar su primer atributo.
+
+    Parámetros:
+        nombre (str): Nombre con el que queda en sys.modules.
+        ruta (str): Archivo .py del modulo. None para buscarlo por nombre en sys.path (bibliotecas instaladas).
+
+    Lanza ImportError si el modulo no existe, o si ya hay otro modulo con ese nombre cargado desde otro archivo.
+    """
+    modulo = sys.modules.get(nombre)
+    if modulo is not None:
+        if ruta is not None:
+            archivo = _ARCHIVOS[nombre] if nombre in _ARCHIVOS else getattr(modulo, "__file__", None)
+            if archivo is None or os.path.normcase(os.path.abspath(archivo)) != os.path.normcase(os.path.abspath(ruta)):
+                raise ImportError("Ya hay un modulo %r cargado desde %s, no desde %s" % (nombre, archivo, ruta),
+                                  name=nombre, path=ruta)
+        return modulo
+    if ruta is None:
+        spec = importlib.util.find_spec(nombre)
+    elif os.path.exists(ruta):
+        spec = importlib.util.spec_from_file_location(nombre, ruta)
+    else:
+        spec = None
+    if spec is None or spec.loader is None:
+        raise ImportError("No se encontró el módulo %r" % nombre, name=nombre, path=ruta)
+    cargador = importlib.util.LazyLoader(spec.loader)
+    spec.loader = cargador
+    modulo = importlib.util.module_from_spec(spec)
+    sys.modules[nombre] = modulo
+    _ARCHIVOS[nombre] = spec.origin
+    cargador.exec_module(modulo)
+    return modulo
@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+"""
+Instrumentacion de la E/S VISA de los drivers del DG1022.
+
+Envuelve una sesion VISA (o un ResourceManager completo) y registra cada write/read/query:
+cabecera SCPI, bytes enviados y recibidos, tiempo en el bus y errores. Las esperas deliberadas
+de los drivers (time.sleep de sincronizacion, reconexion, etc.) se registran aparte con
+registrar_espera(), para separar el tiempo del instrumento del tiempo que el programa duerme.
+
+Los drivers no importan este modulo: reciben el objeto Instrumentacion como parametro y solo lo
+usan si no es None, por lo que sin instrumentacion la E/S va directo a pyvisa sin costo extra.
+
+Ejemplo de uso:
+    instrumentacion = Instrumentacion()
+    generador = GeneradorFunciones(instrumentacion=instrumentacion)     # BenjaminMorales
+    generator = dg1022.dg1022(instrumentacion=instrumentacion)          # PedroPerlaza
+    ...
+    print(instrumentacion.exportar_json())
+    print(instrumentacion.exportar_prometheus())
+"""
+
+import json
+import math
+import threading
+import time
+from collections import defaultdict, deque
+
+# Formas largas de los nodos SCPI usados por los drivers y su forma corta
+FORMAS_CORTAS = {
+    "APPLY": "APPL", "SINUSOID": "SIN", "SQUARE": "SQU", "PULSE": "PULS", "NOISE": "NOIS",
+    "BURST": "BURS", "STATE": "STAT", "NCYCLES": "NCYC", "PHASE": "PHAS", "INTERNAL": "INT",
+    "PERIOD": "PER", "TRIGGER": "TRIG", "SOURCE": "SOUR", "OUTPUT": "OUTP", "SYSTEM": "SYST",
+    "ERROR": "ERR", "VOLTAGE": "VOLT", "FREQUENCY": "FREQ", "FUNCTION": "FUNC",
+    "INSTRUMENT": "INST", "SELECT": "SEL", "OFFSET": "OFFS", "DELETE": "DEL",
+    "SWEEP": "SWE", "SPACING": "SPAC", "START": "STAR",
+}
+MUESTRAS_MAXIMAS = 10000  # Latencias guardadas por cabecera para calcular percentiles
+PERCENTILES = (50, 95, 99)
+
+
+def normalizar_cabecera(cabecera):
+    """Convierte una cabecera SCPI (p.ej. 'APPLy:SINusoid:CH2') a su forma corta en mayusculas."""
+    nodos = cabecera.strip().lstrip(":").upper().split(":")
+    return ":".join(FORMAS_CORTAS.get(nodo, nodo) for nodo in nodos)
+
+
+# Consultas de confirmacion que los drivers agregan al final de un mensaje compuesto ("FREQ 1000;*OPC?")
+CONFIRMACIONES = ("*OPC?", "SYST:ERR?")
+
+
+def _cabecera_comando(comando):
+    # Cabecera corta de un solo comando, sin canal y con '?' si es consulta
+    cabecera = comando.strip().split(" ", 1)[0].split(",", 1)[0].split("#", 1)[0]
+    consulta = cabecera.rstrip().endswith("?")
+    cabecera = normalizar_cabecera(cabecera.rstrip().rstrip("?"))
+    if cabecera.endswith((":CH1", ":CH2")):
+        cabecera = cabecera[:-4]
+    return cabecera + ("?" if consulta else "")
+
+
+def mnemonico(mensaje):
+    """
+    Retorna la cabecera SCPI corta de un mensaje, sin canal: 'APPLy:SINusoid:CH2 4800,5,0' -> 'APPL:SIN'.
+    Las consultas conservan el '?'. Un mensaje compuesto (comandos separados por ';') toma la cabecera de
+    su primer comando, sin contar las confirmaciones del final: 'FREQ 1000;*OPC?' -> 'FREQ' y
+    ':APPLy?;:OUTP?;...;:SYST:ERR?' -> 'APPL?'.
+    """
+    if isinstance(mensaje, bytes):
+        mensaje = mensaje[:64].decode("ascii", "replace")
+    comandos = [comando for comando in mensaje.split(";") if comando.strip()] or [mensaje]
+    while len(comandos) > 1 and _cabecera_comando(comandos[-1]) in CONFIRMACIONES:
+        comandos.pop()
+    return _cabecera_comando(comandos[0])
+
+
+def percentil(ordenados, p):
+    """Percentil p (0-100) por rango mas cercano de una lista ya ordenada."""
+    if not ordenados:
+        return None
+    indice = max(0, min(len(ordenados) - 1, math.ceil(p / 100 * len(ordenados)) - 1))
+    return ordenados[indice]
+
+
+class Instrumentacion:
+    """
+    Registro de latencias de la E/S VISA.
+
+    Parámetros:
+        muestras_maximas (int): Latencias guardadas por (operacion, cabecera); las mas viejas se descartan.
+
+    Observadores:
+        agregar_observador(funcion) registra una funcion que recibe cada evento como diccionario
+        {"operacion", "mnemonico", "bytes_enviados", "bytes_recibidos", "segundos", "error", "recurso"},
+        o {"operacion": "espera", "motivo", "segundos"} para las esperas deliberadas. Sirve para trazas
+        o para enviar los eventos a otro sistema.
+    """
+    def __init__(self, muestras_maximas=MUESTRAS_MAXIMAS):
+        self.muestras_maximas = muestras_maximas
+        self._lock = threading.Lock()
+        self._observadores = []
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Borra todas las medidas."""
+        with self._lock:
+            self._muestras = defaultdict(lambda: deque(maxlen=self.muestras_maximas))
+            self._totales = defaultdict(lambda: {"llamadas": 0, "errores": 0, "bytes_enviados": 0,
+                                                 "bytes_recibidos": 0, "segundos": 0.0})
+            self._esperas = defaultdict(lambda: {"llamadas": 0, "segundos": 0.0})
+
+    def agregar_observador(self, funcion):
+        self._observadores.append(funcion)
+
+    def quitar_observador(self, funcion):
+        self._observadores.remove(funcion)
+
+    def envolver(self, recurso):
+        """Retorna la sesion VISA envuelta; cada operacion queda registrada."""
+        return RecursoInstrumentado(recurso, self)
+
+    def envolver_gestor(self, gestor):
+        """Retorna un ResourceManager cuyas sesiones abiertas quedan todas instrumentadas."""
+        return GestorInstrumentado(gestor, self)
+
+    def registrar(self, operacion, mnemonico, bytes_enviados, bytes_recibidos, segundos, error=None, recurso=None):
+        """Anota una operacion de E/S y avisa a los observadores."""
+        clave = (operacion, mnemonico)
+        with self._lock:
+            self._muestras[clave].append(segundos)
+            total = self._totales[clave]
+            total["llamadas"] += 1
+            total["errores"] += error is not None
+            total["bytes_enviados"] += bytes_enviados
+            total["bytes_recibidos"] += bytes_recibidos
+            total["segundos"] += segundos
+        if self._observadores:
+            evento = {"operacion": operacion, "mnemonico": mnemonico, "bytes_enviados": bytes_enviados,
+                      "bytes_recibidos": bytes_recibidos, "segundos": segundos, "error": error, "recurso": recurso}
+            for observador in self._observadores:
+                observador(evento)
+
+    def registrar_espera(self, segundos, motivo):
+        """Anota una espera deliberada del driver (time.sleep) de `segundos` por `motivo`."""
+        with self._lock:
+            espera = self._esperas[motivo]
+            espera["llamadas"] += 1
+            espera["segundos"] += segundos
+        for observador in self._observadores:
+            observador({"operacion": "espera", "motivo": motivo, "segundos": segundos})
+
+    def resumen(self):
+        """
+        Retorna {"comandos": [...], "esperas": {...}}. Cada comando tiene operacion, mnemonico, llamadas,
+        errores, bytes enviados y recibidos, segundos totales y los percentiles p50/p95/p99 en segundos.
+        """
+        with self._lock:
+            comandos = []
+            for (operacion, nombre), total in sorted(self._totales.items()):
+                ordenados = sorted(self._muestras[(operacion, nombre)])
+                fila = {"operacion": operacion, "mnemonico": nombre}
+                fila.update(total)
+                for p in PERCENTILES:
+                    fila["p%d" % p] = percentil(ordenados, p)
+                comandos.append(fila)
+            esperas = {motivo: dict(espera) for motivo, espera in self._esperas.items()}
+        tiempo_bus = sum(c["segundos"] for c in comandos)
+        tiempo_espera = sum(e["segundos"] for e in esperas.values())
+        return {"comandos": comandos, "esperas": esperas,
+                "segundos_bus": tiempo_bus, "segundos_espera": tiempo_espera}
+
+    def exportar_json(self, ruta=None):
+        """Retorna el resumen como texto JSON y, si se entrega `ruta`, lo escribe en ese archivo."""
+        texto = json.dumps(self.resumen(), indent=1)
+        if ruta:
+            with open(ruta, "w", encoding="utf-8") as archivo:
+                archivo.write(texto)
+        return texto
+
+    def exportar_prometheus(self, prefijo="dg1022"):
+        """Retorna el resumen en el formato de texto de Prometheus (summary por cabecera y contadores)."""
+        resumen = self.resumen()
+        lineas = ["# HELP %s_comando_segundos Latencia de E/S VISA por cabecera SCPI." % prefijo,
+                  "# TYPE %s_comando_segundos summary" % prefijo]
+        for c in resumen["comandos"]:
+            etiquetas = 'operacion="%s",mnemonico="%s"' % (c["operacion"], c["mnemonico"])
+            for p in PERCENTILES:
+                lineas.append('%s_comando_segundos{%s,quantile="%s"} %.9f'
+                              % (prefijo, etiquetas, p / 100, c["p%d" % p]))
+            lineas.append("%s_comando_segundos_sum{%s} %.9f" % (prefijo, etiquetas, c["segundos"]))
+            lineas.append("%s_comando_segundos_count{%s} %d" % (prefijo, etiquetas, c["llamadas"]))
+        for campo, ayuda in (("errores", "Operaciones que terminaron con error."),
+                             ("bytes_enviados", "Bytes escritos al instrumento."),
+                             ("bytes_recibidos", "Bytes leidos del instrumento.")):
+            lineas.append("# HELP %s_%s_total %s" % (prefijo, campo, ayuda))
+            lineas.append("# TYPE %s_%s_total counter" % (prefijo, campo))
+            for c in resumen["comandos"]:
+                lineas.append('%s_%s_total{operacion="%s",mnemonico="%s"} %d'
+                              % (prefijo, campo, c["operacion"], c["mnemonico"], c[campo]))
+        lineas.append("# HELP %s_espera_segundos_total Tiempo de esperas deliberadas del driver." % prefijo)
+        lineas.append("# TYPE %s_espera_segundos_total counter" % prefijo)
+        for motivo, espera in sorted(resumen["esperas"].items()):
+            lineas.append('%s_espera_segundos_total{motivo="%s"} %.9f' % (prefijo, motivo, espera["segundos"]))
+        return "\n".join(lineas) + "\n"
+
+
+class RecursoInstrumentado:
+    """
+    Sesion VISA que mide cada operacion y la delega a la sesion real.
+    Los atributos que no son de E/S (timeout, resource_name, ...) se leen y escriben en la sesion real.
+    """
+    def __init__(self, recurso, instrumentacion):
+        object.__setattr__(self, "_recurso", recurso)
+        object.__setattr__(self, "_instrumentacion", instrumentacion)
+        object.__setattr__(self, "_ultimo", "")  # Cabecera del ultimo write, a la que pertenece el siguiente read
+
+    def __getattr__(self, nombre):
+        return getattr(self._recurso, nombre)
+
+    def __setattr__(self, nombre, valor):
+        setattr(self._recurso, nombre, valor)
+
+    def _medir(self, operacion, nombre, enviados, funcion, *args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            resultado = funcion(*args, **kwargs)
+        except Exception as e:
+            self._instrumentacion.registrar(operacion, nombre, enviados, 0, time.perf_counter() - inicio,
+                                            str(e), getattr(self._recurso, "resource_name", None))
+            raise
+        recibidos = len(resultado) if isinstance(resultado, (str, bytes)) else 0
+        self._instrumentacion.registrar(operacion, nombre, enviados, recibidos, time.perf_counter() - inicio,
+                                        None, getattr(self._recurso, "resource_name", None))
+        return resultado
+
+    def write(self, mensaje, *args, **kwargs):
+        nombre = mnemonico(mensaje)
+        object.__setattr__(self, "_ultimo", nombre)
+        return self._medir("write", nombre, len(mensaje) + 1, self._recurso.write, mensaje, *args, **kwargs)
+
+    def write_raw(self, mensaje):
+        nombre = mnemonico(mensaje)
+        object.__setattr__(self, "_ultimo", nombre)
+        return self._medir("write", nombre, len(mensaje), self._recurso.write_raw, mensaje)
+
+    def write_binary_values(self, mensaje, valores, *args, **kwargs):
+        nombre = mnemonico(mensaje)
+        object.__setattr__(self, "_ultimo", nombre)
+        # Cabecera + bloque #<n><largo> + 2 bytes por valor uint16 (aproximado para otros tipos)
+        enviados = len(mensaje) + 2 + len(str(2 * len(valores))) + 2 * len(valores)
+        return self._medir("write", nombre, enviados, self._recurso.write_binary_values,
+                           mensaje, valores, *args, **kwargs)
+
+    def read(self, *args, **kwargs):
+        return self._medir("read", self._ultimo, 0, self._recurso.read, *args, **kwargs)
+
+    def query(self, mensaje, *args, **kwargs):
+        nombre = mnemonico(mensaje)
+        object.__setattr__(self, "_ultimo", nombre)
+        return self._medir("query", nombre, len(mensaje) + 1, self._recurso.query, mensaje, *args, **kwargs)
+
+    def wait_for_srq(self, *args, **kwargs):
+        return self._medir("srq", self._ultimo, 0, self._recurso.wait_for_srq, *args, **kwargs)
+
+
+class GestorInstrumentado:
+    """ResourceManager que entrega sesiones instrumentadas; el resto se delega al gestor real."""
+    def __init__(self, gestor, instrumentacion):
+        self._gestor = gestor
+        self._instrumentacion = instrumentacion
+
+    def __getattr__(self, nombre):
+        return getattr(self._gestor, nombre)
+
+    def open_resource(self, nombre, **kwargs):
+        return self._instrumentacion.envolver(self._gestor.open_resource(nombre, **kwargs))
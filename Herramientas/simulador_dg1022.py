@@ -0,0 +1,521 @@
+# -*- coding: utf-8 -*-
+"""
+Simulador en proceso del generador de funciones RIGOL DG1022.
+
+Imita la interfaz de pyvisa (ResourceManager y recurso de mensajes) para poder ejecutar
+los drivers del repositorio sin el instrumento conectado. El generador simulado procesa
+los comandos "en segundo plano": write() retorna de inmediato y el tiempo de proceso se
+paga en la siguiente lectura, igual que en el equipo real, donde *OPC? solo responde
+cuando terminan las operaciones pendientes.
+
+Modelo de latencia:
+    Cada transferencia USB (un write() o un read()) cuesta latencia_usb (el DG1022 es un equipo USB
+    full speed: un intervalo de 1 ms por transaccion bulk) mas el largo del mensaje dividido por
+    velocidad_usb, y bloquea al programa como lo hace el driver VISA. Cada comando ocupa luego al
+    generador el tiempo de TIEMPOS_COMANDO segun su cabecera, o tiempo_comando si no aparece. Con
+    esto cuesta lo mismo que en el equipo mandar un mensaje mas (viaje de ida y vuelta), un byte mas
+    (cargas de DATA:DAC) o un comando mas (proceso interno), y las mejoras medidas en el simulador
+    se trasladan al equipo. Los valores por defecto son aproximados; para calibrarlos se miden en el
+    equipo real los mismos benchmarks de la carpeta Benchmarks y se ajustan los parametros.
+
+Inyeccion de errores:
+    probabilidad_timeout y probabilidad_desconexion hacen fallar operaciones al azar (con semilla
+    para repetir la secuencia). inyectar_timeout() e inyectar_desconexion() programan un fallo en
+    la siguiente operacion. Un timeout pierde la respuesta pendiente y espera el timeout de la
+    sesion; una desconexion deja la sesion inutilizable y el recurso ausente de list_resources()
+    durante tiempo_desconexion segundos, como al desenchufar el cable.
+
+Ejemplo de uso:
+    rm = SimuladorResourceManager()
+    generador = GeneradorFunciones(resource_manager=rm)     # driver de BenjaminMorales
+    generador.connect()
+
+    generator = dg1022.dg1022(handle=rm)                    # driver de PedroPerlaza
+    generator.conect(0)
+"""
+
+import copy
+import fnmatch
+import random
+import time
+from collections import deque
+
+import pyvisa
+from pyvisa import constants, util
+
+from instrumentacion import normalizar_cabecera  # Formas cortas de las cabeceras SCPI
+
+
+# Segundos de proceso interno por cabecera (forma corta, sin canal). Los cambios de forma de onda y
+# las operaciones sobre la memoria de formas arbitrarias son las mas lentas del equipo.
+TIEMPOS_COMANDO = {
+    "APPL": 0.05, "FUNC": 0.05, "FUNC:USER": 0.05, "*RST": 0.5,
+    "DATA:DAC": 0.1, "DATA:COPY": 0.3, "DATA:DEL": 0.05,
+    "*IDN": 0.001, "*OPC": 0.0, "*ESR": 0.0, "*CLS": 0.0, "SYST:ERR": 0.001,
+    "*SAV": 0.2, "*RCL": 0.1,
+}
+CONFIGURACIONES = 10     # Configuraciones completas que guardan *SAV/*RCL en la memoria interna
+GUARDADO_SAV = (1, 2, "burst", "trigger", "barrido")  # Partes del estado que guarda *SAV (no las formas arbitrarias)
+LATENCIA_USB = 0.001     # Segundos por transaccion USB (intervalo bulk de USB full speed)
+VELOCIDAD_USB = 1.0e6    # Bytes por segundo efectivos de USB full speed
+TIEMPO_DAC_POR_PUNTO = 2.0e-5  # Segundos extra de proceso por punto cargado con DATA:DAC
+
+
+def formato_apply(canal):
+    """Respuesta de APPLy? con el formato del DG1022: 'SIN,1.000000e+03,5.000000e+00,0.000000e+00'."""
+    return "%s,%e,%e,%e" % (canal["funcion"], canal["frecuencia"], canal["amplitud"], canal["offset"])
+
+
+class SimuladorDG1022:
+    """
+    Recurso VISA simulado de un DG1022.
+
+    Parámetros:
+        nombre (str): Nombre del recurso VISA que representa.
+        tiempo_comando (float): Segundos que el generador tarda en procesar un comando sin entrada en
+            tiempos_comando.
+        tiempo_respuesta (float): Segundos que tarda en armar la respuesta de cada consulta.
+        acepta_binario (bool): Si es False imita un firmware que rechaza DATA:DAC en bloque binario.
+        tiempos_comando (dict): Segundos de proceso por cabecera; por defecto TIEMPOS_COMANDO.
+        latencia_usb (float): Segundos fijos de cada transferencia USB.
+        velocidad_usb (float): Bytes por segundo de las transferencias USB.
+        probabilidad_timeout (float): Probabilidad de que una lectura se pierda y termine en timeout.
+        probabilidad_desconexion (float): Probabilidad de que una operacion encuentre el equipo desconectado.
+        tiempo_desconexion (float): Segundos que el recurso desaparece de list_resources() al desconectarse.
+        semilla: Semilla del generador aleatorio de la inyeccion de errores.
+        gestor: SimuladorResourceManager que creo el recurso (para ocultarlo al desconectarse).
+        equipo (dict): Memoria del equipo (estado, ranuras de *SAV y formas arbitrarias, cola de errores)
+            compartida por todas las sesiones abiertas sobre el mismo recurso. None = memoria propia.
+    """
+    IDN = "RIGOL TECHNOLOGIES,DG1022 ,%s,00.03.00.09.00.02.08"
+
+    def __init__(self, nombre, tiempo_comando=0.01, tiempo_respuesta=0.002, acepta_binario=True,
+                 tiempos_comando=None, latencia_usb=LATENCIA_USB, velocidad_usb=VELOCIDAD_USB,
+                 probabilidad_timeout=0.0, probabilidad_desconexion=0.0, tiempo_desconexion=1.0,
+                 semilla=None, gestor=None, equipo=None):
+        self.resource_name = nombre
+        campos = nombre.split("::")
+        # El numero de serie es el cuarto campo de un recurso USB (USB0::0x1AB1::0x0588::<serie>::INSTR)
+        self.idn = self.IDN % (campos[3] if len(campos) > 4 else "DG1D200000001")
+        self.timeout = 2000
+        self.tiempo_comando = tiempo_comando
+        self.tiempo_respuesta = tiempo_respuesta
+        self.acepta_binario = acepta_binario
+        self.tiempos_comando = dict(TIEMPOS_COMANDO if tiempos_comando is None else tiempos_comando)
+        self.latencia_usb = latencia_usb
+        self.velocidad_usb = velocidad_usb
+        self.probabilidad_timeout = probabilidad_timeout
+        self.probabilidad_desconexion = probabilidad_desconexion
+        self.tiempo_desconexion = tiempo_desconexion
+        self.gestor = gestor
+        self.cerrado = False
+        self.desconectado = False
+        self.estadisticas = {"escrituras": 0, "lecturas": 0, "bytes": 0, "timeouts": 0, "desconexiones": 0}
+        self._azar = random.Random(semilla)
+        self._fallos = deque()  # Fallos programados: "timeout" o "desconexion"
+        self.comandos = []  # Historial de comandos recibidos, util para inspeccionar las pruebas
+        self._respuestas = deque()
+        # El estado vive en el equipo, no en la sesion: sobrevive a cerrar y volver a abrir el recurso
+        self.equipo = {} if equipo is None else equipo
+        self.equipo.setdefault("estado", {})
+        self.equipo.setdefault("configuraciones", {})  # *SAV n -> copia de la configuracion; sobrevive a *RST
+        self.equipo.setdefault("errores", deque())
+        self._errores = self.equipo["errores"]
+        self._ocupado_hasta = 0.0
+        self._esr = 0
+        self._ese = 0
+        self._sre = 0
+        self.configuraciones = self.equipo["configuraciones"]
+        self.estado = self.equipo["estado"]
+        if not self.estado:
+            self.reiniciar()
+
+    def reiniciar(self):
+        """Devuelve el estado interno a los valores de fabrica (*RST)."""
+        self.estado.clear()
+        self.estado.update({
+            1: {"funcion": "SIN", "frecuencia": 1000.0, "amplitud": 5.0, "offset": 0.0, "salida": False},
+            2: {"funcion": "SIN", "frecuencia": 1000.0, "amplitud": 5.0, "offset": 0.0, "salida": False},
+            "burst": {"estado": False, "modo": "TRIG", "ciclos": 1, "fase": 0.0, "periodo": 0.01},
+            "trigger": "IMM",
+            "barrido": {"estado": False, "espaciado": "LIN", "tiempo": 1.0, "inicio": 100.0, "fin": 1000.0},
+            "volatil": [],  # Puntos del DAC cargados con DATA:DAC VOLATILE
+            "ranuras": {},  # Formas arbitrarias no volatiles copiadas con DATA:COPY
+        })
+
+    # --- Interfaz pyvisa ---------------------------------------------------------------------
+
+    def write(self, mensaje):
+        self._transferir(len(mensaje) + 1)  # +1 por el terminador '\n'
+        if normalizar_cabecera(mensaje.split(" ", 1)[0]) == "DATA:DAC":
+            # Los datos ASCII van en un solo comando, no se separan por ';'
+            self.comandos.append(mensaje[:40])
+            valores = mensaje.partition(",")[2].split(",")
+            self._ocupar(self._tiempo_proceso("DATA:DAC") + TIEMPO_DAC_POR_PUNTO * len(valores))
+            self._cargar_dac(valores, binario=False)
+            return len(mensaje)
+        pendientes = len(self._respuestas)
+        for comando in mensaje.split(";"):
+            comando = comando.strip()
+            if comando:
+                self.comandos.append(comando)
+                self._ocupar(self._tiempo_proceso(comando))
+                self._ejecutar(comando)
+        if len(self._respuestas) - pendientes > 1:
+            # IEEE 488.2: las respuestas de un mensaje compuesto llegan juntas, separadas por ';'
+            respuestas = [self._respuestas.pop() for _ in range(len(self._respuestas) - pendientes)]
+            self._respuestas.append(";".join(reversed(respuestas)))
+        return len(mensaje)
+
+    def write_raw(self, mensaje):
+        self._transferir(len(mensaje))
+        cabecera, _, bloque = mensaje.partition(b"#")
+        digitos = int(bloque[:1])
+        largo = int(bloque[1:1 + digitos])
+        datos = bloque[1 + digitos:1 + digitos + largo]
+        self.comandos.append(cabecera.decode("ascii") + "#<%d bytes>" % largo)
+        if normalizar_cabecera(cabecera.decode("ascii").split(" ", 1)[0]) == "DATA:DAC":
+            valores = [int.from_bytes(datos[i:i + 2], "little") for i in range(0, len(datos), 2)]
+            self._ocupar(self._tiempo_proceso("DATA:DAC") + TIEMPO_DAC_POR_PUNTO * len(valores))
+            self._cargar_dac(valores, binario=True)
+        else:
+            self._ocupar(self.tiempo_comando)
+            self._error(-113, "Undefined header")
+        return len(mensaje)
+
+    def write_binary_values(self, mensaje, valores, datatype="f", is_big_endian=False, termination=None,
+                            encoding=None, header_fmt="ieee"):
+        bloque = util.to_ieee_block(valores, datatype, is_big_endian)
+        return self.write_raw(mensaje.encode("ascii") + bloque + b"\n")
+
+    def read(self):
+        self._comprobar_abierto()
+        self.estadisticas["lecturas"] += 1
+        if self._fallo("timeout", self.probabilidad_timeout) or not self._respuestas:
+            # La respuesta se pierde y VISA espera el timeout completo de la sesion
+            self._respuestas.clear()
+            self.estadisticas["timeouts"] += 1
+            time.sleep(self.timeout / 1000)
+            raise pyvisa.VisaIOError(constants.StatusCode.error_timeout)
+        self._esperar_fin_proceso()
+        respuesta = self._respuestas.popleft()
+        time.sleep(self.latencia_usb + (len(respuesta) + 1) / self.velocidad_usb)
+        return respuesta
+
+    def query(self, mensaje):
+        self.write(mensaje)
+        return self.read()
+
+    def wait_for_srq(self, timeout=25000):
+        self._comprobar_abierto()
+        self._esperar_fin_proceso()
+        if not (self._esr & self._ese and self._sre & 32):
+            raise pyvisa.VisaIOError(constants.StatusCode.error_timeout)
+
+    def close(self):
+        self.cerrado = True
+
+    # --- Inyeccion de errores ----------------------------------------------------------------
+
+    def inyectar_timeout(self, veces=1):
+        """Hace que las proximas `veces` lecturas terminen en timeout."""
+        self._fallos.extend(["timeout"] * veces)
+
+    def inyectar_desconexion(self):
+        """Desconecta el equipo en la proxima operacion."""
+        self._fallos.append("desconexion")
+
+    def _fallo(self, tipo, probabilidad):
+        # Consume un fallo programado del tipo pedido o decide al azar segun la probabilidad
+        if self._fallos and self._fallos[0] == tipo:
+            self._fallos.popleft()
+            return True
+        return probabilidad > 0 and self._azar.random() < probabilidad
+
+    def desconectar(self):
+        """Simula desenchufar el cable: la sesion queda inutilizable y el recurso desaparece un tiempo."""
+        if not self.desconectado:
+            self.desconectado = True
+            self.estadisticas["desconexiones"] += 1
+            if self.gestor is not None:
+                self.gestor.ocultar(self.resource_name, self.tiempo_desconexion)
+
+    # --- Modelo interno ----------------------------------------------------------------------
+
+    def _comprobar_abierto(self):
+        if not self.desconectado and self._fallo("desconexion", self.probabilidad_desconexion):
+            self.desconectar()
+        if self.cerrado or self.desconectado:
+            raise pyvisa.VisaIOError(constants.StatusCode.error_connection_lost)
+
+    def _transferir(self, largo):
+        # Envio por USB: bloquea al programa mientras dura la transferencia
+        self._comprobar_abierto()
+        self.estadisticas["escrituras"] += 1
+        self.estadisticas["bytes"] += largo
+        time.sleep(self.latencia_usb + largo / self.velocidad_usb)
+
+    def _tiempo_proceso(self, comando):
+        if comando.split(" ", 1)[0].endswith("?"):
+            return self.tiempo_respuesta  # Las consultas solo arman la respuesta, no cambian la salida
+        cabecera = normalizar_cabecera(comando.split(" ", 1)[0])
+        if cabecera.endswith((":CH1", ":CH2")):
+            cabecera = cabecera[:-4]
+        if cabecera.startswith("APPL"):
+            cabecera = "APPL"
+        return self.tiempos_comando.get(cabecera, self.tiempo_comando)
+
+    def _ocupar(self, segundos):
+        # Los comandos se encolan: cada uno empieza cuando termina el anterior
+        self._ocupado_hasta = max(self._ocupado_hasta, time.monotonic()) + segundos
+
+    def _esperar_fin_proceso(self):
+        restante = self._ocupado_hasta - time.monotonic()
+        if restante > 0:
+            time.sleep(restante)
+
+    def _responder(self, respuesta):
+        self._respuestas.append(respuesta)
+
+    def _error(self, codigo, descripcion):
+        self._errores.append('%d,"%s"' % (codigo, descripcion))
+
+    def _voltaje(self, datos, cabecera):
+        if cabecera == "VOLT:UNIT":
+            return datos.get("unidad", "VPP")
+        signo = 1 if cabecera == "VOLT:HIGH" else -1
+        return "%e" % (datos["offset"] + signo * datos["amplitud"] / 2)
+
+    def _cargar_dac(self, valores, binario):
+        if binario and not self.acepta_binario:
+            self._error(-104, "Data type error")
+            return
+        try:
+            puntos = [int(v) for v in valores]
+        except ValueError:
+            self._error(-224, "Illegal parameter value")
+            return
+        if not 1 <= len(puntos) <= 4096 or min(puntos) < 0 or max(puntos) > 16383:
+            self._error(-224, "Illegal parameter value")
+            return
+        self.estado["volatil"] = puntos
+
+    def _ejecutar(self, comando):
+        cabecera, _, argumentos = comando.partition(" ")
+        consulta = cabecera.endswith("?")
+        cabecera = normalizar_cabecera(cabecera.rstrip("?"))
+        argumentos = [a.strip() for a in argumentos.split(",")] if argumentos.strip() else []
+        canal = 1
+        if cabecera.endswith(":CH2") or cabecera.endswith(":CH1"):
+            canal = int(cabecera[-1])
+            cabecera = cabecera[:-4]
+        try:
+            if not self._ejecutar_cabecera(cabecera, consulta, argumentos, canal):
+                self._error(-113, "Undefined header")
+        except (ValueError, IndexError):
+            self._error(-224, "Illegal parameter value")
+
+    def _ejecutar_cabecera(self, cabecera, consulta, argumentos, canal):
+        burst = self.estado["burst"]
+        if cabecera == "*IDN" and consulta:
+            self._responder(self.idn)
+        elif cabecera == "*OPC":
+            if consulta:
+                self._responder("1")
+            else:
+                self._esr |= 1
+        elif cabecera == "*ESR" and consulta:
+            self._responder(str(self._esr))
+            self._esr = 0
+        elif cabecera == "*ESE":
+            self._ese = int(argumentos[0])
+        elif cabecera == "*SRE":
+            self._sre = int(argumentos[0])
+        elif cabecera == "*CLS":
+            self._esr = 0
+            self._errores.clear()
+        elif cabecera == "*RST":
+            self.reiniciar()
+        elif cabecera == "*SAV":
+            ranura = int(argumentos[0])
+            if not 1 <= ranura <= CONFIGURACIONES:
+                raise ValueError(ranura)
+            self.configuraciones[ranura] = copy.deepcopy({clave: self.estado[clave] for clave in GUARDADO_SAV})
+        elif cabecera == "*RCL":
+            guardada = self.configuraciones.get(int(argumentos[0]))
+            if guardada is None:
+                self._error(-224, "Illegal parameter value")  # Ranura vacia
+            else:
+                self.estado.update(copy.deepcopy(guardada))
+        elif cabecera == "SYST:ERR" and consulta:
+            self._responder(self._errores.popleft() if self._errores else '0,"No error"')
+        elif cabecera.startswith("APPL"):
+            if consulta:
+                self._responder(formato_apply(self.estado[canal]))
+            else:
+                datos = self.estado[canal]
+                datos["funcion"] = cabecera.split(":")[1]
+                valores = [float(a) for a in argumentos]
+                for clave, valor in zip(("frecuencia", "amplitud", "offset"), valores):
+                    datos[clave] = valor
+        elif cabecera in ("VOLT:UNIT", "VOLT:HIGH", "VOLT:LOW"):
+            datos = self.estado[canal]
+            if consulta:
+                self._responder(self._voltaje(datos, cabecera))
+            elif cabecera == "VOLT:UNIT":
+                datos["unidad"] = argumentos[0].upper()
+            else:
+                # HIGH/LOW se traducen a amplitud y offset, como en el equipo
+                alto = float(argumentos[0]) if cabecera == "VOLT:HIGH" else datos["offset"] + datos["amplitud"] / 2
+                bajo = float(argumentos[0]) if cabecera == "VOLT:LOW" else datos["offset"] - datos["amplitud"] / 2
+                datos["amplitud"], datos["offset"] = alto - bajo, (alto + bajo) / 2
+        elif cabecera in ("FREQ", "VOLT", "VOLT:OFFS"):
+            clave = {"FREQ": "frecuencia", "VOLT": "amplitud", "VOLT:OFFS": "offset"}[cabecera]
+            if consulta:
+                self._responder("%e" % self.estado[canal][clave])
+            else:
+                self.estado[canal][clave] = float(argumentos[0])
+        elif cabecera == "OUTP":
+            if consulta:
+                self._responder("ON" if self.estado[canal]["salida"] else "OFF")
+            else:
+                self.estado[canal]["salida"] = argumentos[0].upper() in ("ON", "1")
+        elif cabecera == "BURS:STAT":
+            if consulta:
+                self._responder("ON" if burst["estado"] else "OFF")
+            else:
+                burst["estado"] = argumentos[0].upper() in ("ON", "1")
+                if burst["estado"] and self.estado["barrido"]["estado"]:
+                    self._error(-221, "Settings conflict")
+        elif cabecera == "BURS:MODE":
+            if consulta:
+                self._responder(burst["modo"])
+            else:
+                burst["modo"] = argumentos[0].upper()
+        elif cabecera == "BURS:NCYC":
+            if consulta:
+                self._responder(str(burst["ciclos"]))
+            else:
+                burst["ciclos"] = int(float(argumentos[0]))
+        elif cabecera in ("SWE:STAT", "SWE:SPAC", "SWE:TIME", "FREQ:STAR", "FREQ:STOP"):
+            barrido = self.estado["barrido"]
+            clave = {"SWE:STAT": "estado", "SWE:SPAC": "espaciado", "SWE:TIME": "tiempo",
+                     "FREQ:STAR": "inicio", "FREQ:STOP": "fin"}[cabecera]
+            if consulta:
+                valor = barrido[clave]
+                self._responder(("ON" if valor else "OFF") if clave == "estado" else
+                                valor if clave == "espaciado" else "%e" % valor)
+            elif clave == "estado":
+                barrido["estado"] = argumentos[0].upper() in ("ON", "1")
+                if barrido["estado"] and burst["estado"]:
+                    self._error(-221, "Settings conflict")
+            elif clave == "espaciado":
+                barrido["espaciado"] = argumentos[0].upper()[:3]
+            else:
+                barrido[clave] = float(argumentos[0])
+        elif cabecera == "BURS:INT:PER":
+            if consulta:
+                self._responder("%e" % burst["periodo"])
+            else:
+                burst["periodo"] = float(argumentos[0])
+        elif cabecera == "BURS:PHAS":
+            if consulta:
+                self._responder("%e" % burst["fase"])
+            else:
+                burst["fase"] = float(argumentos[0])
+        elif cabecera == "DATA:DAC":
+            self._cargar_dac(argumentos[1:], binario=False)
+        elif cabecera == "DATA:DEL":
+            if argumentos and argumentos[0].upper() != "VOLATILE":
+                if self.estado["ranuras"].pop(argumentos[0].upper(), None) is None:
+                    self._error(-224, "Illegal parameter value")
+            else:
+                self.estado["volatil"] = []
+        elif cabecera == "DATA:COPY":
+            if len(self.estado["ranuras"]) >= 10 and argumentos[0].upper() not in self.estado["ranuras"]:
+                self._error(-225, "Out of memory")
+            else:
+                self.estado["ranuras"][argumentos[0].upper()] = list(self.estado["volatil"])
+        elif cabecera in ("FUNC", "FUNC:USER"):
+            if consulta:
+                # FUNC:USER? responde la forma arbitraria seleccionada, FUNC? la funcion del canal
+                self._responder(self.estado[canal].get("forma", "VOLATILE") if cabecera == "FUNC:USER"
+                                else self.estado[canal]["funcion"])
+            elif cabecera == "FUNC":
+                self.estado[canal]["funcion"] = argumentos[0].upper()
+            else:
+                forma = argumentos[0].upper() if argumentos else "VOLATILE"
+                if forma != "VOLATILE" and forma not in self.estado["ranuras"]:
+                    self._error(-224, "Illegal parameter value")
+                else:
+                    self.estado[canal]["funcion"] = "USER"
+                    self.estado[canal]["forma"] = forma
+        elif cabecera == "TRIG:SOUR":
+            if consulta:
+                self._responder(self.estado["trigger"])
+            else:
+                self.estado["trigger"] = argumentos[0].upper()
+        else:
+            return False
+        return True
+
+
+class SimuladorResourceManager:
+    """
+    ResourceManager simulado: lista y abre generadores DG1022 simulados.
+
+    Parámetros:
+        recursos (list): Nombres de los recursos a exponer. Por defecto un DG1022 por USB.
+        tiempo_enumeracion (float): Segundos que tarda list_resources() sin filtro (recorre todos los backends).
+        tiempo_enumeracion_filtrada (float): Segundos que tarda list_resources() con una consulta USB especifica.
+        **opciones: Argumentos que se pasan a cada SimuladorDG1022 (tiempos, latencia USB, errores).
+
+    Cada recurso es un mismo equipo durante toda la vida del gestor: cerrar y volver a abrir la sesión
+    (o reconectar tras una desconexión) conserva su estado, las ranuras de *SAV y las formas arbitrarias.
+    """
+    RECURSO_POR_DEFECTO = "USB0::0x1AB1::0x0588::DG1D200000001::INSTR"
+    CONSULTA_GENERAL = "?*::INSTR"
+
+    def __init__(self, recursos=None, tiempo_enumeracion=0.0, tiempo_enumeracion_filtrada=0.0, **opciones):
+        self.recursos = list(recursos) if recursos is not None else [self.RECURSO_POR_DEFECTO]
+        self.tiempo_enumeracion = tiempo_enumeracion
+        self.tiempo_enumeracion_filtrada = tiempo_enumeracion_filtrada
+        self.opciones = opciones
+        self.abiertos = []
+        self.equipos = {}  # recurso -> memoria del equipo, compartida por todas sus sesiones
+        self.enumeraciones = 0
+        self._ocultos = {}  # recurso -> time.monotonic() hasta el que aparece desconectado
+
+    def list_resources(self, query=CONSULTA_GENERAL):
+        self.enumeraciones += 1
+        general = query == self.CONSULTA_GENERAL
+        time.sleep(self.tiempo_enumeracion if general else self.tiempo_enumeracion_filtrada)
+        # En las consultas VISA '?*' equivale a '*' de fnmatch
+        patron = query.replace("?*", "*")
+        return tuple(r for r in self.recursos if fnmatch.fnmatchcase(r, patron) and self._presente(r))
+
+    def ocultar(self, nombre, segundos):
+        """Quita el recurso de list_resources() y open_resource() durante `segundos` (equipo desenchufado)."""
+        self._ocultos[nombre] = time.monotonic() + segundos
+
+    def renombrar(self, anterior, nuevo):
+        """Cambia el nombre VISA de un recurso, como cuando el USB se re-enumera al reconectarlo."""
+        self.recursos[self.recursos.index(anterior)] = nuevo
+        if anterior in self.equipos:
+            self.equipos[nuevo] = self.equipos.pop(anterior)  # Es el mismo equipo con otro nombre
+        if anterior in self._ocultos:
+            self._ocultos[nuevo] = self._ocultos.pop(anterior)
+
+    def _presente(self, nombre):
+        return self._ocultos.get(nombre, 0) <= time.monotonic()
+
+    def open_resource(self, nombre, **kwargs):
+        if nombre not in self.recursos or not self._presente(nombre):
+            raise pyvisa.VisaIOError(constants.StatusCode.error_resource_not_found)
+        recurso = SimuladorDG1022(nombre, gestor=self, equipo=self.equipos.setdefault(nombre, {}), **self.opciones)
+        self.abiertos.append(recurso)
+        return recurso
+
+    def close(self):
+        for recurso in self.abiertos:
+            recurso.close()
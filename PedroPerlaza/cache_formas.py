@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+Cache de formas de onda arbitrarias cargadas en el DG1022.
+
+Cada forma se identifica por el hash de sus valores del DAC ya cuantizados, de modo que dos
+señales con la misma forma (aunque cambie la frecuencia o la amplitud) comparten la entrada.
+El cache recuerda que forma esta en la memoria VOLATILE y cual en cada ranura de usuario no
+volatil, para que dg1022.custom_signal() evite volver a subir una forma que el generador ya tiene.
+
+Las ranuras se reutilizan por orden de uso (LRU). El indice de ranuras se guarda en disco en
+formato JSON para sobrevivir reinicios del programa; la memoria VOLATILE se pierde al apagar el
+generador, por eso no se guarda. Un acierto solo actualiza el orden de uso en memoria: se escribe
+en disco con el siguiente cambio de ranuras o al llamar cerrar().
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+
+log = logging.getLogger(__name__)
+
+RUTA_POR_DEFECTO = os.path.join(os.path.expanduser("~"), ".dg1022_formas.json")
+RANURAS = tuple("ARB%d" % i for i in range(1, 11))  # Nombres de las ranuras de usuario no volatiles
+VOLATIL = "VOLATILE"
+
+
+def huella(valores):
+    """
+    Retorna el hash SHA-1 de los valores del DAC (ya cuantizados) como texto hexadecimal.
+
+    Parameters:
+    valores (array): Arreglo de NumPy con los enteros del DAC.
+    """
+    datos = valores.astype("<u2", copy = False)
+    return hashlib.sha1(datos.tobytes()).hexdigest()
+
+
+class CacheFormasOnda:
+    """
+    Indice de formas de onda presentes en un generador.
+
+    Parameters:
+    recurso (str): Nombre del recurso VISA; el archivo puede guardar el indice de varios generadores.
+    ruta (str): Archivo JSON del indice. None para no guardar en disco.
+    ranuras (tuple): Nombres de las ranuras de usuario que el cache puede ocupar.
+    """
+    def __init__(self, recurso, ruta = RUTA_POR_DEFECTO, ranuras = RANURAS):
+        self.recurso = recurso
+        self.ruta = ruta
+        self.ranuras = tuple(ranuras)
+        self.volatil = None   # hash de la forma en la memoria VOLATILE
+        self.contenido = {}   # ranura -> {"hash": str, "uso": float}
+        self.uso_pendiente = False  # hay cambios de orden de uso que todavia no se escribieron
+        self.cargar()
+
+    def cargar(self):
+        """Lee el indice de ranuras desde disco, si existe."""
+        if not self.ruta or not os.path.exists(self.ruta):
+            return
+        try:
+            with open(self.ruta, encoding = "utf-8") as archivo:
+                indice = json.load(archivo)
+        except (OSError, ValueError) as e:
+            log.warning("No se pudo leer el indice de formas %s: %s", self.ruta, e)
+            return
+        self.contenido = {ranura: datos for ranura, datos in indice.get(self.recurso, {}).items()
+                          if ranura in self.ranuras}
+
+    def guardar(self):
+        """Escribe el indice de ranuras en disco sin perder las entradas de otros generadores."""
+        if not self.ruta:
+            return
+        indice = {}
+        if os.path.exists(self.ruta):
+            try:
+                with open(self.ruta, encoding = "utf-8") as archivo:
+                    indice = json.load(archivo)
+            except (OSError, ValueError):
+                indice = {}
+        indice[self.recurso] = self.contenido
+        temporal = self.ruta + ".tmp"
+        with open(temporal, "w", encoding = "utf-8") as archivo:
+            json.dump(indice, archivo, indent = 1)
+        os.replace(temporal, self.ruta)  # Reemplazo atomico, el indice nunca queda a medio escribir
+        self.uso_pendiente = False
+
+    def cerrar(self):
+        """Escribe el orden de uso de las ranuras si cambio desde la ultima escritura."""
+        if self.uso_pendiente:
+            try:
+                self.guardar()
+            except OSError as e:
+                log.warning("No se pudo guardar el indice de formas %s: %s", self.ruta, e)
+
+    def buscar(self, hash_forma):
+        """
+        Retorna donde esta la forma en el generador: VOLATIL, el nombre de una ranura o None.
+        Un acierto en una ranura la marca como usada recientemente (solo en memoria, ver cerrar()).
+        """
+        if hash_forma == self.volatil:
+            return VOLATIL
+        for ranura, datos in self.contenido.items():
+            if datos["hash"] == hash_forma:
+                datos["uso"] = time.time()
+                self.uso_pendiente = True
+                return ranura
+        return None
+
+    def registrar_volatil(self, hash_forma):
+        """Anota que la forma se acaba de subir a la memoria VOLATILE."""
+        self.volatil = hash_forma
+
+    def elegir_ranura(self):
+        """
+        Elige la ranura donde guardar una forma nueva: una libre o, si todas estan ocupadas, la usada
+        hace mas tiempo. Retorna (ranura, desalojada), donde desalojada indica si la ranura tenia
+        otra forma que hay que borrar antes de copiar. No modifica el indice (ver asignar_ranura()).
+        """
+        libres = [ranura for ranura in self.ranuras if ranura not in self.contenido]
+        if libres:
+            return libres[0], False
+        return min(self.contenido, key = lambda r: self.contenido[r]["uso"]), True
+
+    def asignar_ranura(self, ranura, hash_forma):
+        """Anota que la forma quedo copiada en la ranura; llamar solo si el generador acepto la copia."""
+        self.contenido[ranura] = {"hash": hash_forma, "uso": time.time()}
+        self.guardar()
+
+    def olvidar_ranura(self, ranura):
+        """Quita la ranura del indice: su contenido en el generador es desconocido (copia o borrado fallidos)."""
+        if self.contenido.pop(ranura, None) is not None:
+            self.guardar()
+
+    def invalidar(self):
+        """Olvida todo lo que se sabe del generador (por ejemplo si se borraron formas desde el panel)."""
+        self.volatil = None
+        self.contenido = {}
+        self.guardar()
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""
+Codificacion vectorizada de señales arbitrarias para el DG1022.
+
+El generador recibe la forma de onda como enteros del DAC de 14 bits (0 a 16383) y acepta
+hasta PUNTOS_MAXIMOS puntos. Estas funciones trabajan sobre arreglos de NumPy completos,
+sin crear un objeto de Python por muestra.
+
+Las señales grandes (capturas de cientos de MB) se leen con abrir_senal(), que entrega un
+np.memmap para archivos .npy, binarios crudos y WAV sin cargarlos a memoria, y se reducen con
+reducir(), que recorre la fuente por bloques: la memoria usada depende del tamaño del bloque y de
+PUNTOS_MAXIMOS, no del largo de la señal.
+"""
+
+import itertools
+import mmap
+import os
+import struct
+
+import numpy as np
+
+PUNTOS_MAXIMOS = 4096   # Puntos que acepta la memoria volatil del DG1022
+DAC_MINIMO = 0
+DAC_MAXIMO = 16383      # 14 bits
+BLOQUE = 1 << 20        # Muestras leidas por bloque en reducir()
+
+# Formato de muestra de los WAV: (codigo de formato, bytes por muestra) -> dtype
+_TIPOS_WAV = {(1, 1): np.uint8, (1, 2): np.dtype("<i2"), (1, 4): np.dtype("<i4"),
+              (3, 4): np.dtype("<f4"), (3, 8): np.dtype("<f8")}
+
+_POTENCIAS = 10 ** np.arange(4, -1, -1, dtype=np.uint32)  # Hasta 5 digitos (16383)
+_COLUMNAS = np.arange(6)                                   # 5 digitos + la coma
+
+
+def remuestrear(signal, puntos = PUNTOS_MAXIMOS):
+    """
+    Reduce la señal a `puntos` muestras si es mas larga.
+    Primero promedia bloques de muestras (filtro anti-alias) y luego interpola linealmente.
+
+    Parameters:
+    signal (array): Muestras de la señal.
+    puntos (int): Cantidad maxima de puntos de salida.
+    """
+    signal = np.asarray(signal, dtype = float)
+    n = signal.size
+    if n <= puntos:
+        return signal
+    factor = n // puntos
+    if factor > 1:
+        signal = signal[:n - n % factor].reshape(-1, factor).mean(axis = 1)
+    return np.interp(np.linspace(0, signal.size - 1, puntos), np.arange(signal.size), signal)
+
+
+def _cabecera_wav(ruta):
+    """Retorna (dtype, canales, desplazamiento, cuadros) del bloque de datos de un WAV PCM o flotante."""
+    with open(ruta, "rb") as archivo:
+        riff, _, wave = struct.unpack("<4sI4s", archivo.read(12))
+        if riff != b"RIFF" or wave != b"WAVE":
+            raise ValueError("%s no es un archivo WAV" % ruta)
+        formato = None
+        while True:
+            cabecera = archivo.read(8)
+            if len(cabecera) < 8:
+                raise ValueError("%s no tiene bloque de datos" % ruta)
+            nombre, largo = struct.unpack("<4sI", cabecera)
+            if nombre == b"fmt ":
+                fmt = archivo.read(largo)
+                codigo, canales, _, _, _, bits = struct.unpack("<HHIIHH", fmt[:16])
+                if codigo == 0xFFFE and len(fmt) >= 26:  # WAVE_FORMAT_EXTENSIBLE: el codigo real esta en el subformato
+                    codigo = struct.unpack("<H", fmt[24:26])[0]
+                formato = (codigo, bits // 8, canales)
+            elif nombre == b"data":
+                if formato is None:
+                    raise ValueError("%s: bloque de datos antes del formato" % ruta)
+                codigo, ancho, canales = formato
+                if (codigo, ancho) not in _TIPOS_WAV:
+                    raise ValueError("%s: formato WAV no soportado (codigo %d, %d bits)" % (ruta, codigo, 8 * ancho))
+                cuadros = min(largo, os.path.getsize(ruta) - archivo.tell()) // (ancho * canales)
+                return _TIPOS_WAV[(codigo, ancho)], canales, archivo.tell(), cuadros
+            else:
+                archivo.seek(largo + largo % 2, 1)  # Los bloques RIFF se alinean a 2 bytes
+
+
+def abrir_senal(fuente, dtype = "<f8", canal = 0):
+    """
+    Retorna la señal como arreglo de NumPy sin copiarla a memoria cuando viene de un archivo.
+
+    Parameters:
+    fuente: Arreglo de NumPy (se retorna tal cual), ruta a un archivo .npy (np.load con mmap_mode),
+        .wav (PCM de 8/16/32 bits o flotante) o binario crudo (np.memmap con `dtype`), o cualquier
+        otro iterable (se retorna sin cambios para que reducir() lo recorra por bloques).
+    dtype (str): Tipo de las muestras de los archivos binarios crudos.
+    canal (int): Canal a usar de los WAV con mas de un canal.
+    """
+    if isinstance(fuente, np.ndarray) or not isinstance(fuente, (str, os.PathLike)):
+        return fuente
+    extension = os.path.splitext(os.fspath(fuente))[1].lower()
+    if extension == ".npy":
+        return np.load(fuente, mmap_mode = "r")
+    if extension == ".wav":
+        tipo, canales, desplazamiento, cuadros = _cabecera_wav(fuente)
+        if cuadros == 0:
+            return np.empty(0, dtype = tipo)
+        datos = np.memmap(fuente, dtype = tipo, mode = "r", offset = desplazamiento, shape = (cuadros, canales))
+        return datos[:, canal]
+    return np.memmap(fuente, dtype = dtype, mode = "r")
+
+
+def _liberar_paginas(signal):
+    # Las paginas leidas de un np.memmap cuentan en el RSS del proceso hasta que el sistema las reclama;
+    # como la señal se recorre una sola vez se descartan despues de cada bloque (siguen en el cache de disco)
+    mapa = getattr(signal, "_mmap", None)
+    if mapa is not None and hasattr(mapa, "madvise") and hasattr(mmap, "MADV_DONTNEED"):
+        mapa.madvise(mmap.MADV_DONTNEED)
+
+
+def _reducir_arreglo(signal, puntos, bloque):
+    n = signal.shape[0]
+    if n <= puntos:
+        signal = np.asarray(signal, dtype = float)
+        return signal, signal.min(initial = np.inf), signal.max(initial = -np.inf)
+    # Mismos bloques que remuestrear(), pero leyendo `bloque` muestras a la vez
+    factor = n // puntos
+    paso = max(1, bloque // factor) * factor
+    medias = np.empty(n // factor)
+    minimo, maximo = np.inf, -np.inf
+    for inicio in range(0, n, paso):
+        trozo = np.asarray(signal[inicio:inicio + paso], dtype = float)
+        minimo, maximo = min(minimo, trozo.min()), max(maximo, trozo.max())
+        completos = trozo.size - trozo.size % factor
+        if completos:
+            medias[inicio // factor:(inicio + completos) // factor] = trozo[:completos].reshape(-1, factor).mean(axis = 1)
+        _liberar_paginas(signal)
+    return medias, minimo, maximo
+
+
+def _reducir_iterable(iterable, puntos, bloque):
+    # Largo desconocido: se promedian bloques de `factor` muestras y cuando hay 4*puntos medias se
+    # promedian de a pares (factor se duplica). Una media impar sobrante vuelve al resto como `factor`
+    # copias de su valor, lo que mantiene exacto el promedio del bloque siguiente.
+    iterador = iter(iterable)
+    factor, resto = 1, np.empty(0)
+    medias = []
+    cantidad = 0
+    minimo, maximo = np.inf, -np.inf
+    while True:
+        trozo = np.fromiter(itertools.islice(iterador, bloque), dtype = float)
+        if trozo.size == 0:
+            break
+        minimo, maximo = min(minimo, trozo.min()), max(maximo, trozo.max())
+        trozo = np.concatenate((resto, trozo))
+        completos = trozo.size - trozo.size % factor
+        medias.append(trozo[:completos].reshape(-1, factor).mean(axis = 1))
+        cantidad += completos // factor
+        resto = trozo[completos:]
+        while cantidad >= 4 * puntos:
+            todas = np.concatenate(medias)
+            if todas.size % 2:
+                resto = np.concatenate((np.full(factor, todas[-1]), resto))
+                todas = todas[:-1]
+            medias = [todas.reshape(-1, 2).mean(axis = 1)]
+            cantidad = medias[0].size
+            factor *= 2
+    signal = np.concatenate(medias) if medias else np.empty(0)
+    if factor == 1:
+        signal = np.concatenate((signal, resto))
+    return signal, minimo, maximo
+
+
+def reducir(fuente, puntos = PUNTOS_MAXIMOS, bloque = BLOQUE):
+    """
+    Lee la señal por bloques y la reduce a lo mas `puntos` muestras con memoria acotada.
+    Retorna (señal_reducida, minimo, maximo), con el minimo y maximo de la señal original calculados
+    en la misma pasada.
+
+    Parameters:
+    fuente: Arreglo, memmap, ruta a un archivo o iterable (ver abrir_senal).
+    puntos (int): Cantidad maxima de puntos de salida.
+    bloque (int): Muestras leidas por bloque.
+    """
+    signal = abrir_senal(fuente)
+    if isinstance(signal, np.ndarray):
+        signal = signal.reshape(-1) if signal.ndim != 1 else signal
+        reducida, minimo, maximo = _reducir_arreglo(signal, puntos, bloque)
+    elif hasattr(signal, "__len__") and hasattr(signal, "__getitem__"):
+        # Listas y tuplas: NumPy las copia de una vez, igual que antes
+        reducida, minimo, maximo = _reducir_arreglo(np.asarray(signal, dtype = float).reshape(-1), puntos, bloque)
+    else:
+        reducida, minimo, maximo = _reducir_iterable(signal, puntos, bloque)
+    if reducida.size == 0:
+        raise ValueError("La señal no tiene muestras")
+    if reducida.size > puntos:
+        reducida = np.interp(np.linspace(0, reducida.size - 1, puntos), np.arange(reducida.size), reducida)
+    return reducida, float(minimo), float(maximo)
+
+
+def cuantizar(signal, low = DAC_MINIMO, high = DAC_MAXIMO, minimo = None, maximo = None):
+    """
+    Escala la señal al rango [low, high] del DAC en una sola pasada vectorizada.
+    Una señal plana (maximo == minimo) queda en el punto medio del rango en vez de dividir por cero.
+
+    Parameters:
+    signal (array): Muestras de la señal.
+    low (int): Valor del DAC para el minimo de la señal.
+    high (int): Valor del DAC para el maximo de la señal.
+    minimo, maximo (float): Extremos ya calculados (los que retorna reducir()); si faltan se buscan en signal.
+        Con los extremos de la señal original, una señal reducida conserva su escala respecto del original.
+    """
+    signal = np.asarray(signal, dtype = float)
+    cur_low = signal.min() if minimo is None else minimo
+    cur_high = signal.max() if maximo is None else maximo
+    if cur_high == cur_low:
+        return np.full(signal.shape, (low + high) // 2, dtype = np.uint16)
+    # Mismo orden de operaciones que el codificador anterior, int((high-low)*(val-cur_low)/(cur_high-cur_low)+low):
+    # con una escala precalculada el maximo podia quedar en high - 1. astype trunca igual que int()
+    return ((high - low) * (signal - cur_low) / (cur_high - cur_low) + low).astype(np.uint16)
+
+
+def formatear_ascii(valores):
+    """
+    Retorna el texto 'v1,v2,...,vn' para DATA:DAC sin convertir cada muestra a str.
+    Los digitos se arman como una matriz de bytes (n, 6) y se descartan los ceros a la izquierda
+    con una mascara, de modo que el texto sale de un unico buffer.
+
+    Parameters:
+    valores (array): Enteros del DAC entre 0 y 99999.
+    """
+    valores = np.asarray(valores, dtype = np.uint32)
+    if valores.size == 0:
+        return ""
+    buffer = np.empty((valores.size, 6), dtype = np.uint8)
+    buffer[:, :5] = (valores[:, None] // _POTENCIAS) % 10 + ord("0")
+    buffer[:, 5] = ord(",")
+    digitos = 1 + (valores >= 10) + (valores >= 100) + (valores >= 1000) + (valores >= 10000)
+    mascara = _COLUMNAS >= (5 - digitos)[:, None]
+    return buffer[mascara][:-1].tobytes().decode("ascii")
+
+
+def codificar(signal, low = DAC_MINIMO, high = DAC_MAXIMO, puntos = PUNTOS_MAXIMOS):
+    """
+    Remuestrea, cuantiza y formatea una señal. Retorna (valores_dac, texto_ascii).
+
+    Parameters:
+    signal (array): Muestras de la señal.
+    low (int), high (int): Rango del DAC.
+    puntos (int): Cantidad maxima de puntos que acepta el generador.
+    """
+    valores = cuantizar(remuestrear(signal, puntos), low, high)
+    return valores, formatear_ascii(valores)
@@ -5,75 +5,249 @@ Created on Tue Jan 26 11:15:29 2021
 @author: alejandro
 """
 
-import pyvisa
+import functools
+import logging
+import os
+import sys
+import threading
 import time 
-import matplotlib.pyplot as plt
-import numpy as np
+import cache_formas
+
+CARPETA = os.path.dirname(os.path.abspath(__file__))
+# importar_diferido() es compartido con el driver de BenjaminMorales y esta en Herramientas
+sys.path.append(os.path.join(os.path.dirname(CARPETA), "Herramientas"))
+from importacion_diferida import importar_diferido  # noqa: E402
+
+log = logging.getLogger(__name__)  # mensajes del driver; el programa que lo usa elige el nivel
+
+# se cargan recien cuando se usa uno de sus atributos:
+# pyvisa y NumPy tardan cientos de ms en importarse y no se necesitan hasta conectar o cargar una señal
+pyvisa = importar_diferido("pyvisa")
+np = importar_diferido("numpy")
+# los modulos de esta carpeta se cargan desde su archivo; ambos importan NumPy al cargarse
+codificador_senal = importar_diferido("codificador_senal", os.path.join(CARPETA, "codificador_senal.py"))
+sintesis_formas = importar_diferido("sintesis_formas", os.path.join(CARPETA, "sintesis_formas.py"))
+
+
+def exclusivo(metodo):
+    # ejecuta el metodo con self.bloqueo tomado: si dos hilos usan el mismo generador, cada write/read
+    # (o la secuencia completa de custom_signal) termina antes de que empiece la del otro hilo
+    @functools.wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        with self.bloqueo:
+            return metodo(self, *args, **kwargs)
+    return envoltura
+
+class ErrorCarga(Exception):
+    # el generador reporto un error en SYST:ERR? despues de recibir los datos de DATA:DAC
+    pass
+
+
+def sin_error(respuesta):
+    # True si la respuesta de SYST:ERR? es "0,No error" (algunos firmwares responden "+0,...")
+    return respuesta.strip().startswith(("0,", "+0,"))
 
 class dg1022:
-    def __init__(self):
-        self.handle = pyvisa.ResourceManager()
-        self.name_list = self.handle.list_resources()
+    def __init__(self, handle = None, name_list = None, instrumentacion = None):
+        # handle y name_list permiten reutilizar un ResourceManager y una lista de recursos ya obtenidos
+        # (ver pool_sesiones.py) en vez de crear y enumerar uno nuevo en cada instancia
+        self.handle = handle if handle is not None else pyvisa.ResourceManager()
+        self.name_list = name_list if name_list is not None else self.handle.list_resources()
         self.name = ''
         self.inst = None
         self.connected = False
+        self.modo_carga = "ascii"        # modo de custom_signal: "ascii" o "binario"
+        self.binario_soportado = None    # None = no probado; False si el firmware rechazo el bloque binario
+        self.ultima_carga = None         # {"modo", "puntos", "bytes", "segundos"} de la ultima carga al DAC
+        self.cache_formas = None         # CacheFormasOnda opcional, ver usar_cache_formas()
+        self.forma_activa = cache_formas.VOLATIL  # forma arbitraria que selecciona use_custom_signal()
+        self.espera_escritura = 0.1      # segundos de espera despues de cada write()
+        # Instrumentacion opcional (Herramientas/instrumentacion.py): mide cada operacion VISA y las esperas
+        # (o un GrabadorSCPI de Herramientas/grabador_scpi.py, que ademas las escribe en un diario reproducible)
+        self.instrumentacion = instrumentacion
+        # RLock: los metodos exclusivos se llaman entre si (custom_signal -> write); para un par write/read
+        # propio use "with generator.bloqueo:"
+        self.bloqueo = threading.RLock()
+    @exclusivo
     def conect(self,index):
         try:
             self.name = self.name_list[index]
             self.inst = self.handle.open_resource(self.name)
+            if self.instrumentacion is not None:
+                self.inst = self.instrumentacion.envolver(self.inst)
             self.connected = True
-            print(self.name_list)
+            log.info("%s", self.name_list)
         except Exception as e:
-            print("Unable to connect error %s: "%str(e))
+            log.error("Unable to connect error %s: ", e)
             self.connected = False
+    def usar_cache_formas(self, ruta = cache_formas.RUTA_POR_DEFECTO, ranuras = cache_formas.RANURAS):
+        # activa el cache de formas de onda de este generador (llamar despues de conect)
+        # ranuras = () usa solo la memoria VOLATILE, sin copiar a las ranuras no volatiles
+        self.cache_formas = cache_formas.CacheFormasOnda(self.name, ruta, ranuras)
+    @exclusivo
+    def close(self):
+        # cierra la sesion VISA del generador, el ResourceManager queda abierto
+        # el orden de uso del cache de formas pendiente se escribe ahora
+        if self.cache_formas is not None:
+            self.cache_formas.cerrar()
+        try:
+            if self.inst is not None:
+                self.inst.close()
+        except Exception as e:
+            log.error("Error closing session %s: ", e)
+        self.inst = None
+        self.connected = False
+    @exclusivo
     def read(self): 
         try: 
             response = self.inst.read() 
             return response 
+        except pyvisa.VisaIOError as e:
+            # error de comunicacion: se propaga para que quien llama (pool_sesiones.con_generador) reabra la sesion
+            log.error("Error reading response: %s", e)
+            raise
         except Exception as e: 
-            print(f"Error reading response: {str(e)}")  
+            log.error("Error reading response: %s", e)
             return None
+    @exclusivo
     def query(self, msg):
         try:
             response = self.inst.query(msg)
-            print(f"Query: {msg}, Response: {response}")
+            log.debug("Query: %s, Response: %s", msg, response)
             return response
+        except pyvisa.VisaIOError as e:
+            log.error("Error querying message %s: %s", msg, e)
+            raise
         except Exception as e:
-            print(f"Error querying message {msg}: {str(e)}")
+            log.error("Error querying message %s: %s", msg, e)
             return None
+    @exclusivo
     def write(self,msg):
         resp = self.inst.write(msg)
-        time.sleep(0.1)
+        self._dormir(self.espera_escritura, "escritura")
+        return resp
+    def _dormir(self, segundos, motivo):
+        # time.sleep deliberado; con instrumentacion queda registrado aparte del tiempo en el bus
+        time.sleep(segundos)
+        if self.instrumentacion is not None:
+            self.instrumentacion.registrar_espera(segundos, motivo)
 
         # comparar largo de mensaje con numeros de bytes recibidos
-    def custom_signal(self,signal, plot = False, low = 0 , high =16383, v_max = 1.0, v_min = -1.0):
-        # convierte una cadena de puntos en una señal, signal debe ser un objeto iterable
+    @exclusivo
+    def custom_signal(self,signal, plot = False, low = 0 , high =16383, v_max = 1.0, v_min = -1.0,
+                      puntos = None, modo = None):
+        # convierte una cadena de puntos en una señal; signal puede ser un arreglo de NumPy, cualquier iterable
+        # (tambien generadores) o la ruta a un archivo .npy, .wav o binario crudo de float64 (ver codificador_senal.abrir_senal)
         # esta señal queda guardada en la memoria volatil del generador
-        cur_high, cur_low = max(signal),min(signal)
-        print(cur_high, cur_low)
-        signal = [int((high-low)*(val-cur_low)/(cur_high-cur_low)+low) for val in signal]
+        # si tiene mas de `puntos` muestras (por defecto codificador_senal.PUNTOS_MAXIMOS) se remuestrea al limite del generador,
+        # leyendo por bloques: archivos de cientos de MB se recorren con np.memmap sin cargarlos completos
+        # la cuantizacion se hace con NumPy (ver codificador_senal.py)
+        # modo: "ascii" o "binario", por defecto self.modo_carga
+        puntos = puntos or codificador_senal.PUNTOS_MAXIMOS
+        signal, minimo, maximo = codificador_senal.reducir(signal, puntos)
+        log.debug("signal max %s min %s", maximo, minimo)
+        # reducir() ya calculo los extremos en su pasada: cuantizar() no vuelve a recorrer la señal
+        signal = codificador_senal.cuantizar(signal, low, high, minimo, maximo)
         if plot == True:
+            import matplotlib.pyplot as plt  # solo se importa si se pide el grafico
             plt.plot(signal)
-        signal = ''.join([str(d)+',' for d in signal])
         self.write("VOLT:UNIT VPP")
         self.write("VOLT:HIGH "+str(v_max))
         self.write("VOLTage:LOW "+str(v_min))
+        if self.cache_formas is not None:
+            # si el generador ya tiene esta forma (misma huella) solo se selecciona, sin subirla de nuevo
+            hash_forma = cache_formas.huella(signal)
+            ubicacion = self.cache_formas.buscar(hash_forma)
+            if ubicacion is not None:
+                self.forma_activa = ubicacion
+                return
+            # VOLATILE se reescribe: hasta que la carga se confirme no contiene ninguna forma conocida
+            self.cache_formas.registrar_volatil(None)
         self.write("DATA:DEL")
-        self.write("DATA:DAC VOLATILE,"+signal[:-1])
-        time.sleep(0.5)
+        self.cargar_dac(signal, modo)  # lanza ErrorCarga si el generador rechaza los datos
+        self.forma_activa = cache_formas.VOLATIL
+        if self.cache_formas is not None:
+            # solo una forma aceptada por el generador queda en el cache y se copia a una ranura
+            self.cache_formas.registrar_volatil(hash_forma)
+            if self.cache_formas.ranuras:
+                # copia a una ranura no volatil, desalojando la menos usada si estan todas ocupadas
+                ranura, desalojada = self.cache_formas.elegir_ranura()
+                if desalojada:
+                    self.write("DATA:DEL "+ranura)
+                self.write("DATA:COPY "+ranura+",VOLATILE")
+                # la ranura entra al indice solo si el generador acepto el borrado y la copia
+                error = (self.query("SYST:ERR?") or "").strip()
+                if sin_error(error):
+                    self.cache_formas.asignar_ranura(ranura, hash_forma)
+                else:
+                    log.warning("Copy to %s rejected (%s), the waveform stays only in VOLATILE", ranura, error)
+                    self.cache_formas.olvidar_ranura(ranura)
+        self._dormir(0.5, "carga")
+    @exclusivo
+    def cargar_dac(self, valores, modo = None):
+        # envia enteros del DAC (0-16383) a la memoria volatil con DATA:DAC
+        # "binario": bloque IEEE 488.2 de longitud definida con uint16 little-endian (2 bytes por punto)
+        # "ascii":   enteros separados por coma (hasta 6 bytes por punto)
+        # si el firmware rechaza el bloque binario (error en SYST:ERR?) se reenvia en ASCII y no se vuelve a intentar
+        # retorna y guarda en self.ultima_carga los bytes enviados y el tiempo hasta que el generador confirma
+        # si el generador tambien rechaza los datos en ASCII lanza ErrorCarga
+        modo = modo or self.modo_carga
+        if modo not in ("ascii", "binario"):
+            raise ValueError("Unknown upload mode %s" % modo)
+        if modo == "binario" and self.binario_soportado is False:
+            modo = "ascii"
+        inicio = time.perf_counter()
+        if modo == "binario":
+            # un solo buffer contiguo '<u2', pyvisa lo vuelca con tobytes() sin empaquetar muestra por muestra
+            datos = np.ascontiguousarray(valores, dtype = "<u2")
+            self.inst.write("*CLS")  # limpia errores viejos para que SYST:ERR? refleje solo esta carga
+            enviados = self.inst.write_binary_values("DATA:DAC VOLATILE,", datos, datatype = "H",
+                                                     is_big_endian = False)
+            error = self.inst.query("SYST:ERR?").strip()
+            if sin_error(error):
+                self.binario_soportado = True
+            else:
+                log.warning("Binary upload rejected (%s), falling back to ASCII", error)
+                self.binario_soportado = False
+                modo = "ascii"
+                inicio = time.perf_counter()
+        if modo == "ascii":
+            self.inst.write("*CLS")
+            enviados = self.inst.write("DATA:DAC VOLATILE," + codificador_senal.formatear_ascii(valores))
+            # SYST:ERR? espera a que el generador procese los datos y dice si los acepto
+            error = self.inst.query("SYST:ERR?").strip()
+            if not sin_error(error):
+                self.ultima_carga = None
+                raise ErrorCarga("ASCII upload rejected: %s" % error)
+        self.ultima_carga = {"modo": modo, "puntos": len(valores), "bytes": enviados,
+                             "segundos": time.perf_counter() - inicio}
+        return self.ultima_carga
+    @exclusivo
+    def comparar_modos_carga(self, valores):
+        # carga los mismos valores del DAC en ASCII y en binario, imprime bytes y tiempos
+        # y deja en self.modo_carga el modo mas rapido para este firmware
+        resultados = [self.cargar_dac(valores, "ascii"), self.cargar_dac(valores, "binario")]
+        for r in resultados:
+            log.info("%-8s %6d points %8d bytes %8.1f ms", r["modo"], r["puntos"], r["bytes"], r["segundos"] * 1e3)
+        self.modo_carga = min(resultados, key = lambda r: r["segundos"])["modo"]
+        return resultados
+    @exclusivo
     def use_custom_signal(self):
-        self.write("FUNC:USER VOLATILE")
+        self.write("FUNC:USER "+self.forma_activa)
         self.write("OUTP ON")
-    def gauss(self,frec,n,amp):
-        t = np.linspace(0,1,100)
-        y = np.exp(-((t-0.5)/0.5)**2)*np.sin(n*2*np.pi*t)
-        print(max(y))
+    @exclusivo
+    def gauss(self,frec,n,amp, sigma = None):
+        # tono de n ciclos a frec Hz con envolvente gaussiana (por defecto la de siempre, exp(-((t-0.5)/0.5)**2))
+        # la tabla sale del cache de sintesis_formas y sus puntos dependen de n, no son 100 fijos
+        y = sintesis_formas.tono_gaussiano(n, sigma = sigma or sintesis_formas.SIGMA_GAUSS)
         self.custom_signal(signal = y, v_max = amp, v_min = -amp)
-        self.write("FREQ "+str(int(frec/n)))
-        time.sleep(0.2)        
-        print("FREQ "+str(int(frec/n)))
-####ELIMINAR DESDE AQUI HASTA ABAJO ####
-controller = dg1022()
-controller.conect(0)
-controller.write('*IDN?')
-print(controller.read())
\ No newline at end of file
+        # la tabla contiene n ciclos: se repite a frec/n, sin truncar a entero
+        self.write("FREQ %.10g" % (frec/n))
+        self._dormir(0.2, "gauss")
+        log.debug("FREQ %.10g", frec/n)
+if __name__ == "__main__":
+    # prueba manual: python dg1022.py identifica el primer generador de la lista
+    controller = dg1022()
+    controller.conect(0)
+    controller.write('*IDN?')
+    print(controller.read())
\ No newline at end of file
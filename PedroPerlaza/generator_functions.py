@@ -1,6 +1,12 @@
 import time  # Importación estándar para delays en la ejecución del genrador
-import dg1022  # Importación de Manejo de generador de funciones
-def set_gaussian_wave(frequency, cycles, amplitude_low):
+from pool_sesiones import con_generador, obtener_generador  # Sesiones VISA compartidas entre llamadas
+from importacion_diferida import importar_diferido  # Herramientas, agregado a sys.path por dg1022 (via pool_sesiones)
+
+pyvisa = importar_diferido("pyvisa")
+
+
+@con_generador
+def set_gaussian_wave(frequency, cycles, amplitude_low, generator=None):
     """
     Establece la frecuencia y amplitud en el generador de funciones Rigol DG1022.
 
@@ -8,10 +14,8 @@ def set_gaussian_wave(frequency, cycles, amplitude_low):
     frequency (float): Frecuencia de salida en Hz
     cycles (int): Voltaje máximo (HIGH) en V
     amplitude_low (float): Voltaje mínimo (LOW) en V
+    generator (dg1022): Generador a usar. Si es None se usa la sesión compartida del puerto 0.
     """
-    generator = dg1022.dg1022()
-    generator.conect(0)  # Conectar al puerto 0
-    time.sleep(0.5)  # Esperar a que la conexión se realice correctamente
 
     # Configuración del generador
     generator.gauss(float(frequency) * 1e6, float(cycles), float(amplitude_low))
@@ -25,29 +29,36 @@ def set_gaussian_wave(frequency, cycles, amplitude_low):
     generator.write("APPLy:SINusoid:CH2 4800,1.0,0.0")
     generator.write("OUTP:CH2 ON")
 
-def get_burst_state():
+@con_generador
+def get_burst_state(generator=None):
     """
     Consulta y devuelve el estado del modo ráfaga (BURSt:STATe?) del generador Rigol DG1022.
     """
-    results=[]
-    generator = dg1022.dg1022()
-    generator.conect(0)  # Conectar al puerto 0
-    time.sleep(0.5)
-    generator.write("BURSt:MODE?")
-    Encendido= (generator.read())
-    generator.write("BURSt:STATe?")
-    Estado_burst= (generator.read())
-    generator.write("BURSt:NCYCles?")
-    ciclos=(generator.read())
-    print(f"Generador {Encendido}Burst {Estado_burst} ciclos {ciclos}")
-
-def get_channel_state():
+    # Una sola consulta compuesta; las tres respuestas llegan juntas separadas por ';'
+    try:
+        respuesta = generator.query("BURSt:MODE?;:BURSt:STATe?;:BURSt:NCYCles?")
+    except pyvisa.VisaIOError:
+        respuesta = None  # Firmware que no contesta la consulta compuesta y la deja vencer
+    campos = respuesta.strip().split(";") if respuesta else []
+    if len(campos) == 3:
+        Encendido, Estado_burst, ciclos = campos
+    else:
+        # Firmware que no responde consultas compuestas: una consulta por campo
+        # read() retorna None si la respuesta no se pudo interpretar
+        generator.write("*CLS")
+        generator.write("BURSt:MODE?")
+        Encendido= (generator.read() or "").strip()
+        generator.write("BURSt:STATe?")
+        Estado_burst= (generator.read() or "").strip()
+        generator.write("BURSt:NCYCles?")
+        ciclos=(generator.read() or "").strip()
+    print(f"Generador {Encendido} Burst {Estado_burst} ciclos {ciclos}")
+
+@con_generador
+def get_channel_state(generator=None):
     """
     Obtiene y muestra el estado del canal 1 del generador.
     """
-    generator = dg1022.dg1022()
-    generator.conect(0)  # Conectar al puerto 0
-    time.sleep(0.5)
     generator.write("BURSt:MODE?")
     print(generator.read())
     generator.write("BURSt:STATe?")
@@ -56,16 +67,16 @@ def get_channel_state():
     print(generator.read())
 
 
-def control_burst_mode(enable_burst, num_cycles):
+@con_generador
+def control_burst_mode(enable_burst, num_cycles, generator=None):
     """
     Controla el modo burst del generador de funciones.
 
     Parameters:
     enable_burst (bool): Activar (True) o desactivar (False) el modo burst.
     num_cycles (int): Número de ciclos a configurar en el modo burst (solo si está activado).
+    generator (dg1022): Generador a usar. Si es None se usa la sesión compartida del puerto 0.
     """
-    generator = dg1022.dg1022()
-    generator.conect(0)  # Conectar al puerto 0
     try:
         if enable_burst:
             # Activar modo burst
@@ -84,12 +95,12 @@ def control_burst_mode(enable_burst, num_cycles):
         print(f"Error: {e}")
 
 
-def configure_sine_wave_signal():
+def configure_sine_wave_signal(generator=None):
     """
     Configura una señal sinusoidal en el generador de funciones.
     """
-    generator = dg1022.dg1022()
-    generator.conect(0)  # Conectar al puerto 0
+    if generator is None:
+        generator = obtener_generador()  # Sesión compartida del puerto 0
     try:
         # Ingreso de frecuencia (solo valores entre 1 Hz y 5 MHz)
         while True:
@@ -128,12 +139,12 @@ def configure_sine_wave_signal():
         print(f"Error al configurar la señal: {e}")
 
 
-def get_channel_configuration():
+def get_channel_configuration(generator=None):
     """
     Obtiene la configuración del canal seleccionado en el generador.
     """
-    generator = dg1022.dg1022()
-    generator.conect(0)  # Conectar al puerto 0
+    if generator is None:
+        generator = obtener_generador()  # Sesión compartida del puerto 0
     try:
         # Ingreso del canal (validar como número entero)
         while True:
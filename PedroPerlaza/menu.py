@@ -3,8 +3,10 @@
 Módulo para interactuar con el generador de funciones Rigol DG1022 y un menú de usuario.
 """
 
+import logging
 
 from generator_functions import *
+from pool_sesiones import cerrar_sesiones
 
 
 def display_menu():
@@ -96,14 +98,11 @@ def option_5():
 
 def option_6():
     """Maneja la opción 6 del menú para encender el generador de funciones."""
-    generator = dg1022.dg1022()
-    generator.conect(0)
+    generator = obtener_generador()
 
 def option_7():
     """Maneja la opción 7 del menú para apagar el generador de funciones."""
-    generator = dg1022.dg1022()
-    generator.conect(0)  # Conectar al puerto 0
-    time.sleep(0.5)  # Esperar a que la conexión se realice correctamente
+    generator = obtener_generador()  # Sesión compartida del puerto 0
     generator.write("OUTP:CH1 ON")
     generator.write("OUTP:CH2 ON")
 
@@ -118,6 +117,7 @@ def option_9():
 
 def main():
     """Función principal que ejecuta el menú de opciones."""
+    logging.basicConfig(level = logging.INFO, format = "%(message)s")  # Muestra los mensajes del driver por consola
     while True:
         display_menu()
         try:
@@ -141,6 +141,7 @@ def main():
             elif choice == 9:
                 option_9()
             elif choice == 10:
+                cerrar_sesiones()
                 print("Saliendo del programa.")
                 break
             else:
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Registro de sesiones VISA compartidas por todo el proceso.
+
+Crear un dg1022.dg1022() por cada accion del menu abre un ResourceManager nuevo, enumera los
+recursos y abre otra sesion que nunca se cierra. Este modulo mantiene un unico ResourceManager
+y una sesion abierta por nombre de recurso, que se reutiliza entre llamadas.
+
+Ejemplo de uso:
+    generator = obtener_generador()        # primer recurso de la lista, como conect(0)
+    generator.write("OUTP ON")
+    cerrar_sesiones()                      # al terminar el programa
+"""
+
+import atexit
+import functools
+import inspect
+import logging
+import threading
+import time
+
+import dg1022
+from importacion_diferida import importar_diferido  # Herramientas, agregado a sys.path por dg1022
+
+pyvisa = importar_diferido("pyvisa")  # se carga al abrir la primera sesion
+
+log = logging.getLogger(__name__)
+
+INTERVALO_VERIFICACION = 5.0  # Segundos sin uso tras los cuales se verifica la sesion con *IDN?
+
+_lock = threading.RLock()
+_handle = None        # ResourceManager compartido
+_name_list = None     # Resultado de list_resources(); se vuelve a enumerar si falta el recurso buscado
+_sesiones = {}        # nombre de recurso -> dg1022 conectado
+_ultimo_uso = {}      # nombre de recurso -> time.monotonic() del ultimo uso
+_instrumentacion = None  # Instrumentacion opcional que se entrega a cada dg1022 abierto
+
+
+def configurar_gestor(handle, instrumentacion = None):
+    """
+    Reemplaza el ResourceManager compartido (por ejemplo por uno simulado).
+    Cierra las sesiones abiertas con el gestor anterior.
+
+    Parameters:
+    handle: Objeto con la interfaz de pyvisa.ResourceManager.
+    instrumentacion: Instrumentacion (Herramientas/instrumentacion.py) para medir las sesiones nuevas, o None.
+    """
+    global _handle, _name_list, _instrumentacion
+    with _lock:
+        cerrar_sesiones()
+        _handle = handle
+        _name_list = None
+        _instrumentacion = instrumentacion
+
+
+def _gestor(refrescar = False):
+    global _handle, _name_list
+    if _handle is None:
+        _handle = pyvisa.ResourceManager()
+    if _name_list is None or refrescar:
+        _name_list = _handle.list_resources()
+    return _handle, _name_list
+
+
+def _abrir(nombre):
+    handle, name_list = _gestor()
+    if nombre not in name_list:
+        # despues de desconectar y reconectar el cable la lista guardada puede estar desactualizada
+        handle, name_list = _gestor(refrescar = True)
+    if nombre not in name_list:
+        raise pyvisa.VisaIOError(pyvisa.constants.StatusCode.error_resource_not_found)
+    generator = dg1022.dg1022(handle = handle, name_list = name_list, instrumentacion = _instrumentacion)
+    generator.conect(list(name_list).index(nombre))
+    if not generator.connected:
+        raise pyvisa.VisaIOError(pyvisa.constants.StatusCode.error_resource_not_found)
+    generator.usar_cache_formas()  # Evita volver a subir formas arbitrarias que el generador ya tiene
+    return generator
+
+
+def _sesion_sana(generator):
+    # Verificacion de salud: el instrumento debe responder *IDN? sin error
+    try:
+        return bool(generator.inst.query("*IDN?"))
+    except Exception:
+        return False
+
+
+def nombre_recurso(index = 0):
+    """Retorna el nombre del recurso VISA en la posicion index de la lista (por defecto el primero)."""
+    with _lock:
+        name_list = _gestor()[1]
+        if index >= len(name_list):
+            name_list = _gestor(refrescar = True)[1]
+        return name_list[index]
+
+
+def obtener_generador(nombre = None, index = 0):
+    """
+    Retorna un dg1022 conectado y compartido para el recurso pedido, abriendolo solo la primera vez.
+    Si la sesion lleva mas de INTERVALO_VERIFICACION segundos sin usarse se verifica con *IDN?
+    y se reabre si no responde.
+
+    Parameters:
+    nombre (str): Nombre del recurso VISA. Si es None se usa el recurso en la posicion index.
+    index (int): Posicion en la lista de recursos, equivalente al argumento de conect().
+    """
+    with _lock:
+        if nombre is None:
+            nombre = nombre_recurso(index)
+        generator = _sesiones.get(nombre)
+        ahora = time.monotonic()
+        if generator is not None and ahora - _ultimo_uso.get(nombre, 0) > INTERVALO_VERIFICACION:
+            if not _sesion_sana(generator):
+                log.warning("Sesion %s sin respuesta, reabriendo.", nombre)
+                generator.close()
+                generator = None
+        if generator is None:
+            generator = _abrir(nombre)
+            _sesiones[nombre] = generator
+        _ultimo_uso[nombre] = ahora
+        return generator
+
+
+def reabrir(nombre):
+    """
+    Cierra y vuelve a abrir la sesion del recurso. Se usa despues de un VisaIOError.
+
+    Parameters:
+    nombre (str): Nombre del recurso VISA.
+    """
+    with _lock:
+        generator = _sesiones.pop(nombre, None)
+        if generator is not None:
+            generator.close()
+        return obtener_generador(nombre)
+
+
+def cerrar_sesiones():
+    """Cierra todas las sesiones del registro. Se llama tambien automaticamente al salir del programa."""
+    with _lock:
+        for generator in _sesiones.values():
+            generator.close()
+        _sesiones.clear()
+        _ultimo_uso.clear()
+
+
+def con_generador(funcion):
+    """
+    Decorador para funciones que reciben el argumento generator, por nombre o por posicion.
+    Si no se entrega un generador se usa el del registro y, si la funcion falla con VisaIOError,
+    la sesion se reabre y la funcion se reintenta una vez.
+    """
+    firma = inspect.signature(funcion)
+
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        argumentos = firma.bind(*args, **kwargs)
+        if argumentos.arguments.get("generator") is not None:
+            return funcion(*args, **kwargs)
+        argumentos.arguments["generator"] = obtener_generador()
+        try:
+            return funcion(*argumentos.args, **argumentos.kwargs)
+        except pyvisa.VisaIOError as e:
+            log.error("Error de comunicacion (%s), reabriendo la sesion y reintentando.", e)
+            argumentos.arguments["generator"] = reabrir(argumentos.arguments["generator"].name)
+            return funcion(*argumentos.args, **argumentos.kwargs)
+    return envoltura
+
+
+atexit.register(cerrar_sesiones)
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+Sintesis vectorizada de formas de onda arbitrarias para el DG1022.
+
+Cada forma se genera como una tabla de un periodo (el generador la repite a la frecuencia
+programada con FREQ), normalizada entre -1 y 1. La cantidad de puntos se elige a partir del
+ancho de banda de la forma (ciclos de su componente mas alta dentro de la tabla) con
+PUNTOS_POR_CICLO puntos por ciclo, sin superar el limite de 4096 puntos del generador.
+
+Las tablas se guardan en un cache LRU acotado (TAMANO_CACHE entradas) con clave en la forma y sus
+parametros, por lo que pedir de nuevo la misma forma no recalcula nada. Las tablas entregadas son
+de solo lectura porque se comparten entre llamadas.
+
+Ejemplo de uso:
+    y = tono_gaussiano(5, sigma = 0.15)        # 5 ciclos con envolvente gaussiana
+    generator.custom_signal(y, v_max = 1, v_min = -1)
+    generator.write("FREQ %.10g" % (1e6 / 5))  # portadora de 1 MHz
+"""
+
+import functools
+import math
+
+import numpy as np
+
+PUNTOS_MAXIMOS = 4096    # Puntos que acepta la memoria volatil del DG1022
+PUNTOS_MINIMOS = 64
+PUNTOS_POR_CICLO = 16    # Puntos por ciclo de la componente mas alta
+TAMANO_CACHE = 128       # Tablas guardadas en el cache LRU
+SIGMA_GAUSS = 0.5 / math.sqrt(2)  # Envolvente de dg1022.gauss(): exp(-((t-0.5)/0.5)**2)
+
+
+def puntos_para(ciclos, puntos_por_ciclo = PUNTOS_POR_CICLO):
+    """
+    Retorna la cantidad de puntos para representar `ciclos` ciclos por tabla, entre PUNTOS_MINIMOS
+    y PUNTOS_MAXIMOS.
+
+    Parameters:
+    ciclos (float): Ciclos de la componente de mayor frecuencia dentro de la tabla (ancho de banda).
+    puntos_por_ciclo (int): Puntos por ciclo deseados.
+    """
+    return int(min(PUNTOS_MAXIMOS, max(PUNTOS_MINIMOS, math.ceil(ciclos * puntos_por_ciclo))))
+
+
+def _normalizar(y):
+    pico = np.max(np.abs(y))
+    return y / pico if pico > 0 else y
+
+
+# --- Formas: funcion(t, **parametros) y ancho de banda en ciclos por tabla -------------------------
+
+def _tono_gaussiano(t, ciclos, sigma):
+    return np.exp(-0.5 * ((t - 0.5) / sigma) ** 2) * np.sin(2 * np.pi * ciclos * t)
+
+
+def _chirp(t, ciclos_inicio, ciclos_fin, logaritmico):
+    if logaritmico:
+        k = ciclos_fin / ciclos_inicio
+        fase = ciclos_inicio * (k ** t - 1) / math.log(k)
+    else:
+        fase = ciclos_inicio * t + (ciclos_fin - ciclos_inicio) * t ** 2 / 2
+    return np.sin(2 * np.pi * fase)
+
+
+def _sinc(t, cruces):
+    return np.sinc(2 * cruces * (t - 0.5))
+
+
+def _coseno_alzado(t, simbolos, beta):
+    x = simbolos * (t - 0.5) * 2  # Tiempo en simbolos, centrado
+    denominador = 1 - (2 * beta * x) ** 2
+    singular = np.isclose(denominador, 0)
+    y = np.sinc(x) * np.cos(np.pi * beta * x) / np.where(singular, 1, denominador)
+    # Limite en x = +-1/(2 beta)
+    return np.where(singular, np.pi / 4 * np.sinc(1 / (2 * beta)) if beta else 1, y)
+
+
+def _cuadrada(t, ciclos, ciclo_trabajo):
+    return np.where((t * ciclos) % 1 < ciclo_trabajo, 1.0, -1.0)
+
+
+def _triangular(t, ciclos):
+    return 1 - 4 * np.abs(((t * ciclos) + 0.25) % 1 - 0.5)
+
+
+def _armonicos(t, amplitudes, fases):
+    k = np.arange(1, len(amplitudes) + 1)[:, None]
+    return (np.asarray(amplitudes)[:, None] * np.sin(2 * np.pi * k * t + np.asarray(fases)[:, None])).sum(axis = 0)
+
+
+FORMAS = {
+    # nombre: (funcion, ancho de banda en ciclos por tabla)
+    "tono_gaussiano": (_tono_gaussiano, lambda ciclos, sigma: ciclos + 3 / (2 * np.pi * sigma)),
+    "chirp": (_chirp, lambda ciclos_inicio, ciclos_fin, logaritmico: max(ciclos_inicio, ciclos_fin)),
+    "sinc": (_sinc, lambda cruces: cruces),
+    "coseno_alzado": (_coseno_alzado, lambda simbolos, beta: simbolos * (1 + beta) / 2),
+    "cuadrada": (_cuadrada, lambda ciclos, ciclo_trabajo: 15 * ciclos),  # Hasta el armonico 15
+    "triangular": (_triangular, lambda ciclos: 7 * ciclos),
+    "armonicos": (_armonicos, lambda amplitudes, fases: len(amplitudes)),
+}
+
+
+@functools.lru_cache(maxsize = TAMANO_CACHE)
+def _generar(forma, puntos, parametros):
+    funcion = FORMAS[forma][0]
+    t = np.arange(puntos) / puntos  # Un periodo sin repetir el punto final: la tabla se repite sin saltos
+    tabla = _normalizar(funcion(t, **dict(parametros)))
+    tabla.flags.writeable = False
+    return tabla
+
+
+def tabla(forma, puntos = None, **parametros):
+    """
+    Retorna la tabla (arreglo de NumPy de solo lectura, entre -1 y 1) de la forma pedida.
+
+    Parameters:
+    forma (str): Nombre de la forma en FORMAS.
+    puntos (int): Cantidad de puntos. None elige segun el ancho de banda de la forma.
+    **parametros: Parametros de la forma.
+    """
+    if forma not in FORMAS:
+        raise ValueError("Forma desconocida %s, use una de: %s" % (forma, ", ".join(FORMAS)))
+    if puntos is None:
+        puntos = puntos_para(FORMAS[forma][1](**parametros))
+    if not 1 <= puntos <= PUNTOS_MAXIMOS:
+        raise ValueError("La tabla debe tener entre 1 y %d puntos" % PUNTOS_MAXIMOS)
+    return _generar(forma, int(puntos), tuple(sorted(parametros.items())))
+
+
+def tono_gaussiano(ciclos, sigma = SIGMA_GAUSS, puntos = None):
+    """
+    Seno de `ciclos` ciclos con envolvente gaussiana centrada en la tabla.
+
+    Parameters:
+    ciclos (float): Ciclos de la portadora dentro de la tabla.
+    sigma (float): Desviacion estandar de la envolvente, como fraccion de la tabla. Debe ser mayor que 0.
+    """
+    if not sigma > 0:
+        raise ValueError("sigma debe ser mayor que 0")
+    return tabla("tono_gaussiano", puntos, ciclos = float(ciclos), sigma = float(sigma))
+
+
+def chirp(ciclos_inicio, ciclos_fin, logaritmico = False, puntos = None):
+    """
+    Barrido de frecuencia dentro de la tabla, de `ciclos_inicio` a `ciclos_fin` ciclos por tabla.
+
+    Parameters:
+    logaritmico (bool): Barrido exponencial en vez de lineal. Requiere ciclos_inicio y ciclos_fin mayores
+        que 0; si son iguales la tabla es un seno fijo y se genera como barrido lineal.
+    """
+    if logaritmico and not (ciclos_inicio > 0 and ciclos_fin > 0):
+        raise ValueError("El chirp logaritmico requiere ciclos_inicio y ciclos_fin mayores que 0")
+    if ciclos_inicio == ciclos_fin:
+        logaritmico = False  # log(ciclos_fin / ciclos_inicio) = 0: sin barrido
+    return tabla("chirp", puntos, ciclos_inicio = float(ciclos_inicio), ciclos_fin = float(ciclos_fin),
+                 logaritmico = bool(logaritmico))
+
+
+def sinc(cruces, puntos = None):
+    """
+    Pulso sin(x)/x centrado, con `cruces` cruces por cero a cada lado.
+    """
+    return tabla("sinc", puntos, cruces = float(cruces))
+
+
+def coseno_alzado(simbolos = 8, beta = 0.5, puntos = None):
+    """
+    Pulso de coseno alzado (respuesta al impulso) que abarca `simbolos` periodos de simbolo.
+
+    Parameters:
+    beta (float): Factor de caida (roll-off), entre 0 y 1.
+    """
+    return tabla("coseno_alzado", puntos, simbolos = float(simbolos), beta = float(beta))
+
+
+def tren_cuadrado(ciclos, ciclo_trabajo = 0.5, puntos = None):
+    """
+    Tren de `ciclos` pulsos cuadrados con el ciclo de trabajo indicado (0 a 1).
+    """
+    return tabla("cuadrada", puntos, ciclos = float(ciclos), ciclo_trabajo = float(ciclo_trabajo))
+
+
+def tren_triangular(ciclos, puntos = None):
+    """
+    Tren de `ciclos` ondas triangulares.
+    """
+    return tabla("triangular", puntos, ciclos = float(ciclos))
+
+
+def armonicos(amplitudes, fases = None, puntos = None):
+    """
+    Suma de armonicos: amplitudes[k] * sin(2 pi (k+1) t + fases[k]).
+
+    Parameters:
+    amplitudes (iterable): Amplitud de cada armonico, empezando por la fundamental.
+    fases (iterable): Fase en radianes de cada armonico. Por defecto 0.
+    """
+    amplitudes = tuple(float(a) for a in amplitudes)
+    fases = tuple(float(f) for f in fases) if fases is not None else (0.0,) * len(amplitudes)
+    if len(fases) != len(amplitudes):
+        raise ValueError("amplitudes y fases deben tener el mismo largo")
+    return tabla("armonicos", puntos, amplitudes = amplitudes, fases = fases)
+
+
+def info_cache():
+    """Retorna aciertos, fallos y tamaño del cache de tablas (functools.lru_cache)."""
+    return _generar.cache_info()
+
+
+def limpiar_cache():
+    """Vacia el cache de tablas."""
+    _generar.cache_clear()